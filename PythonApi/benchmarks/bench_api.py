@@ -0,0 +1,278 @@
+"""Measure throughput and latency of every API route against a seeded FileDatabase.
+
+For each size the database is seeded with deterministic records and the
+app is driven in process through httpx's ASGI transport, so no network is
+involved. Every route is first measured on its own by a single client, then
+a weighted mix of routes is run by several concurrent clients. Results are
+written as JSON; --compare checks them against a saved baseline and exits
+with status 1 if any route regressed.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_api.py --sizes 1000 100000 --output baseline.json
+    python benchmarks/bench_api.py --sizes 1000 100000 --output current.json --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from common import COMPANIES, STATUSES, make_record, remove_database_files, seed_database_file
+from database import FileDatabase, async_db
+from main import app
+from sharded_database import ShardedDatabase, reshard
+
+SEARCH_QUERIES = ["google", "soft eng", "referral seattle", "machine learning remote", "posting 4242", "netf"]
+BATCH_SIZE = 100
+
+
+class State:
+    """Data shared by the requests of one run: the random source and the ids to touch."""
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.random = random.Random(seed)
+        # Ids created during the run, consumed by the delete routes
+        self.created: List[int] = []
+
+    def existing_id(self) -> int:
+        return self.random.randint(1, self.size)
+
+    def fields(self) -> dict:
+        record = make_record(self.random.randint(1, 1_000_000))
+        del record["id"]
+        return record
+
+
+class Route(NamedTuple):
+    """A route to measure: builds ``(method, url, keyword arguments)`` for one request."""
+    name: str
+    request: Callable[[State], tuple]
+    # Share of the concurrent mix; 0 keeps a route out of it
+    weight: int
+    # Called with a successful response, to remember created ids
+    on_success: Optional[Callable[[State, httpx.Response], None]] = None
+
+
+def _create_one(state: State) -> tuple:
+    return "POST", "/api/JobApplications", {"json": state.fields()}
+
+
+def _delete_one(state: State) -> tuple:
+    id = state.created.pop() if state.created else state.existing_id()
+    return "DELETE", f"/api/JobApplications/{id}", {}
+
+
+def _delete_batch(state: State) -> tuple:
+    ids = [state.created.pop() for _ in range(min(BATCH_SIZE, len(state.created)))]
+    return "POST", "/api/JobApplications/bulk/delete", {"json": ids or [state.existing_id()]}
+
+
+def _import(state: State) -> tuple:
+    body = b"".join(json.dumps(state.fields()).encode("utf-8") + b"\n" for _ in range(BATCH_SIZE))
+    return "POST", "/api/JobApplications/import", {"content": body}
+
+
+ROUTES = [
+    Route("GET list", lambda s: ("GET", "/api/JobApplications", {}), 0),
+    Route("GET page", lambda s: ("GET", "/api/JobApplications", {"params": {"limit": 100, "after_id": s.existing_id()}}), 10),
+    Route("GET filtered", lambda s: ("GET", "/api/JobApplications", {"params": {
+        "status": s.random.choice(STATUSES), "company": s.random.choice(COMPANIES), "limit": 100,
+    }}), 5),
+    Route("GET sorted", lambda s: ("GET", "/api/JobApplications", {"params": {"sort": "-dateApplied", "limit": 100}}), 2),
+    Route("GET search", lambda s: ("GET", "/api/JobApplications/search", {"params": {"q": s.random.choice(SEARCH_QUERIES)}}), 5),
+    Route("GET stats", lambda s: ("GET", "/api/JobApplications/stats", {}), 3),
+    Route("GET export", lambda s: ("GET", "/api/JobApplications/export", {}), 0),
+    Route("GET item", lambda s: ("GET", f"/api/JobApplications/{s.existing_id()}", {}), 40),
+    Route("GET bulk", lambda s: ("GET", "/api/JobApplications/bulk", {"params": {
+        "ids": [s.existing_id() for _ in range(BATCH_SIZE)],
+    }}), 5),
+    Route("POST item", _create_one, 10, lambda s, response: s.created.append(response.json())),
+    Route("POST bulk", lambda s: ("POST", "/api/JobApplications/bulk", {"json": [s.fields() for _ in range(BATCH_SIZE)]}), 1,
+          lambda s, response: s.created.extend(result["id"] for result in response.json())),
+    Route("POST import", _import, 1),
+    Route("PUT item", lambda s: ("PUT", f"/api/JobApplications/{s.existing_id()}", {"json": s.fields()}), 10),
+    Route("PATCH status", lambda s: ("PATCH", f"/api/JobApplications/{s.existing_id()}", {"json": {"status": s.random.choice(STATUSES)}}), 10),
+    Route("PUT bulk", lambda s: ("PUT", "/api/JobApplications/bulk", {"json": [
+        dict(s.fields(), id=s.existing_id()) for _ in range(BATCH_SIZE)
+    ]}), 1),
+    Route("DELETE item", _delete_one, 5),
+    Route("POST bulk/delete", _delete_batch, 1),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def send(client: httpx.AsyncClient, route: Route, state: State) -> tuple:
+    """Send one request; returns its latency in seconds and whether it failed."""
+    method, url, kwargs = route.request(state)
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    latency = time.perf_counter() - start
+    if route.on_success is not None and response.is_success:
+        route.on_success(state, response)
+    return latency, not response.is_success
+
+
+async def measure_single(client: httpx.AsyncClient, route: Route, state: State, duration: float, min_requests: int) -> dict:
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    while len(latencies) < min_requests or time.perf_counter() - start < duration:
+        latency, failed = await send(client, route, state)
+        latencies.append(latency)
+        errors += failed
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def measure_mixed(client: httpx.AsyncClient, state: State, duration: float, concurrency: int) -> dict:
+    routes = [route for route in ROUTES if route.weight]
+    weights = [route.weight for route in routes]
+    latencies: Dict[str, List[float]] = {route.name: [] for route in routes}
+    errors: Dict[str, int] = {route.name: 0 for route in routes}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            route = state.random.choices(routes, weights)[0]
+            latency, failed = await send(client, route, state)
+            latencies[route.name].append(latency)
+            errors[route.name] += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    results = {name: summarize(values, errors[name], elapsed) for name, values in latencies.items() if values}
+    results["total"] = summarize([value for values in latencies.values() for value in values], sum(errors.values()), elapsed)
+    return results
+
+
+async def run_size(size: int, args) -> dict:
+    db_file = f"bench_api_{size}.json"
+    seed_database_file(db_file, size, checksum=True)
+    if args.shards:
+        shard_dir = f"bench_api_{size}.shards"
+        reshard(db_file, shard_dir, args.shards)
+        database = ShardedDatabase(shard_dir)
+    else:
+        database = FileDatabase(db_file, write_ahead_log=args.write_ahead_log)
+    original = async_db.database
+    async_db.database = database
+    try:
+        state = State(size, args.seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            single = {}
+            for route in ROUTES:
+                single[route.name] = await measure_single(client, route, state, args.duration, args.min_requests)
+                print(f"{size:>8} single  {route.name:<18} {format_result(single[route.name])}", flush=True)
+            mixed = await measure_mixed(client, state, args.mixed_duration, args.concurrency)
+            for name, result in mixed.items():
+                print(f"{size:>8} mixed   {name:<18} {format_result(result)}", flush=True)
+        return {"single": single, "mixed": mixed}
+    finally:
+        async_db.database = original
+        database.close()
+        remove_database_files(db_file)
+        if args.shards:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def format_result(result: dict) -> str:
+    return (f"{result['requests']:>7} req  {result['throughput']:>9.1f} req/s  "
+            f"p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms  {result['errors']} errors")
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta_ms: float, min_samples: int) -> List[str]:
+    """List the measurements that are worse than the baseline by more than ``threshold``.
+
+    Latency changes below ``min_delta_ms``, and latencies of routes with
+    fewer than ``min_samples`` requests on either side, are ignored as noise.
+    """
+    regressions = []
+    for size, modes in current["results"].items():
+        for mode, routes in modes.items():
+            for name, result in routes.items():
+                base = baseline["results"].get(size, {}).get(mode, {}).get(name)
+                if base is None:
+                    continue
+                label = f"{size} {mode} {name}"
+                enough_samples = min(result["requests"], base["requests"]) >= min_samples
+                for metric in ("p50_ms", "p99_ms"):
+                    if enough_samples and result[metric] > base[metric] * (1 + threshold) and result[metric] - base[metric] > min_delta_ms:
+                        regressions.append(f"{label}: {metric} {base[metric]:.3f} -> {result[metric]:.3f}")
+                if result["throughput"] * (1 + threshold) < base["throughput"]:
+                    regressions.append(f"{label}: throughput {base['throughput']:.1f} -> {result['throughput']:.1f} req/s")
+                if result["errors"] > base["errors"]:
+                    regressions.append(f"{label}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds per route with a single client")
+    parser.add_argument("--min-requests", type=int, default=5, help="requests per route however long they take")
+    parser.add_argument("--mixed-duration", type=float, default=10.0, help="seconds of concurrent mixed load")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--write-ahead-log", action="store_true", help="use FileDatabase's write-ahead log mode")
+    parser.add_argument("--shards", type=int, default=0, help="use ShardedDatabase with this many shards")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_api_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1, help="latency increase below which no regression is reported")
+    parser.add_argument("--min-samples", type=int, default=20, help="requests needed to compare a route's latency")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "write_ahead_log": args.write_ahead_log,
+            "shards": args.shards,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": {str(size): asyncio.run(run_size(size, args)) for size in args.sizes},
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms, args.min_samples)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
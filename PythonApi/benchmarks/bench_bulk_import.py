@@ -0,0 +1,77 @@
+"""Compare importing applications one request at a time with the bulk and streaming import endpoints.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_bulk_import.py --records 5000
+"""
+import argparse
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from common import make_record, remove_database_files, report
+from database import db
+from main import app, MAX_BULK_SIZE
+from streaming import csv_export
+from models import JobApplication
+
+
+def reset_database(db_file: str):
+    remove_database_files(db_file)
+    db._db_file = db_file
+    db._init_sample_data()
+    db._load_data()
+
+
+def upload(data: bytes, chunk_size: int = 64 * 1024):
+    for offset in range(0, len(data), chunk_size):
+        yield data[offset:offset + chunk_size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=5000)
+    args = parser.parse_args()
+
+    db_file = "bench_bulk_import.json"
+    payload = []
+    for i in range(args.records):
+        record = make_record(i + 1)
+        del record["id"]
+        payload.append(record)
+    client = TestClient(app)
+
+    try:
+        reset_database(db_file)
+        start = time.perf_counter()
+        for record in payload:
+            client.post("/api/JobApplications", json=record).raise_for_status()
+        report("one POST per application", time.perf_counter() - start, len(payload))
+
+        reset_database(db_file)
+        start = time.perf_counter()
+        for offset in range(0, len(payload), MAX_BULK_SIZE):
+            client.post("/api/JobApplications/bulk", json=payload[offset:offset + MAX_BULK_SIZE]).raise_for_status()
+        report("bulk POST", time.perf_counter() - start, len(payload))
+        assert len(db.get_all_job_applications()) == len(payload) + 3
+
+        ndjson = b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in payload)
+        reset_database(db_file)
+        start = time.perf_counter()
+        client.post("/api/JobApplications/import", content=upload(ndjson)).raise_for_status()
+        report("streamed NDJSON import", time.perf_counter() - start, len(payload))
+        assert len(db.get_all_job_applications()) == len(payload) + 3
+
+        csv_data = b"".join(csv_export(JobApplication(id=i + 1, **record) for i, record in enumerate(payload)))
+        reset_database(db_file)
+        start = time.perf_counter()
+        client.post("/api/JobApplications/import?format=csv", content=upload(csv_data)).raise_for_status()
+        report("streamed CSV import", time.perf_counter() - start, len(payload))
+        assert len(db.get_all_job_applications()) == len(payload) + 3
+    finally:
+        remove_database_files(db_file)
+
+
+if __name__ == "__main__":
+    main()
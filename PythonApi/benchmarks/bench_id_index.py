@@ -0,0 +1,80 @@
+"""Compare id lookups through the FileDatabase index with the old linear scan.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_id_index.py --records 100000
+"""
+import argparse
+import random
+import time
+
+from common import remove_database_files, report, seed_database_file
+from database import FileDatabase
+from models import UpdateJobApplicationCommand
+
+
+def linear_get(job_applications, id):
+    for job_app in job_applications:
+        if job_app.id == id:
+            return job_app
+    return None
+
+
+def linear_delete(job_applications, id):
+    for i, job_app in enumerate(job_applications):
+        if job_app.id == id:
+            del job_applications[i]
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--operations", type=int, default=200)
+    args = parser.parse_args()
+
+    db_file = "bench_id_index.json"
+    seed_database_file(db_file, args.records)
+    # Log mode keeps persistence O(record), so the timings isolate the lookup cost.
+    db = FileDatabase(db_file, write_ahead_log=True)
+    try:
+        rng = random.Random(42)
+        ids = [rng.randint(1, args.records) for _ in range(args.operations)]
+        legacy = list(db.get_all_job_applications())
+
+        start = time.perf_counter()
+        for id in ids:
+            linear_get(legacy, id)
+        report("get by id (linear scan)", time.perf_counter() - start, len(ids))
+
+        start = time.perf_counter()
+        for id in ids:
+            db.get_job_application_by_id(id)
+        report("get by id (index)", time.perf_counter() - start, len(ids))
+
+        command = UpdateJobApplicationCommand(
+            jobTitle="Benchmark", company="Bench", dateApplied="2025-01-01", status="Offer"
+        )
+        start = time.perf_counter()
+        for id in ids:
+            db.update_job_application(id, command)
+        report("update (index + log append)", time.perf_counter() - start, len(ids))
+
+        delete_ids = list(dict.fromkeys(ids))
+        start = time.perf_counter()
+        for id in delete_ids:
+            linear_delete(legacy, id)
+        report("delete (linear scan + list shift)", time.perf_counter() - start, len(delete_ids))
+
+        start = time.perf_counter()
+        for id in delete_ids:
+            db.delete_job_application(id)
+        report("delete (index + log append)", time.perf_counter() - start, len(delete_ids))
+    finally:
+        db.close()
+        remove_database_files(db_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measure memory per stored record: JobApplication models versus compact records.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_record_memory.py --records 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from common import make_record as make_record_data
+from database import make_record
+from models import JobApplication
+
+
+def measure(name: str, build, count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build(count)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<40} {count:>8} records  {allocated / count:>8.0f} bytes/record  {seconds:>6.1f} s to build")
+    return store
+
+
+def build_models(count: int):
+    # How FileDatabase stored records before: one validated model per id
+    return {id: JobApplication(**make_record_data(id)) for id in range(1, count + 1)}
+
+
+def build_records(count: int):
+    records = {}
+    for id in range(1, count + 1):
+        job_app = JobApplication(**make_record_data(id))
+        records[id] = make_record(job_app.id, job_app)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    store = measure("JobApplication models", build_models, args.records)
+    del store
+    store = measure("JobApplicationRecord tuples (interned)", build_records, args.records)
+    del store
+
+
+if __name__ == "__main__":
+    main()
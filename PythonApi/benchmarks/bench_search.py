@@ -0,0 +1,60 @@
+"""Measure full-text search latency against a linear substring scan.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_search.py --records 100000
+"""
+import argparse
+import time
+
+from common import remove_database_files, report, seed_database_file
+from database import FileDatabase
+
+QUERIES = ["google", "soft eng", "referral seattle", "machine learning remote", "posting 4242", "netf"]
+
+
+def linear_search(job_applications, query):
+    words = query.casefold().split()
+    results = []
+    for job_app in job_applications:
+        text = " ".join(
+            value for value in (job_app.jobTitle, job_app.company, job_app.description, job_app.location) if value
+        ).casefold()
+        if all(word in text for word in words):
+            results.append(job_app)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db_file = "bench_search.json"
+    seed_database_file(db_file, args.records)
+    start = time.perf_counter()
+    db = FileDatabase(db_file, write_ahead_log=True)
+    print(f"loaded {args.records} records in {time.perf_counter() - start:.2f} s")
+    try:
+        # The text index is built by the first search; time it on its own
+        start = time.perf_counter()
+        db.search_job_applications(QUERIES[0])
+        print(f"built the text index in {time.perf_counter() - start:.2f} s")
+        job_applications = db.get_all_job_applications()
+        for query in QUERIES:
+            start = time.perf_counter()
+            linear_search(job_applications, query)
+            report(f"scan     '{query}'", time.perf_counter() - start, 1)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                db.search_job_applications(query)
+            report(f"index    '{query}'", time.perf_counter() - start, args.repeat)
+    finally:
+        db.close()
+        remove_database_files(db_file)
+
+
+if __name__ == "__main__":
+    main()
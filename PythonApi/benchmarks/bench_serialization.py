@@ -0,0 +1,83 @@
+"""Measure serialization CPU per list request: response_model validation versus cached JSON.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_serialization.py --records 10000 100000
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from common import remove_database_files, report, seed_database_file
+from database import FileDatabase
+from models import JobApplication, UpdateJobApplicationCommand
+
+
+def validated_response(field, models) -> bytes:
+    """What a route returning models through response_model=List[JobApplication] does."""
+    content = asyncio.run(serialize_response(field=field, response_content=models))
+    return JSONResponse(content).body
+
+
+def cpu_time(fn, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return time.process_time() - start
+
+
+def bench(records: int, repeat: int):
+    db_file = "bench_serialization.json"
+    seed_database_file(db_file, records)
+    db = FileDatabase(db_file, write_ahead_log=True)
+    try:
+        field = create_model_field(name="Response", type_=List[JobApplication], mode="serialization")
+        models = [JobApplication(**job_app._asdict()) for job_app in db.get_all_job_applications()]
+        print(f"--- {records} records")
+
+        seconds = cpu_time(lambda: validated_response(field, models), repeat)
+        report("full list (response_model)", seconds, repeat)
+
+        seconds = cpu_time(lambda: db.encode_job_applications(db.get_all_job_applications()), 1)
+        report("full list (cold cache)", seconds, 1)
+
+        seconds = cpu_time(lambda: db.encode_job_applications(db.get_all_job_applications()), repeat)
+        report("full list (cached)", seconds, repeat)
+
+        command = UpdateJobApplicationCommand(
+            jobTitle="Benchmark", company="Bench", dateApplied="2025-01-01", status="Offer"
+        )
+
+        def after_one_update():
+            db.update_job_application(records // 2, command)
+            db.encode_job_applications(db.get_all_job_applications())
+
+        seconds = cpu_time(after_one_update, repeat)
+        report("full list (one record changed)", seconds, repeat)
+
+        page, _ = db.get_job_applications_page(limit=100)
+        seconds = cpu_time(lambda: validated_response(field, models[:100]), repeat * 10)
+        report("page of 100 (response_model)", seconds, repeat * 10)
+        seconds = cpu_time(lambda: db.encode_job_applications(page), repeat * 10)
+        report("page of 100 (cached)", seconds, repeat * 10)
+    finally:
+        db.close()
+        remove_database_files(db_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for records in args.records:
+        bench(records, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
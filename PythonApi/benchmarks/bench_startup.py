@@ -0,0 +1,89 @@
+"""Measure the time from launching the server to its first successful request.
+
+The same records are seeded as a checksummed snapshot, which is loaded
+without model validation, as a plain snapshot, which validates every
+record, and as a binary record file, which is only mapped.
+
+Run from the PythonApi directory:
+
+    python benchmarks/bench_startup.py --records 100000 1000000
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from common import remove_database_files, seed_database_file
+from binary_database import convert_json_to_binary
+
+API_DIR = Path(__file__).parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(db_file: str, timeout: float, engine: str = "file") -> float:
+    port = free_port()
+    env = dict(os.environ, JOB_TRACKER_DB_ENGINE=engine, JOB_TRACKER_DB_FILE=db_file)
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env=env,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/api/JobApplications?limit=1"
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with code {server.returncode}")
+            time.sleep(0.05)
+        raise TimeoutError(f"no successful request within {timeout} seconds")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    db_file = str(API_DIR / "bench_startup.json")
+    binary_file = str(API_DIR / "bench_startup.bin")
+
+    def run(name: str, path: str, engine: str = "file"):
+        seconds = time_to_first_request(path, args.timeout, engine)
+        print(f"{name:<32} {count:>8} records  {seconds:>8.2f} s  {os.path.getsize(path) / 2**20:>8.1f} MiB")
+
+    try:
+        for count in args.records:
+            seed_database_file(db_file, count, checksum=True)
+            run("checksummed (trusted load)", db_file)
+
+            convert_json_to_binary(db_file, binary_file)
+            run("binary (mapped)", binary_file, "binary")
+
+            seed_database_file(db_file, count)
+            run("plain (validated load)", db_file)
+    finally:
+        remove_database_files(db_file)
+        for suffix in ("", ".idx"):
+            if os.path.exists(binary_file + suffix):
+                os.remove(binary_file + suffix)
+
+
+if __name__ == "__main__":
+    main()
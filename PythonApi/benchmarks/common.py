@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+STATUSES = ["Applied", "Interview", "Offer", "Rejected", "Hired"]
+COMPANIES = ["Google", "Microsoft", "OpenAI", "Meta", "Netflix", "Amazon", "Apple", "Stripe"]
+LOCATIONS = ["Remote", "Seattle, WA", "San Francisco, CA", "New York, NY", "Austin, TX"]
+TITLES = [
+    "Software Engineer", "Frontend Developer", "Backend Developer", "Data Scientist",
+    "Product Manager", "DevOps Engineer", "Engineering Manager", "UX Designer",
+    "Site Reliability Engineer", "Machine Learning Engineer", "QA Analyst", "Security Engineer",
+]
+SOURCES = ["LinkedIn", "company website", "referral", "recruiter outreach", "job board", "career fair"]
+
+
+def make_record(id: int) -> dict:
+    """Build a deterministic job application record for seeding benchmarks."""
+    return {
+        "id": id,
+        "jobTitle": f"{TITLES[id % len(TITLES)]} {['I', 'II', 'III', 'Senior', 'Staff'][id % 5]}",
+        "company": COMPANIES[id % len(COMPANIES)],
+        "dateApplied": f"2025-{(id % 12) + 1:02d}-{(id % 28) + 1:02d}",
+        "status": STATUSES[id % len(STATUSES)],
+        "description": f"Applied via {SOURCES[id % len(SOURCES)]}, posting {id}",
+        "jobUrl": f"https://example.com/jobs/{id}",
+        "salary": f"${100000 + (id % 50) * 1000:,}",
+        "location": LOCATIONS[id % len(LOCATIONS)],
+    }
+
+
+def seed_database_file(path: str, count: int, checksum: bool = False):
+    """Write a database snapshot with ``count`` records directly to ``path``.
+
+    With ``checksum`` the snapshot is written as FileDatabase saves it, so it
+    loads without validation; otherwise it is a plain JSON document.
+    """
+    for suffix in ("", ".log", ".log.compacting"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    data = {
+        "next_id": count + 1,
+        "job_applications": [make_record(i) for i in range(1, count + 1)],
+    }
+    if checksum:
+        from database import FileDatabase
+        with open(path, "wb") as f:
+            FileDatabase._write_document(f, data)
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+def remove_database_files(path: str):
+    for suffix in ("", ".log", ".log.compacting", ".tmp"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def report(name: str, seconds: float, operations: int):
+    per_op_us = seconds / operations * 1e6
+    print(f"{name:<40} {operations:>8} ops  {per_op_us:>12.2f} us/op")
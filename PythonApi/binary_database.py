@@ -0,0 +1,189 @@
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from database import (
+    FileDatabase, DatabaseSnapshot, JobApplicationRecord, SAMPLE_DATA, encode_job_application, intern_record,
+    read_json_database
+)
+from record_file import RecordFile
+import itertools
+import os
+import secrets
+import timing
+
+
+class BinaryDatabase(FileDatabase):
+    """FileDatabase whose records stay on disk in a RecordFile.
+
+    Opening maps the data and index files instead of parsing them, so
+    startup time does not grow with the data, and a point read decodes one
+    record. Writes append entries; after ``index_after_entries`` of them
+    the index is rewritten, or the data file compacted if superseded
+    entries outweigh live ones. Secondary indexes are built on first use and
+    then maintained as in FileDatabase, whose query, search and bulk methods
+    are inherited unchanged.
+
+    Like FileDatabase, an instance must be the only writer of its files.
+    """
+
+    def __init__(self, db_file: str = "job_applications.bin", import_from: Optional[str] = None,
+                 index_after_entries: int = 10000, tombstone_retention: int = 100000):
+        self._import_from = import_from
+        self._index_after_entries = index_after_entries
+        self._job_applications: Optional[RecordFile] = None
+        self._encoded_snapshot: Optional[Tuple[Sequence[JobApplicationRecord], bytes]] = None
+        super().__init__(db_file, tombstone_retention=tombstone_retention)
+
+    def _ensure_db_file_exists(self):
+        if not os.path.exists(self._db_file):
+            if self._import_from is not None and os.path.exists(self._import_from):
+                convert_json_to_binary(self._import_from, self._db_file)
+            else:
+                self._init_sample_data()
+
+    def _init_sample_data(self):
+        fields = JobApplicationRecord._fields
+        RecordFile.write(
+            self._db_file,
+            (intern_record([app.get(field) for field in fields]) for app in SAMPLE_DATA["job_applications"]),
+            SAMPLE_DATA["next_id"]
+        )
+
+    def _load_data(self):
+        if self._job_applications is not None:
+            self._job_applications.close()
+        self._job_applications = RecordFile(self._db_file)
+        self._next_id = self._job_applications.next_id
+        self._rebuild_indexes()
+        self._version += 1
+        self._epoch = secrets.token_hex(4)
+        self._snapshot = None
+
+    def _rebuild_indexes(self):
+        # Every secondary index is built by _index on first use. Only records
+        # written since the file was opened have a version of their own.
+        self._indexes = {}
+        self._record_versions = {}
+
+    def _insert(self, job_app: JobApplicationRecord, changed: Optional[Iterable[str]] = None):
+        previous = self._job_applications.put(job_app)
+        self._record_written(job_app.id)
+        for index in self._changed_indexes(changed if previous is not None else None):
+            if previous is not None:
+                index.remove(previous)
+            index.add(job_app)
+
+    def _discard(self, id: int) -> Optional[JobApplicationRecord]:
+        job_app = self._job_applications.delete(id)
+        if job_app is not None:
+            self._record_deleted(id)
+            for index in self._indexes.values():
+                index.remove(job_app)
+        return job_app
+
+    def _commit(self, entries: List[dict]) -> None:
+        # The entries were appended by _insert and _discard as they were applied
+        records = self._job_applications
+        with timing.timed("storage"):
+            records.flush()
+            if records.appended_entries >= self._index_after_entries:
+                if records.dead_bytes > records.live_bytes:
+                    records.compact()
+                else:
+                    records.write_index()
+        return None
+
+    def compact(self):
+        """Rewrite the data file without superseded entries."""
+        with self._lock:
+            self._job_applications.compact()
+
+    def storage_bytes(self) -> int:
+        records = self._job_applications
+        return sum(os.path.getsize(path) for path in (records.path, records.index_path) if os.path.exists(path))
+
+    def close(self):
+        with self._lock:
+            self._job_applications.close()
+
+    def snapshot(self) -> DatabaseSnapshot:
+        """Return every record as of the current version, cached until the next write.
+
+        Records are decoded outside the lock, so writers are not held up.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            version = self._version
+            records = self._job_applications.records()
+        snapshot = DatabaseSnapshot(version, tuple(records))
+        with self._lock:
+            if self._version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def version_tag(self, id: Optional[int] = None) -> Optional[str]:
+        if id is None or id not in self._job_applications:
+            return super().version_tag(id)
+        return f"{self._epoch}-{id}-{self._record_versions.get(id, 0)}"
+
+    def iter_job_applications(self) -> Iterator[JobApplicationRecord]:
+        """Decode the records of one version as the iterator is advanced."""
+        with self._lock:
+            return self._job_applications.records()
+
+    def encode_job_application(self, job_app: Optional[JobApplicationRecord]) -> bytes:
+        with timing.timed("encode"):
+            return encode_job_application(job_app)
+
+    def encode_job_applications(self, job_apps: Sequence[Optional[JobApplicationRecord]]) -> bytes:
+        """JSON array of records; the encoding of the cached snapshot is kept until it changes.
+
+        Records are decoded into new objects, so unlike FileDatabase there is
+        no per-record cache to reuse.
+        """
+        cached = self._encoded_snapshot
+        if cached is not None and cached[0] is job_apps:
+            return cached[1]
+        with timing.timed("encode"):
+            encoded = b"[" + b",".join(map(encode_job_application, job_apps)) + b"]"
+        snapshot = self._snapshot
+        if snapshot is not None and job_apps is snapshot.job_applications:
+            self._encoded_snapshot = (job_apps, encoded)
+        return encoded
+
+    def get_job_applications_page(self, after_id: Optional[int] = None, limit: int = 100) -> Tuple[List[JobApplicationRecord], Optional[int]]:
+        with self._lock:
+            records = self._job_applications.records(after_id)
+        page = list(itertools.islice(records, limit + 1))
+        if len(page) > limit:
+            return page[:limit], page[limit - 1].id
+        return page, None
+
+
+def convert_json_to_binary(json_file: str, binary_file: str) -> int:
+    """Write the records of a FileDatabase JSON file, and its write-ahead log
+    if there is one, to a RecordFile. The source is only read. Returns the
+    number of records."""
+    next_id, job_applications = read_json_database(json_file)
+    return RecordFile.write(binary_file, job_applications, next_id)
+
+
+def convert_binary_to_json(binary_file: str, json_file: str) -> int:
+    """Write the records of a RecordFile to a FileDatabase JSON snapshot.
+
+    A write-ahead log left next to ``json_file`` belongs to the snapshot being
+    replaced and is removed. Returns the number of records.
+    """
+    source = RecordFile(binary_file)
+    try:
+        data = FileDatabase._snapshot_data(source.next_id, source.records())
+    finally:
+        source.close()
+    tmp_file = json_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        FileDatabase._write_document(f, data)
+    os.replace(tmp_file, json_file)
+    for suffix in (".log", ".log.compacting"):
+        if os.path.exists(json_file + suffix):
+            os.remove(json_file + suffix)
+    return len(data["job_applications"])
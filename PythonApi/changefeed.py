@@ -0,0 +1,182 @@
+"""Feed of committed changes, streamed to clients as Server-Sent Events.
+
+The database publishes every committed create, update and delete to a
+ChangeFeed, which numbers them and keeps the latest ``capacity`` in a ring
+buffer. Each client only holds its position in that buffer, so a client
+costs the same small amount of memory whether it keeps up or not. Writers
+append and return; they never wait for clients. A client that falls more
+than ``capacity`` events behind, or resumes from an id the buffer no longer
+holds, is sent a ``reset`` event and should reload the list.
+"""
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import itertools
+import json
+import secrets
+import threading
+
+CHANGE_FEED_CAPACITY = 10000
+# Events sent per write to the client
+EVENT_BATCH_SIZE = 100
+# An idle stream sends a comment this often so proxies keep it open
+KEEPALIVE_SECONDS = 15.0
+
+
+class Change:
+    """One committed change: ``op`` is ``create``, ``update`` or ``delete``.
+
+    ``record`` is the full record after a create or a replacing update,
+    ``fields`` the changed fields of a partial update.
+    """
+    __slots__ = ("seq", "op", "id", "record", "fields", "_encoded")
+
+    def __init__(self, op: str, id: int, record: Optional[dict] = None, fields: Optional[dict] = None):
+        self.seq = 0
+        self.op = op
+        self.id = id
+        self.record = record
+        self.fields = fields
+        self._encoded: Optional[bytes] = None
+
+    def encode(self, epoch: str) -> bytes:
+        """The SSE message for this change, encoded once however many clients read it."""
+        encoded = self._encoded
+        if encoded is None:
+            data = {"seq": self.seq, "op": self.op, "id": self.id}
+            if self.record is not None:
+                data["record"] = self.record
+            if self.fields is not None:
+                data["fields"] = self.fields
+            encoded = self._encoded = _message(self.op, f"{epoch}-{self.seq}", json.dumps(data))
+        return encoded
+
+
+def _message(event: str, id: str, data: str) -> bytes:
+    return f"event: {event}\nid: {id}\ndata: {data}\n\n".encode("utf-8")
+
+
+def changes_from_log_entries(entries: List[dict], first_new_id: int) -> List[Change]:
+    """Changes described by FileDatabase log entries.
+
+    A put of an id at or above ``first_new_id``, the next id before the
+    mutation, created the record; any other put replaced it.
+    """
+    changes = []
+    for entry in entries:
+        op = entry["op"]
+        if op == "put":
+            record = entry["record"]
+            changes.append(Change("create" if record["id"] >= first_new_id else "update", record["id"], record=record))
+        elif op == "patch":
+            changes.append(Change("update", entry["id"], fields=entry["fields"]))
+        elif op == "delete":
+            changes.append(Change("delete", entry["id"]))
+    return changes
+
+
+class ChangeFeed:
+    """Ring buffer of the latest changes, with wake-ups for waiting streams.
+
+    ``publish`` is called from database threads; streams wait on the event
+    loop, which is woken once per publish however many streams wait on it.
+    """
+
+    def __init__(self, capacity: int = CHANGE_FEED_CAPACITY):
+        self._changes: deque = deque(maxlen=capacity)
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        # One event per event loop with waiting streams, replaced after each wake-up
+        self._waiters: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+        # Sequence numbers restart with the process; event ids carry the epoch
+        # so a client resuming from another run is told to reset.
+        self.epoch = secrets.token_hex(4)
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def publish(self, changes: List[Change]):
+        if not changes:
+            return
+        with self._lock:
+            for change in changes:
+                self._last_seq += 1
+                change.seq = self._last_seq
+                self._changes.append(change)
+            loops = list(self._waiters)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:
+                # The loop has been closed
+                with self._lock:
+                    self._waiters.pop(loop, None)
+
+    def _wake(self, loop: asyncio.AbstractEventLoop):
+        with self._lock:
+            event = self._waiters.pop(loop, None)
+        if event is not None:
+            event.set()
+
+    def read(self, after_seq: int, limit: int = EVENT_BATCH_SIZE) -> Optional[List[Change]]:
+        """Up to ``limit`` changes following ``after_seq``, or None if some are no longer held."""
+        with self._lock:
+            if after_seq > self._last_seq:
+                return None
+            first_seq = self._last_seq - len(self._changes) + 1
+            if after_seq < first_seq - 1:
+                return None
+            start = after_seq - first_seq + 1
+            return list(itertools.islice(self._changes, start, start + limit))
+
+    async def wait(self, after_seq: int, timeout: float) -> bool:
+        """Wait until a change follows ``after_seq``; False if ``timeout`` passed first."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._last_seq > after_seq:
+                return True
+            event = self._waiters.get(loop)
+            if event is None:
+                event = self._waiters[loop] = asyncio.Event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        """Sequence number to resume after from a Last-Event-ID or ``after`` value.
+
+        A bare number counts as an id of this epoch. Returns None if the id
+        is malformed or from another epoch.
+        """
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch and epoch != self.epoch:
+            return None
+        return int(seq) if seq.isdigit() else None
+
+    async def stream(self, after: Optional[str] = None, keepalive: float = KEEPALIVE_SECONDS) -> AsyncIterator[bytes]:
+        """SSE messages for the changes after the event id ``after``, then for new ones as they come.
+
+        Without ``after`` the stream starts at the current position. It opens
+        with a ``ready`` event naming that position, or with a ``reset``
+        event when the changes after ``after`` can no longer be replayed.
+        """
+        seq = self._last_seq if after is None else self.parse_event_id(after)
+        if seq is None or self.read(seq, 0) is None:
+            seq = self._last_seq
+            yield _message("reset", f"{self.epoch}-{seq}", json.dumps({"seq": seq}))
+        else:
+            yield _message("ready", f"{self.epoch}-{seq}", json.dumps({"seq": seq}))
+        while True:
+            changes = self.read(seq)
+            if changes is None:
+                # Fell behind the ring buffer
+                seq = self._last_seq
+                yield _message("reset", f"{self.epoch}-{seq}", json.dumps({"seq": seq}))
+            elif changes:
+                seq = changes[-1].seq
+                yield b"".join(change.encode(self.epoch) for change in changes)
+            elif not await self.wait(seq, keepalive):
+                yield b": keepalive\n\n"
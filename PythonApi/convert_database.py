@@ -0,0 +1,30 @@
+# convert_database.py
+
+"""Convert the database between the JSON file format and the binary record format.
+
+The direction follows the extension of the input file:
+
+Usage: python convert_database.py job_applications.json job_applications.bin
+       python convert_database.py job_applications.bin job_applications.json
+"""
+
+import os
+import sys
+from binary_database import convert_binary_to_json, convert_json_to_binary
+
+
+def main(argv):
+    if len(argv) != 3:
+        raise SystemExit(__doc__)
+    source, target = argv[1], argv[2]
+    if not os.path.exists(source):
+        raise SystemExit(f"{source} does not exist")
+    if source.endswith(".json"):
+        count = convert_json_to_binary(source, target)
+    else:
+        count = convert_binary_to_json(source, target)
+    print(f"Converted {count} job applications from {source} to {target}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,15 +1,260 @@
-from typing import List, Optional
-from models import JobApplication, CreateJobApplicationCommand, UpdateJobApplicationCommand
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from models import JobApplication, CreateJobApplicationCommand, UpdateJobApplicationCommand, JobApplicationStats
+from wal import WriteAheadLog
+from indexes import HashIndex, SortedIndex, StatsIndex, TextIndex
+from changefeed import ChangeFeed, changes_from_log_entries
+from metrics import Gauge, Histogram, InstrumentedLock
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import bisect
+import contextvars
+import functools
+import hashlib
 import threading
+import profiling
+import timing
 import json
 import os
+import pydantic_core
+import secrets
+import sys
+import time
 from pathlib import Path
 
 
+SORTABLE_FIELDS = ("status", "company", "dateApplied")
+
+SAMPLE_DATA = {
+    "next_id": 4,
+    "job_applications": [
+        {
+            "id": 1,
+            "jobTitle": "Frontend Developer",
+            "company": "OpenAI",
+            "dateApplied": "2025-08-15",
+            "status": "Rejected",
+            "description": "Applied via LinkedIn. Contact: recruiter@openai.com",
+            "jobUrl": "https://openai.com/careers/frontend-dev",
+            "salary": "$120,000 - $150,000",
+            "location": "San Francisco, CA"
+        },
+        {
+            "id": 2,
+            "jobTitle": "Backend Developer",
+            "company": "Google",
+            "dateApplied": "2025-08-10",
+            "status": "Interview",
+            "description": "Applied through company website",
+            "jobUrl": "https://careers.google.com/backend-dev",
+            "salary": "$140,000 - $180,000",
+            "location": "Mountain View, CA"
+        },
+        {
+            "id": 3,
+            "jobTitle": "Full Stack Engineer",
+            "company": "Microsoft",
+            "dateApplied": "2025-08-05",
+            "status": "Applied",
+            "description": "Referred by colleague",
+            "jobUrl": "https://careers.microsoft.com/fullstack",
+            "salary": "$130,000 - $170,000",
+            "location": "Seattle, WA"
+        }
+    ]
+}
+
+
+class JobApplicationRecord(NamedTuple):
+    """Stored form of a job application, with the fields of JobApplication.
+
+    A tuple has no per-instance ``__dict__`` or validation state, so it takes a
+    fraction of the memory of a model. Records are built from data that was
+    validated on the way in; JobApplication models only exist at the API
+    boundary.
+    """
+    id: int
+    jobTitle: str
+    company: str
+    dateApplied: str
+    status: str
+    description: Optional[str] = None
+    jobUrl: Optional[str] = None
+    salary: Optional[str] = None
+    location: Optional[str] = None
+
+
+# Positions of fields whose values repeat across records; they are interned
+# so that equal values share one string object.
+INTERNED_FIELDS = tuple(
+    JobApplicationRecord._fields.index(field)
+    for field in ("jobTitle", "company", "dateApplied", "status", "salary", "location")
+)
+
+
+def intern_record(values: Sequence) -> JobApplicationRecord:
+    """Build a record from field values in declaration order."""
+    values = list(values)
+    for position in INTERNED_FIELDS:
+        value = values[position]
+        if value is not None:
+            values[position] = sys.intern(value)
+    return JobApplicationRecord._make(values)
+
+
+def make_record(id: int, source) -> JobApplicationRecord:
+    """Build a record from a validated model or command carrying the record fields."""
+    return intern_record([id] + [getattr(source, field) for field in JobApplicationRecord._fields[1:]])
+
+
+LOCK_WAIT_SECONDS = Histogram(
+    "job_tracker_lock_wait_seconds", "Time spent waiting to acquire the FileDatabase lock",
+    buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+)
+SAVE_SECONDS = Histogram("job_tracker_save_seconds", "Duration of each database snapshot write")
+SAVE_BYTES = Histogram(
+    "job_tracker_save_bytes", "Size of each database snapshot write",
+    buckets=tuple(4 ** exponent * 1024 for exponent in range(11))
+)
+LOAD_SECONDS = Gauge("job_tracker_load_seconds", "Time taken to open the database at startup")
+
+
+# Secondary indexes by name, as kept in FileDatabase._indexes
+INDEX_FACTORIES = {
+    "status": functools.partial(HashIndex, "status"),
+    "company": functools.partial(HashIndex, "company"),
+    "dateApplied": functools.partial(SortedIndex, "dateApplied"),
+    "text": TextIndex,
+    "stats": StatsIndex,
+}
+
+
+class DatabaseSnapshot(NamedTuple):
+    """Immutable view of every record as of one committed version."""
+    version: int
+    job_applications: Tuple[JobApplicationRecord, ...]
+
+
+class ChangeSet(NamedTuple):
+    """Records written and ids deleted after a sync token, with the token to sync from next."""
+    token: str
+    job_applications: List[JobApplicationRecord]
+    deleted_ids: List[int]
+    # More changes follow ``token``; sync again right away
+    has_more: bool
+
+
+def first_changes(changes: List[Tuple[int, int, bool]], limit: int) -> Tuple[List[Tuple[int, int, bool]], Optional[int]]:
+    """Order ``(version, id, deleted)`` changes by version and keep the first ``limit``.
+
+    The cut is moved to the end of the last kept version, so a batch written
+    in one commit is never split. Returns the kept changes and, if some were
+    left out, the version the kept ones end at.
+    """
+    changes.sort()
+    if len(changes) <= limit:
+        return changes, None
+    end = limit
+    last_version = changes[end - 1][0]
+    while end < len(changes) and changes[end][0] == last_version:
+        end += 1
+    if end == len(changes):
+        return changes, None
+    return changes[:end], last_version
+
+
+def encode_job_application(job_app: Optional[JobApplicationRecord]) -> bytes:
+    """Encode a record exactly as FastAPI's JSONResponse would render a JobApplication."""
+    # pydantic_core writes the same compact UTF-8 JSON as JSONResponse, about
+    # twice as fast as the json module
+    return pydantic_core.to_json(dict(zip(JobApplicationRecord._fields, job_app))) if job_app is not None else b"null"
+
+
+class JsonCache:
+    """Encoded JSON of individual records and of the latest full list.
+
+    Records were validated when they were written, so responses can reuse
+    these bytes instead of validating and encoding every record per request.
+    Each entry remembers the object it was encoded from and only counts as a
+    hit for that very object; since stored records are replaced rather than
+    mutated, readers can fill the cache without the database lock and an
+    entry for a replaced record simply stops matching.
+    """
+
+    def __init__(self):
+        self._records: Dict[int, Tuple[JobApplicationRecord, bytes]] = {}
+        self._list: Optional[Tuple[Sequence[JobApplicationRecord], bytes]] = None
+
+    def record(self, job_app: Optional[JobApplicationRecord]) -> bytes:
+        if job_app is None:
+            return b"null"
+        entry = self._records.get(job_app.id)
+        if entry is not None and entry[0] is job_app:
+            return entry[1]
+        encoded = encode_job_application(job_app)
+        self._records[job_app.id] = (job_app, encoded)
+        return encoded
+
+    def records(self, job_apps: Sequence[Optional[JobApplicationRecord]], keep: bool = False) -> bytes:
+        """Encode a JSON array, remembering it when ``keep`` is set until another list is kept."""
+        entry = self._list
+        if entry is not None and entry[0] is job_apps:
+            return entry[1]
+        encoded = b"[" + b",".join(map(self.record, job_apps)) + b"]"
+        if keep:
+            self._list = (job_apps, encoded)
+        return encoded
+
+    def discard(self, id: int):
+        self._records.pop(id, None)
+
+
 class FileDatabase:
-    def __init__(self, db_file: str = "job_applications.json"):
+    # Records written per block when saving a snapshot
+    SAVE_BLOCK_SIZE = 1000
+    
+    def __init__(self, db_file: str = "job_applications.json", write_ahead_log: bool = False,
+                 compact_after_entries: int = 10000, compact_after_bytes: int = 8 * 1024 * 1024,
+                 trusted_load: bool = True, tombstone_retention: int = 100000):
         self._db_file = db_file
-        self._lock = threading.Lock()
+        # Snapshots written by this class carry a checksum. When it matches,
+        # loading skips per-record validation; any other file is validated.
+        self._trusted_load = trusted_load
+        self._lock = InstrumentedLock(LOCK_WAIT_SECONDS)
+        # In write-ahead-log mode each mutation is appended to <db_file>.log and the
+        # snapshot is only rewritten when the log grows past one of the thresholds.
+        self._wal = WriteAheadLog(db_file + ".log") if write_ahead_log else None
+        self._compact_after_entries = compact_after_entries
+        self._compact_after_bytes = compact_after_bytes
+        self._compaction_thread = None
+        # Snapshot rewrites happen outside self._lock. _io_lock orders them and
+        # the sequence numbers let a writer skip a snapshot that a newer one
+        # has already superseded.
+        self._io_lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._written_seq = 0
+        # Bumped on every committed mutation. _snapshot holds the published
+        # read view for the current version, or None until a reader asks for it.
+        # Versions restart whenever the data is loaded, so version tags also
+        # carry an epoch that is new for every load.
+        self._version = 0
+        self._epoch = None
+        self._json_cache = JsonCache()
+        self._snapshot: Optional[DatabaseSnapshot] = None
+        # (epoch, next id, snapshot) of the last published read view, kept
+        # across writes; the next one is merged from it outside the lock.
+        # _snapshot_build_lock makes concurrent readers wait for one merge.
+        self._snapshot_base: Optional[Tuple[str, int, DatabaseSnapshot]] = None
+        self._snapshot_build_lock = threading.Lock()
+        # Every committed change is published here for the events endpoint
+        self.changes = ChangeFeed()
+        # (version, id) of the latest deletes, for get_changes. A sync token
+        # older than the newest dropped tombstone can no longer be served.
+        self._tombstones: deque = deque(maxlen=tombstone_retention)
+        self._tombstone_horizon = 0
+        # Held by _build_index, so each missing index is built once
+        self._index_build_lock = threading.Lock()
         self._ensure_db_file_exists()
         self._load_data()
     
@@ -18,119 +263,806 @@ class FileDatabase:
             self._init_sample_data()
     
     def _init_sample_data(self):
-        sample_data = {
-            "next_id": 4,
-            "job_applications": [
-                {
-                    "id": 1,
-                    "jobTitle": "Frontend Developer",
-                    "company": "OpenAI",
-                    "dateApplied": "2025-08-15",
-                    "status": "Rejected",
-                    "description": "Applied via LinkedIn. Contact: recruiter@openai.com",
-                    "jobUrl": "https://openai.com/careers/frontend-dev",
-                    "salary": "$120,000 - $150,000",
-                    "location": "San Francisco, CA"
-                },
-                {
-                    "id": 2,
-                    "jobTitle": "Backend Developer",
-                    "company": "Google",
-                    "dateApplied": "2025-08-10",
-                    "status": "Interview",
-                    "description": "Applied through company website",
-                    "jobUrl": "https://careers.google.com/backend-dev",
-                    "salary": "$140,000 - $180,000",
-                    "location": "Mountain View, CA"
-                },
-                {
-                    "id": 3,
-                    "jobTitle": "Full Stack Engineer",
-                    "company": "Microsoft",
-                    "dateApplied": "2025-08-05",
-                    "status": "Applied",
-                    "description": "Referred by colleague",
-                    "jobUrl": "https://careers.microsoft.com/fullstack",
-                    "salary": "$130,000 - $170,000",
-                    "location": "Seattle, WA"
-                }
-            ]
-        }
-        self._save_data(sample_data)
+        if self._wal is not None:
+            self._wal.reset()
+        self._save_data(SAMPLE_DATA)
     
     def _load_data(self):
+        # Keyed by id; dicts keep insertion order, so iteration still
+        # yields records in the order they were created.
+        self._next_id, self._job_applications = self._read_document(self._db_file)
+        if self._wal is not None:
+            self._replay_log()
+        self._rebuild_indexes()
+        self._json_cache = JsonCache()
+        self._version += 1
+        self._epoch = secrets.token_hex(4)
+        self._snapshot = None
+    
+    def _read_document(self, path: str) -> Tuple[int, Dict[int, JobApplicationRecord]]:
+        """Next id and records of a snapshot written by _write_document; empty if it is missing or unreadable."""
         try:
-            with open(self._db_file, 'r') as f:
-                data = json.load(f)
-                self._next_id = data.get("next_id", 1)
-                job_apps_data = data.get("job_applications", [])
-                self._job_applications = [JobApplication(**app_data) for app_data in job_apps_data]
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)
         except (FileNotFoundError, json.JSONDecodeError):
-            self._job_applications = []
-            self._next_id = 1
+            return 1, {}
+        return self._parse_document(raw, data, self._trusted_load)
+    
+    @classmethod
+    def _parse_document(cls, raw: bytes, data: dict, trusted_load: bool) -> Tuple[int, Dict[int, JobApplicationRecord]]:
+        """Next id and records of the snapshot ``data``, decoded from ``raw``.
+
+        Records are only built without validation when ``trusted_load`` is set
+        and the checksum matches.
+        """
+        job_applications: Dict[int, JobApplicationRecord] = {}
+        if trusted_load and cls._checksum_matches(raw, data):
+            fields = JobApplicationRecord._fields
+            for app_data in data.get("job_applications", []):
+                job_app = intern_record([app_data.get(field) for field in fields])
+                job_applications[job_app.id] = job_app
+        else:
+            for app_data in data.get("job_applications", []):
+                job_app = cls._load_record(app_data)
+                job_applications[job_app.id] = job_app
+        return data.get("next_id", 1), job_applications
+    
+    def _rebuild_indexes(self):
+        # Ascending ids for keyset pagination. Deleted ids are left in place and
+        # skipped when paging; the list is compacted once they outnumber live ones.
+        self._id_order: List[int] = sorted(self._job_applications)
+        self._stale_ids = 0
+        # Version in which each record was last written, for per-record version
+        # tags. Kept in version order by _record_written, so get_changes can
+        # walk back from the newest entry.
+        self._record_versions: Dict[int, int] = dict.fromkeys(self._job_applications, self._version + 1)
+        # Secondary indexes used by query_job_applications,
+        # search_job_applications and get_job_application_stats; kept in step
+        # with the primary data by _insert and _discard. The text index is the
+        # slowest to build, so it is left out until the first search needs it
+        # and then built by _build_index without holding the lock.
+        self._indexes = {name: INDEX_FACTORIES[name]() for name in INDEX_FACTORIES if name != "text"}
+        for index in self._indexes.values():
+            index.rebuild(self._job_applications.values())
+    
+    def _build_index(self, name: str):
+        """Build the secondary index ``name`` if it is missing, without holding the lock while building.
+
+        The index is built from a snapshot. Changes committed in the meantime
+        are found through _record_versions and the tombstones and applied
+        under the lock before the index is installed, so writers only wait
+        for that catch-up. If the data was reloaded, or more deletes were
+        made than the tombstones keep, the index is left for _index to
+        build under the lock.
+        """
+        if name in self._indexes:
+            return
+        with self._index_build_lock:
+            if name in self._indexes:
+                return
+            epoch = self._epoch
+            snapshot = self.snapshot()
+            index = INDEX_FACTORIES[name]()
+            index.rebuild(snapshot.job_applications)
+            built = {job_app.id: job_app for job_app in snapshot.job_applications}
+            with self._lock:
+                if self._epoch != epoch or snapshot.version < self._tombstone_horizon or name in self._indexes:
+                    return
+                for id in {id for _, id, _ in self._changes_since(snapshot.version)}:
+                    previous = built.get(id)
+                    if previous is not None:
+                        index.remove(previous)
+                    job_app = self._job_applications.get(id)
+                    if job_app is not None:
+                        index.add(job_app)
+                self._indexes[name] = index
+    
+    def _index(self, name: str):
+        """Return the secondary index ``name``, building it if _build_index could not.
+
+        Must be called while holding ``self._lock``.
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = INDEX_FACTORIES[name]()
+            index.rebuild(self._job_applications.values())
+        return index
+    
+    def _changed_indexes(self, changed: Optional[Iterable[str]]) -> list:
+        """The indexes reading any of the ``changed`` fields, or all of them if None."""
+        if changed is None:
+            return list(self._indexes.values())
+        return [index for index in self._indexes.values() if not set(index.fields).isdisjoint(changed)]
+    
+    def _insert(self, job_app: JobApplicationRecord, changed: Optional[Iterable[str]] = None):
+        """Add a new record or replace the stored record with the same id.
+
+        When only the fields in ``changed`` differ from the stored record,
+        indexes that do not read them are left alone.
+        """
+        previous = self._job_applications.get(job_app.id)
+        self._job_applications[job_app.id] = job_app
+        # Set after the record so a reader that sees the new version also sees the new data
+        self._record_written(job_app.id)
+        indexes = self._changed_indexes(changed if previous is not None else None)
+        if previous is not None:
+            for index in indexes:
+                index.remove(previous)
+        elif not self._id_order or job_app.id > self._id_order[-1]:
+            self._id_order.append(job_app.id)
+        else:
+            bisect.insort(self._id_order, job_app.id)
+        for index in indexes:
+            index.add(job_app)
+        self._json_cache.discard(job_app.id)
+    
+    def _discard(self, id: int) -> Optional[JobApplicationRecord]:
+        job_app = self._job_applications.pop(id, None)
+        if job_app is not None:
+            self._record_deleted(id)
+            self._json_cache.discard(id)
+            for index in self._indexes.values():
+                index.remove(job_app)
+            self._stale_ids += 1
+            if self._stale_ids > len(self._job_applications):
+                self._id_order = [i for i in self._id_order if i in self._job_applications]
+                self._stale_ids = 0
+        return job_app
+    
+    def _record_written(self, id: int):
+        """Stamp ``id`` with the version being committed, moving it to the end of _record_versions."""
+        versions = self._record_versions
+        versions.pop(id, None)
+        versions[id] = self._version + 1
+    
+    def _record_deleted(self, id: int):
+        self._record_versions.pop(id, None)
+        tombstones = self._tombstones
+        if len(tombstones) == tombstones.maxlen:
+            self._tombstone_horizon = tombstones[0][0]
+        tombstones.append((self._version + 1, id))
+    
+    def _replay_log(self):
+        entries = 0
+        for entry in self._wal.replay():
+            self._next_id = self._apply_log_entry(self._job_applications, self._next_id, entry)
+            entries += 1
+        self._wal.open(entries)
+        if self._wal.has_rotated():
+            # A compaction was interrupted; fold everything into the snapshot now.
+            self.compact()
+    
+    @staticmethod
+    def _load_record(data: dict) -> JobApplicationRecord:
+        # Data read from disk is validated through the model before it is stored
+        job_app = JobApplication(**data)
+        return make_record(job_app.id, job_app)
+    
+    @classmethod
+    def _apply_log_entry(cls, job_applications: Dict[int, JobApplicationRecord], next_id: int, entry: dict) -> int:
+        """Apply one write-ahead log entry to ``job_applications``. Returns the next id."""
+        if entry["op"] == "put":
+            job_app = cls._load_record(entry["record"])
+            job_applications[job_app.id] = job_app
+            next_id = max(next_id, job_app.id + 1)
+        elif entry["op"] == "patch":
+            job_app = job_applications.get(entry["id"])
+            if job_app is not None:
+                job_applications[job_app.id] = cls._load_record(dict(job_app._asdict(), **entry["fields"]))
+        elif entry["op"] == "delete":
+            job_applications.pop(entry["id"], None)
+        return next_id
     
     def _save_data(self, data=None):
         if data is None:
-            data = {
-                "next_id": self._next_id,
-                "job_applications": [app.dict() for app in self._job_applications]
-            }
-        with open(self._db_file, 'w') as f:
-            json.dump(data, f, indent=2)
-    
-    def get_all_job_applications(self) -> List[JobApplication]:
-        with self._lock:
-            return self._job_applications.copy()
+            data = self._snapshot_data(self._next_id, self._job_applications.values())
+        self._write_file(self._db_file, data)
     
-    def create_job_application(self, command: CreateJobApplicationCommand) -> int:
+    def _write_file(self, path: str, data: dict):
+        # Write to a temporary file and swap it in so a crash never leaves a
+        # half-written snapshot behind.
+        tmp_file = path + ".tmp"
+        start = time.perf_counter()
+        with open(tmp_file, 'wb') as f:
+            self._write_document(f, data)
+            size = f.tell()
+        os.replace(tmp_file, path)
+        elapsed = time.perf_counter() - start
+        SAVE_SECONDS.observe(elapsed)
+        timing.record("storage", elapsed)
+        SAVE_BYTES.observe(size)
+    
+    @classmethod
+    def _write_document(cls, f, data: dict):
+        """Write a snapshot as JSON with one record per line and a trailing checksum.
+
+        The ``checksum`` member is the SHA-256 of every byte before it, so it
+        can be verified on load without encoding the data again.
+        """
+        digest = hashlib.sha256()
+        
+        def write(text: str):
+            block = text.encode("utf-8")
+            digest.update(block)
+            f.write(block)
+        
+        write(f'{{"next_id": {json.dumps(data["next_id"])}, "job_applications": [')
+        records = data["job_applications"]
+        for start in range(0, len(records), cls.SAVE_BLOCK_SIZE):
+            block = records[start:start + cls.SAVE_BLOCK_SIZE]
+            write(("\n" if start == 0 else ",\n") + ",\n".join(json.dumps(record) for record in block))
+        write("\n], ")
+        f.write(f'"checksum": "sha256:{digest.hexdigest()}"}}\n'.encode("utf-8"))
+    
+    @staticmethod
+    def _checksum_matches(raw: bytes, data: dict) -> bool:
+        """Whether ``raw`` is a snapshot written by _write_document and left unchanged."""
+        checksum = data.get("checksum")
+        if not isinstance(checksum, str):
+            return False
+        position = raw.rfind(b'"checksum"')
+        return checksum == "sha256:" + hashlib.sha256(raw[:position]).hexdigest()
+    
+    @staticmethod
+    def _snapshot_data(next_id: int, job_applications: Iterable[JobApplicationRecord]) -> dict:
+        return {
+            "next_id": next_id,
+            "job_applications": [app._asdict() for app in job_applications]
+        }
+    
+    @contextmanager
+    def _mutation(self):
+        """Apply in-memory changes under the lock, then persist them.
+
+        The body appends log entries describing its changes to the yielded
+        list. Log appends are small and happen under the lock; a full snapshot
+        is only captured under the lock and written once it has been released,
+        so readers never wait on file I/O. The changes are published to
+        ``self.changes`` under the lock, so the feed follows commit order.
+        """
         with self._lock:
-            job_app = JobApplication(
-                id=self._next_id,
-                jobTitle=command.jobTitle,
-                company=command.company,
-                dateApplied=command.dateApplied,
-                status=command.status,
-                description=command.description,
-                jobUrl=command.jobUrl,
-                salary=command.salary,
-                location=command.location
+            first_new_id = self._next_id
+            entries = []
+            yield entries
+            flush = None
+            if entries:
+                # Clear the snapshot first: a reader that sees the new version
+                # must not be handed the previous snapshot.
+                self._snapshot = None
+                self._version += 1
+                flush = self._commit(entries)
+                self.changes.publish(changes_from_log_entries(entries, first_new_id))
+        if flush is not None:
+            flush()
+    
+    def _commit(self, entries: List[dict]) -> Optional[Callable[[], None]]:
+        """Persist mutations that have already been applied in memory.
+
+        Must be called while holding ``self._lock``. Returns a callable that
+        finishes the write and must be run after the lock is released.
+        """
+        # Records are replaced, never mutated, so the read snapshot doubles as
+        # the data for the file rewrite. It is built once the lock has been
+        # released, and may already include later writes.
+        if self._wal is None:
+            self._snapshot_seq += 1
+            return functools.partial(self._write_snapshot, self._snapshot_seq)
+        with timing.timed("storage"):
+            self._wal.append(entries)
+        if self._compaction_thread is None and (
+            self._wal.entries >= self._compact_after_entries
+            or self._wal.size >= self._compact_after_bytes
+        ):
+            self._wal.rotate()
+            self._compaction_thread = threading.Thread(
+                target=self._compact_in_background,
+                args=(self._next_id, self._publish_snapshot().job_applications),
+                daemon=True
             )
-            self._job_applications.append(job_app)
-            self._next_id += 1
+            self._compaction_thread.start()
+        return None
+    
+    def _write_snapshot(self, seq: int):
+        with self._io_lock:
+            if seq <= self._written_seq:
+                return
+            snapshot, next_id, seq = self._build_snapshot()
+            self._save_data(self._snapshot_data(next_id, snapshot.job_applications))
+            self._written_seq = seq
+    
+    def _compact_in_background(self, next_id: int, job_applications: Sequence[JobApplicationRecord]):
+        try:
+            self._save_data(self._snapshot_data(next_id, job_applications))
+            self._wal.discard_rotated()
+        finally:
+            self._compaction_thread = None
+    
+    def compact(self):
+        """Fold the write-ahead log into the snapshot synchronously."""
+        if self._wal is None:
+            return
+        with self._lock:
+            self.wait_for_compaction()
+            self._wal.rotate()
             self._save_data()
-            return job_app.id
+            self._wal.discard_rotated()
     
-    def update_job_application(self, id: int, command: UpdateJobApplicationCommand) -> bool:
+    def wait_for_compaction(self):
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+    
+    def close(self):
+        """Finish any background compaction and release the log file handle."""
+        if self._wal is not None:
+            self.wait_for_compaction()
+            self._wal.close()
+    
+    def _publish_snapshot(self) -> DatabaseSnapshot:
+        """Build and publish the read view of the current version.
+
+        Must be called while holding ``self._lock``.
+        """
+        snapshot = DatabaseSnapshot(self._version, tuple(self._job_applications.values()))
+        self._snapshot = snapshot
+        self._snapshot_base = (self._epoch, self._next_id, snapshot)
+        return snapshot
+    
+    def snapshot(self) -> DatabaseSnapshot:
+        """Return a consistent, immutable view of all records without copying.
+
+        Readers share the published snapshot and do not take the lock. Writers
+        only clear it; the first reader after a write, or the file rewrite in
+        snapshot mode, builds the next one with _build_snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._build_snapshot()[0]
+        return snapshot
+    
+    @staticmethod
+    def _replace_records(
+        job_applications: Tuple[JobApplicationRecord, ...], replaced: Dict[int, Optional[JobApplicationRecord]]
+    ) -> Tuple[JobApplicationRecord, ...]:
+        """``job_applications`` with the records in ``replaced`` swapped in by id, or dropped where None."""
+        if not replaced:
+            return job_applications
+        records = list(job_applications)
+        for id, job_app in replaced.items():
+            # Records are tuples led by their id, so a snapshot in id order
+            # can be searched for (id,)
+            position = bisect.bisect_left(job_applications, (id,))
+            if position == len(job_applications) or job_applications[position].id != id:
+                # Not in id order, as after loading a hand-edited file
+                kept = (replaced.get(job_app.id, job_app) for job_app in job_applications)
+                return tuple(job_app for job_app in kept if job_app is not None)
+            records[position] = job_app
+        return tuple(filter(None, records)) if None in replaced.values() else tuple(records)
+    
+    def _build_snapshot(self) -> Tuple[DatabaseSnapshot, int, int]:
+        """Publish the read view of the current version, with the next id and snapshot sequence number it belongs to.
+
+        Only the writes since the previous view are collected under the lock;
+        the view is merged from them once it has been released, so writers
+        wait for the number of changes rather than of records. The first view
+        of a load, or one older than the tombstone horizon, is copied under
+        the lock.
+        """
+        with self._snapshot_build_lock:
+            with self._lock:
+                epoch, next_id, seq = self._epoch, self._next_id, self._snapshot_seq
+                snapshot = self._snapshot
+                if snapshot is not None:
+                    return snapshot, next_id, seq
+                base = self._snapshot_base
+                if base is None or base[0] != epoch or base[2].version < self._tombstone_horizon:
+                    return self._publish_snapshot(), next_id, seq
+                _, base_next_id, base_snapshot = base
+                version = self._version
+                changes = self._changes_since(base_snapshot.version)
+                written = {id: self._job_applications[id] for _, id, deleted in changes if not deleted}
+                deleted = [id for _, id, deleted in changes if deleted]
+            # Ids are handed out in ascending order and never reused, so
+            # records created since the base follow it in id order, and
+            # replaced records keep their place, as in _job_applications.
+            created = tuple(written.pop(id) for id in sorted(id for id in written if id >= base_next_id))
+            # Records created since the base and deleted again are in neither
+            replaced: Dict[int, Optional[JobApplicationRecord]] = dict.fromkeys(id for id in deleted if id < base_next_id)
+            replaced.update(written)
+            snapshot = DatabaseSnapshot(version, self._replace_records(base_snapshot.job_applications, replaced) + created)
+            with self._lock:
+                if self._epoch == epoch:
+                    if self._version == version:
+                        self._snapshot = snapshot
+                    self._snapshot_base = (epoch, next_id, snapshot)
+            return snapshot, next_id, seq
+    
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+    
+    def count_job_applications(self) -> int:
+        return len(self._job_applications)
+    
+    def storage_bytes(self) -> int:
+        """Size of the database files on disk."""
+        paths = [self._db_file] + ([self._wal.path, self._wal.rotated_path] if self._wal is not None else [])
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+    
+    def version_tag(self, id: Optional[int] = None) -> Optional[str]:
+        """Return an opaque token that changes whenever the data changes.
+
+        Without ``id`` the token covers every record; with ``id`` it covers that
+        record only and is None if it does not exist. Tokens are read without
+        the lock, so take one before reading the data it describes.
+        """
+        if id is None:
+            return f"{self._epoch}-{self._version}"
+        version = self._record_versions.get(id)
+        return f"{self._epoch}-{id}-{version}" if version is not None else None
+    
+    def get_changes(self, since: str, limit: int = 1000) -> Optional[ChangeSet]:
+        """Records written and ids deleted after the version named by ``since``.
+
+        ``since`` is a token from a previous call or from version_tag(). The
+        cost grows with the number of changes, not of records. Returns None
+        if the token is from another load of the data, or older than the
+        retained tombstones; the client must then fetch every record again.
+        """
+        epoch, _, version = since.rpartition("-")
         with self._lock:
-            for job_app in self._job_applications:
-                if job_app.id == id:
-                    job_app.jobTitle = command.jobTitle
-                    job_app.company = command.company
-                    job_app.dateApplied = command.dateApplied
-                    job_app.status = command.status
-                    job_app.description = command.description
-                    job_app.jobUrl = command.jobUrl
-                    job_app.salary = command.salary
-                    job_app.location = command.location
-                    self._save_data()
-                    return True
-            return False
+            if epoch != self._epoch or not version.isdigit():
+                return None
+            version = int(version)
+            if version > self._version or version < self._tombstone_horizon:
+                return None
+            changes, end = first_changes(self._changes_since(version), limit)
+            job_apps = [self._job_applications[id] for _, id, deleted in changes if not deleted]
+            token = f"{self._epoch}-{end if end is not None else self._version}"
+        return ChangeSet(token, job_apps, [id for _, id, deleted in changes if deleted], end is not None)
+    
+    def _changes_since(self, version: int) -> List[Tuple[int, int, bool]]:
+        """``(version, id, deleted)`` of every write and delete after ``version``, newest first.
+
+        Must be called while holding ``self._lock``; deletes older than the
+        tombstone horizon are missing.
+        """
+        changes = []
+        for id, written in reversed(self._record_versions.items()):
+            if written <= version:
+                break
+            changes.append((written, id, False))
+        for deleted, id in reversed(self._tombstones):
+            if deleted <= version:
+                break
+            changes.append((deleted, id, True))
+        return changes
+    
+    def get_all_job_applications(self) -> Sequence[JobApplicationRecord]:
+        return self.snapshot().job_applications
+    
+    def iter_job_applications(self) -> Iterator[JobApplicationRecord]:
+        """Iterate over one consistent snapshot of every record without copying it."""
+        return iter(self.snapshot().job_applications)
+    
+    def create_job_application(self, command: CreateJobApplicationCommand) -> int:
+        return self.create_job_applications([command])[0]
+    
+    def update_job_application(self, id: int, command: UpdateJobApplicationCommand) -> bool:
+        return self.update_job_applications([(id, command)])[0]
     
     def delete_job_application(self, id: int) -> bool:
+        return self.delete_job_applications([id])[0]
+    
+    def create_job_applications(self, commands: List[CreateJobApplicationCommand]) -> List[int]:
+        """Create several records under one lock acquisition and one storage write.
+
+        Returns the new ids in the order of ``commands``.
+        """
+        with self._mutation() as entries:
+            ids = []
+            for command in commands:
+                job_app = make_record(self._next_id, command)
+                self._insert(job_app)
+                self._next_id += 1
+                entries.append({"op": "put", "record": job_app._asdict()})
+                ids.append(job_app.id)
+        return ids
+    
+    def update_job_applications(self, updates: List[Tuple[int, UpdateJobApplicationCommand]]) -> List[bool]:
+        """Apply several ``(id, command)`` updates with a single storage write.
+
+        Returns one flag per update, False where the id does not exist.
+        """
+        with self._mutation() as entries:
+            results = []
+            for id, command in updates:
+                if id not in self._job_applications:
+                    results.append(False)
+                    continue
+                # Replace rather than mutate so the indexes can drop the old values
+                job_app = make_record(id, command)
+                self._insert(job_app)
+                entries.append({"op": "put", "record": job_app._asdict()})
+                results.append(True)
+        return results
+    
+    def patch_job_application(self, id: int, fields: Dict[str, Optional[str]]) -> Optional[JobApplicationRecord]:
+        """Change only the given fields of a record and return the result, or None if ``id`` does not exist.
+
+        Fields whose value does not change are ignored; if none is left, the
+        stored record is returned and nothing is written, re-indexed or
+        versioned. The log entry carries only the changed fields.
+        """
+        with self._mutation() as entries:
+            job_app = self._job_applications.get(id)
+            if job_app is None:
+                return None
+            changed = {field: value for field, value in fields.items() if getattr(job_app, field) != value}
+            if not changed:
+                return job_app
+            job_app = intern_record(job_app._replace(**changed))
+            self._insert(job_app, changed)
+            entries.append({"op": "patch", "id": id, "fields": changed})
+        return job_app
+    
+    def delete_job_applications(self, ids: List[int]) -> List[bool]:
+        """Delete several records with a single storage write.
+
+        Returns one flag per id, False where the id does not exist.
+        """
+        with self._mutation() as entries:
+            results = []
+            for id in ids:
+                if self._discard(id) is None:
+                    results.append(False)
+                    continue
+                entries.append({"op": "delete", "id": id})
+                results.append(True)
+        return results
+    
+    def get_job_applications_by_ids(self, ids: List[int]) -> List[Optional[JobApplicationRecord]]:
+        """Fetch several records at once; missing ids yield None in their position."""
         with self._lock:
-            for i, job_app in enumerate(self._job_applications):
-                if job_app.id == id:
-                    del self._job_applications[i]
-                    self._save_data()
-                    return True
-            return False
+            return [self._job_applications.get(id) for id in ids]
+    
+    def get_job_application_by_id(self, id: int) -> Optional[JobApplicationRecord]:
+        # A single dict lookup is atomic and stored records are never mutated,
+        # so point reads need no lock.
+        return self._job_applications.get(id)
     
-    def get_job_application_by_id(self, id: int) -> Optional[JobApplication]:
+    def encode_job_application(self, job_app: Optional[JobApplicationRecord]) -> bytes:
+        """JSON for one record (or ``null``), reused until the record is replaced."""
+        with timing.timed("encode"):
+            return self._json_cache.record(job_app)
+    
+    def encode_job_applications(self, job_apps: Sequence[Optional[JobApplicationRecord]]) -> bytes:
+        """JSON array of records, built from the per-record cache.
+
+        The encoding of the full list from snapshot() is kept as well, so an
+        unfiltered list read costs nothing until the next write.
+        """
+        snapshot = self._snapshot
+        keep = snapshot is not None and job_apps is snapshot.job_applications
+        with timing.timed("encode"):
+            return self._json_cache.records(job_apps, keep)
+    
+    def get_job_applications_page(self, after_id: Optional[int] = None, limit: int = 100) -> Tuple[List[JobApplicationRecord], Optional[int]]:
+        """Return up to ``limit`` records with an id greater than ``after_id``, in id order.
+
+        The second element is the cursor to pass as ``after_id`` for the next
+        page, or None when this page is the last one.
+        """
         with self._lock:
-            for job_app in self._job_applications:
-                if job_app.id == id:
-                    return job_app
-            return None
+            position = 0 if after_id is None else bisect.bisect_right(self._id_order, after_id)
+            page = []
+            while position < len(self._id_order) and len(page) <= limit:
+                job_app = self._job_applications.get(self._id_order[position])
+                if job_app is not None:
+                    page.append(job_app)
+                position += 1
+        if len(page) > limit:
+            return page[:limit], page[limit - 1].id
+        return page, None
+    
+    def query_job_applications(self, status: Optional[str] = None, company: Optional[str] = None,
+                               date_from: Optional[str] = None, date_to: Optional[str] = None,
+                               sort: Optional[str] = None, after_id: Optional[int] = None,
+                               limit: Optional[int] = None,
+                               after_value: Optional[str] = None) -> Tuple[Sequence[JobApplicationRecord], Optional[int]]:
+        """Filter and sort records using the secondary indexes.
+
+        ``status`` and ``company`` match case-insensitively; ``date_from`` and
+        ``date_to`` bound ``dateApplied`` inclusively. ``sort`` names one of
+        SORTABLE_FIELDS, prefixed with ``-`` for descending order; ties and the
+        default order use the id. The smallest candidate set offered by an index
+        is scanned, so the cost is proportional to the matches rather than the
+        whole dataset; sorting by date with no other filter than a date range
+        walks the date index and only visits the page. Paging works as in
+        get_job_applications_page. A sorted page resumes after the pair
+        ``(after_value, after_id)``, the sort value and id of the last record
+        of the previous page, so it still follows on if that record has since
+        been changed or deleted. Without ``after_value`` the current sort value
+        of ``after_id`` is used.
+        """
+        descending = bool(sort) and sort.startswith("-")
+        sort_field = sort.lstrip("-") if sort else None
+        if sort_field is not None and sort_field not in SORTABLE_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort_field}'")
+        has_date_range = date_from is not None or date_to is not None
+        if status is None and company is None and not has_date_range and sort_field is None:
+            if limit is None and after_id is None:
+                return self.get_all_job_applications(), None
+            return self.get_job_applications_page(after_id, limit or 100)
+
+        for name in ("status", "company", "dateApplied"):
+            self._build_index(name)
+        with self._lock:
+            status_index = self._index("status")
+            company_index = self._index("company")
+            date_index = self._index("dateApplied")
+            after = self._job_applications.get(after_id) if after_id is not None else None
+            if after_id is not None and sort_field is not None and after_value is None:
+                if after is None:
+                    raise ValueError(f"Unknown cursor {after_id}")
+                after_value = getattr(after, sort_field) or ""
+            if sort_field == "dateApplied" and status is None and company is None:
+                ids = date_index.page(
+                    (after_value, after_id) if after_id is not None else None,
+                    limit + 1 if limit is not None else None, descending, date_from, date_to
+                )
+                page = [self._job_applications[id] for id in ids]
+                if limit is not None and len(page) > limit:
+                    return page[:limit], page[limit - 1].id
+                return page, None
+            candidates = []
+            if status is not None:
+                candidates.append(status_index.lookup(status))
+            if company is not None:
+                candidates.append(company_index.lookup(company))
+            if has_date_range:
+                if not candidates or date_index.count(date_from, date_to) < min(map(len, candidates)):
+                    candidates.append(date_index.range(date_from, date_to))
+            ids = min(candidates, key=len) if candidates else self._job_applications.keys()
+            matches = []
+            for id in ids:
+                job_app = self._job_applications.get(id)
+                if job_app is None:
+                    continue
+                if status is not None and not status_index.matches(job_app, status):
+                    continue
+                if company is not None and not company_index.matches(job_app, company):
+                    continue
+                if has_date_range and not date_index.matches(job_app, date_from, date_to):
+                    continue
+                matches.append(job_app)
+
+        # Records are replaced, never mutated, so sorting can happen outside the lock
+        if sort_field is None:
+            def sort_key(job_app):
+                return job_app.id
+        else:
+            def sort_key(job_app):
+                value = getattr(job_app, sort_field) or ""
+                return (value.casefold(), job_app.id)
+        matches.sort(key=sort_key, reverse=descending)
+
+        if after_id is not None:
+            cursor_key = after_id if sort_field is None else (after_value.casefold(), after_id)
+            keys = [sort_key(job_app) for job_app in matches]
+            if descending:
+                position = len(keys) - bisect.bisect_left(keys[::-1], cursor_key)
+            else:
+                position = bisect.bisect_right(keys, cursor_key)
+            matches = matches[position:]
+        if limit is not None and len(matches) > limit:
+            return matches[:limit], matches[limit - 1].id
+        return matches, None
+    
+    def get_job_application_stats(self) -> JobApplicationStats:
+        """Counts by status, company and week, maintained on every write.
+
+        Only the counters are copied, so the cost depends on the number of
+        distinct statuses, companies and weeks rather than on the records.
+        """
+        self._build_index("stats")
+        with self._lock:
+            summary = self._index("stats").summary()
+        return JobApplicationStats(**summary)
+    
+    def search_job_applications(self, query: str, limit: int = 20) -> List[JobApplicationRecord]:
+        """Full-text search over jobTitle, company, description and location.
+
+        Every word in ``query`` must match, either exactly or as the prefix of
+        a longer word. Results are ranked by relevance, best first.
+        """
+        self._build_index("text")
+        with self._lock:
+            ranked = self._index("text").search(query, limit)
+            return [self._job_applications[id] for id, _ in ranked]
+
+
+def read_json_database(json_file: str) -> Tuple[int, List[JobApplicationRecord]]:
+    """Next id and records of a FileDatabase JSON file, with its write-ahead log applied.
+
+    Only reads: unlike opening a FileDatabase, this never creates a missing
+    file with sample data or compacts the log. Raises FileNotFoundError if
+    ``json_file`` does not exist.
+    """
+    if not os.path.exists(json_file):
+        raise FileNotFoundError(json_file)
+    with open(json_file, "rb") as f:
+        raw = f.read()
+    next_id, job_applications = FileDatabase._parse_document(raw, json.loads(raw), trusted_load=True)
+    for entry in WriteAheadLog(json_file + ".log").replay():
+        next_id = FileDatabase._apply_log_entry(job_applications, next_id, entry)
+    return next_id, list(job_applications.values())
+
+
+class AsyncDatabase:
+    """Awaitable facade over a database engine.
+
+    Every method of the wrapped engine is exposed as a coroutine that runs the
+    blocking call on a dedicated thread pool, so route handlers can await file
+    I/O and lock waits without stalling the event loop. Context variables are
+    carried over to the worker thread, as asyncio.to_thread does, and calls
+    made by a profiled request are profiled on the worker thread.
+    """
+
+    def __init__(self, database, max_workers: int = 8):
+        self.database = database
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="database")
+
+    def __getattr__(self, name: str):
+        method = getattr(self.database, name)
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(context.run, profiling.profiled(method), *args, **kwargs)
+            )
+
+        return call
+
+
+def create_database():
+    """Build the storage engine selected by the environment.
+
+    ``JOB_TRACKER_DB_ENGINE`` is ``file`` (the default), ``binary``, ``sharded``
+    or ``sqlite``, and ``JOB_TRACKER_DB_FILE`` overrides the engine's default file
+    name. With the file engine, ``JOB_TRACKER_WRITE_AHEAD_LOG=1`` turns on
+    write-ahead log mode; ``JOB_TRACKER_SHARDS`` sets the number of shards a new
+    sharded database is created with. Only the sqlite engine may be shared by several
+    worker processes.
+    """
+    engine = os.environ.get("JOB_TRACKER_DB_ENGINE", "file").lower()
+    db_file = os.environ.get("JOB_TRACKER_DB_FILE")
+    start = time.perf_counter()
+    if engine == "sqlite":
+        from sqlite_database import SqliteDatabase
+        database = SqliteDatabase(db_file or "job_applications.db", import_from="job_applications.json")
+    elif engine == "binary":
+        from binary_database import BinaryDatabase
+        database = BinaryDatabase(db_file or "job_applications.bin", import_from="job_applications.json")
+    elif engine == "sharded":
+        from sharded_database import ShardedDatabase
+        database = ShardedDatabase(
+            db_file or "job_applications.shards",
+            shards=int(os.environ.get("JOB_TRACKER_SHARDS", "8")),
+            import_from="job_applications.json"
+        )
+    elif engine == "file":
+        database = FileDatabase(
+            db_file or "job_applications.json",
+            write_ahead_log=os.environ.get("JOB_TRACKER_WRITE_AHEAD_LOG") == "1"
+        )
+    else:
+        raise ValueError(f"Unknown database engine '{engine}'")
+    LOAD_SECONDS.set(time.perf_counter() - start)
+    return database
 
 
-db = FileDatabase()
\ No newline at end of file
+db = create_database()
+async_db = AsyncDatabase(db)
\ No newline at end of file
@@ -0,0 +1,288 @@
+from typing import Dict, Iterable, KeysView, List, Optional, Tuple
+from datetime import date, timedelta
+import bisect
+import functools
+import heapq
+import math
+import re
+
+
+class HashIndex:
+    """Equality index from a field value to the ids of the records holding it.
+
+    Values are compared case-insensitively, so ``Interview`` and ``interview``
+    land in the same bucket.  Each bucket is a dict used as an ordered set,
+    which keeps add and remove O(1).
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        # Record fields the index reads; an update leaving them alone skips the index
+        self.fields = (field,)
+        self._buckets: Dict[Optional[str], Dict[int, None]] = {}
+
+    @staticmethod
+    def normalize(value: Optional[str]) -> Optional[str]:
+        return value.casefold() if value is not None else None
+
+    def rebuild(self, records: Iterable):
+        self._buckets = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        key = self.normalize(getattr(record, self.field))
+        self._buckets.setdefault(key, {})[record.id] = None
+
+    def remove(self, record):
+        key = self.normalize(getattr(record, self.field))
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(record.id, None)
+            if not bucket:
+                del self._buckets[key]
+
+    def lookup(self, value: str) -> KeysView:
+        return self._buckets.get(self.normalize(value), {}).keys()
+
+    def matches(self, record, value: str) -> bool:
+        return self.normalize(getattr(record, self.field)) == self.normalize(value)
+
+
+class SortedIndex:
+    """Ordered index of ``(value, id)`` pairs that answers range queries with bisect."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.fields = (field,)
+        self._entries: List[Tuple[str, int]] = []
+
+    def _entry(self, record) -> Tuple[str, int]:
+        return (getattr(record, self.field) or "", record.id)
+
+    def rebuild(self, records: Iterable):
+        self._entries = sorted(self._entry(record) for record in records)
+
+    def add(self, record):
+        bisect.insort(self._entries, self._entry(record))
+
+    def remove(self, record):
+        entry = self._entry(record)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def _bounds(self, low: Optional[str], high: Optional[str]) -> Tuple[int, int]:
+        start = 0 if low is None else bisect.bisect_left(self._entries, (low,))
+        # Every entry whose value equals ``high`` sorts before (high, +inf).
+        end = len(self._entries) if high is None else bisect.bisect_right(self._entries, (high, float("inf")))
+        return start, max(start, end)
+
+    def count(self, low: Optional[str] = None, high: Optional[str] = None) -> int:
+        start, end = self._bounds(low, high)
+        return end - start
+
+    def range(self, low: Optional[str] = None, high: Optional[str] = None) -> List[int]:
+        """Ids whose value lies in ``[low, high]``, ordered by value then id."""
+        start, end = self._bounds(low, high)
+        return [id for _, id in self._entries[start:end]]
+
+    def page(self, after: Optional[Tuple[str, int]] = None, limit: Optional[int] = None, descending: bool = False,
+             low: Optional[str] = None, high: Optional[str] = None) -> List[int]:
+        """Up to ``limit`` ids in ``[low, high]`` that follow the ``(value, id)`` pair ``after``.
+
+        Ids come ordered by value then id, or the reverse with ``descending``;
+        only the entries returned are visited.
+        """
+        start, end = self._bounds(low, high)
+        if descending:
+            if after is not None:
+                end = max(start, min(end, bisect.bisect_left(self._entries, after)))
+            first = start if limit is None else max(start, end - limit)
+            return [id for _, id in reversed(self._entries[first:end])]
+        if after is not None:
+            start = min(end, max(start, bisect.bisect_right(self._entries, after)))
+        stop = end if limit is None else min(end, start + limit)
+        return [id for _, id in self._entries[start:stop]]
+
+    def matches(self, record, low: Optional[str], high: Optional[str]) -> bool:
+        value = getattr(record, self.field) or ""
+        return (low is None or value >= low) and (high is None or value <= high)
+
+
+class TextIndex:
+    """Inverted index from lower-cased tokens to the records containing them.
+
+    Each posting stores a weighted term frequency: a token in ``jobTitle``
+    counts more than one in ``description``. The vocabulary is kept sorted so
+    a query term also matches every token it is a prefix of. Removing a record
+    re-tokenizes it, which works because stored records are never mutated.
+    """
+
+    FIELD_WEIGHTS = {"jobTitle": 3.0, "company": 2.0, "location": 1.0, "description": 1.0}
+    fields = tuple(FIELD_WEIGHTS)
+    TOKEN_PATTERN = re.compile(r"\w+")
+    # BM25 term-frequency saturation
+    K1 = 1.2
+    # Prefix matches score below whole-word matches
+    PREFIX_PENALTY = 0.5
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._vocabulary: List[str] = []
+        self._documents = 0
+
+    @classmethod
+    def tokenize(cls, text: Optional[str]) -> List[str]:
+        return cls.TOKEN_PATTERN.findall(text.casefold()) if text else []
+
+    def _terms(self, record) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            for token in self.tokenize(getattr(record, field)):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    def rebuild(self, records: Iterable):
+        self._postings = {}
+        self._documents = 0
+        for record in records:
+            self._documents += 1
+            for token, weight in self._terms(record).items():
+                self._postings.setdefault(token, {})[record.id] = weight
+        self._vocabulary = sorted(self._postings)
+
+    def add(self, record):
+        self._documents += 1
+        for token, weight in self._terms(record).items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+            postings[record.id] = weight
+
+    def remove(self, record):
+        self._documents -= 1
+        for token in self._terms(record):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(record.id, None)
+            if not postings:
+                del self._postings[token]
+                position = bisect.bisect_left(self._vocabulary, token)
+                del self._vocabulary[position]
+
+    def _expand(self, term: str) -> List[Tuple[Dict[int, float], float]]:
+        """Postings of every token starting with ``term``, with their score multiplier."""
+        expansions = []
+        position = bisect.bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            token = self._vocabulary[position]
+            postings = self._postings[token]
+            idf = math.log(1 + self._documents / len(postings))
+            expansions.append((postings, idf if token == term else idf * self.PREFIX_PENALTY))
+            position += 1
+        return expansions
+
+    def _term_scores(self, expansions, candidates: Optional[Dict[int, float]]) -> Dict[int, float]:
+        """Score one query term, restricted to ``candidates`` when that is cheaper."""
+        scores: Dict[int, float] = {}
+        k1 = self.K1
+        size = sum(len(postings) for postings, _ in expansions)
+        if candidates is not None and len(candidates) * len(expansions) < size:
+            for postings, multiplier in expansions:
+                for id in candidates:
+                    tf = postings.get(id)
+                    if tf is not None:
+                        scores[id] = scores.get(id, 0.0) + multiplier * tf * (k1 + 1) / (tf + k1)
+        else:
+            for postings, multiplier in expansions:
+                for id, tf in postings.items():
+                    scores[id] = scores.get(id, 0.0) + multiplier * tf * (k1 + 1) / (tf + k1)
+        return scores
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """Return up to ``limit`` ``(id, score)`` pairs matching every query term, best first."""
+        terms = [self._expand(term) for term in dict.fromkeys(self.tokenize(query))]
+        if not terms or not all(terms):
+            return []
+        # Start from the term with the fewest postings so later terms only need
+        # to probe the surviving candidates.
+        terms.sort(key=lambda expansions: sum(len(postings) for postings, _ in expansions))
+        scores = self._term_scores(terms[0], None)
+        for expansions in terms[1:]:
+            if not scores:
+                return []
+            term_scores = self._term_scores(expansions, scores)
+            scores = {id: score + term_scores[id] for id, score in scores.items() if id in term_scores}
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+@functools.lru_cache(maxsize=4096)
+def week_start(value: Optional[str]) -> Optional[str]:
+    """Monday of the week containing a ``YYYY-MM-DD`` date, or None if it is not one."""
+    if not value or not DATE_PATTERN.fullmatch(value):
+        return None
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return None
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+class StatsIndex:
+    """Running counts by status, by company and by week of ``dateApplied``.
+
+    Adding or removing a record adjusts three counters, so an update that
+    changes the status moves one count between buckets. Buckets that drop to
+    zero are deleted, and records whose date is not ``YYYY-MM-DD`` are left
+    out of the weekly counts.
+    """
+
+    fields = ("status", "company", "dateApplied")
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Dict[str, int] = {}
+        self.by_company: Dict[str, int] = {}
+        self.by_week: Dict[str, int] = {}
+
+    @staticmethod
+    def _adjust(counts: Dict[str, int], key: Optional[str], delta: int):
+        if key is None:
+            return
+        count = counts.get(key, 0) + delta
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+
+    def rebuild(self, records: Iterable):
+        self.__init__()
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        self.total += 1
+        self._adjust(self.by_status, record.status, 1)
+        self._adjust(self.by_company, record.company, 1)
+        self._adjust(self.by_week, week_start(record.dateApplied), 1)
+
+    def remove(self, record):
+        self.total -= 1
+        self._adjust(self.by_status, record.status, -1)
+        self._adjust(self.by_company, record.company, -1)
+        self._adjust(self.by_week, week_start(record.dateApplied), -1)
+
+    def summary(self) -> dict:
+        """Copy of the counts, with weeks in chronological order."""
+        return {
+            "total": self.total,
+            "byStatus": dict(self.by_status),
+            "byCompany": dict(self.by_company),
+            "byWeek": dict(sorted(self.by_week.items())),
+        }
@@ -1,9 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, RedirectResponse
-from typing import List
-from models import JobApplication, CreateJobApplicationCommand, UpdateJobApplicationCommand
-from database import db
+from fastapi.responses import FileResponse, PlainTextResponse, Response, RedirectResponse, StreamingResponse
+from typing import Any, List, Optional, Tuple
+from datetime import date
+import json
+from models import (
+    JobApplication,
+    CreateJobApplicationCommand,
+    UpdateJobApplicationCommand,
+    PatchJobApplicationCommand,
+    BulkUpdateJobApplicationCommand,
+    BulkOperationResult,
+    ImportResult,
+    JobApplicationChanges,
+    JobApplicationStats,
+)
+from database import async_db
+from metrics import REGISTRY, Counter, Gauge, Histogram, RequestMetricsMiddleware
+from timing import ServerTimingMiddleware
+from profiling import ProfilingMiddleware
+import profiling
+from streaming import csv_export, import_rows, iter_lines, ndjson_export, parse_csv, parse_ndjson, validation_error_message
+from pydantic import ValidationError
 
 app = FastAPI(title="Job Tracker API", version="v1", docs_url="/swagger", redoc_url="/redoc")
 app.title = "Job Tracker API"
@@ -17,45 +35,404 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["Link", "X-Next-Cursor", "ETag", "Server-Timing"],  # Pagination, caching and timing headers readable by browsers
+)
+
+HTTP_REQUESTS = Counter(
+    "job_tracker_http_requests_total", "HTTP requests by method, route template and status code.",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "job_tracker_http_request_seconds", "Time from receiving an HTTP request to sending its response.",
+    ("method", "route"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
 )
+app.add_middleware(RequestMetricsMiddleware, requests=HTTP_REQUESTS, duration=HTTP_REQUEST_SECONDS)
+# Lock, storage and encoding times per request; switched with timing.SETTINGS
+app.add_middleware(ServerTimingMiddleware)
+# cProfile for requests sent with X-Profile: 1 or sampled; switched with profiling.SETTINGS.
+# Streams are left out: a profile would last until the client disconnects.
+app.add_middleware(ProfilingMiddleware, excluded_paths=("/api/JobApplications/events", "/api/JobApplications/export"))
+
+# Read from whichever engine is serving when the metrics are rendered
+Gauge("job_tracker_records", "Job applications currently stored.").set_function(
+    lambda: async_db.database.count_job_applications()
+)
+Gauge("job_tracker_storage_bytes", "Size of the database files on disk.").set_function(
+    lambda: async_db.database.storage_bytes()
+)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_SIZE = 10000
+DEFAULT_CHANGES_SIZE = 1000
+
+NOT_FOUND = "Job application not found"
+
+
+def _check_bulk_size(count: int):
+    if count > MAX_BULK_SIZE:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {MAX_BULK_SIZE} items")
+
+
+async def _json_list(job_apps, response: Response) -> Response:
+    """Send records as pre-encoded JSON, skipping response_model validation.
+
+    Records were validated when they were stored; the database caches their
+    encoding, so only records changed since the last read are encoded again.
+    """
+    content = await async_db.encode_job_applications(job_apps)
+    return Response(content=content, media_type="application/json", headers=response.headers)
+
+
+def _bulk_body(model) -> dict:
+    """OpenAPI request body for a batch of ``model`` items validated one by one in the handler."""
+    schema = {"type": "array", "items": model.model_json_schema()}
+    return {"requestBody": {"content": {"application/json": {"schema": schema}}, "required": True}}
+
+
+def _validate_items(model, items: List[Any]) -> list:
+    """Validate each item on its own: the model, or the error message for an invalid item."""
+    validated = []
+    for item in items:
+        try:
+            validated.append(model.model_validate(item))
+        except ValidationError as e:
+            validated.append(validation_error_message(e))
+    return validated
+
+
+def _parse_cursor(cursor: str) -> Tuple[int, Optional[str]]:
+    """Split an ``after_id`` cursor into the id and, for sorted pages, the sort value it follows."""
+    id, separator, value = cursor.partition(":")
+    if not id.lstrip("-").isdigit():
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+    return int(id), value if separator else None
+
+
+def _next_cursor(job_app, sort: Optional[str]) -> str:
+    """Cursor resuming after ``job_app``: its id, and its sort value when the page is sorted.
+
+    Carrying the value lets the next page follow on even if the record is
+    changed or deleted in between.
+    """
+    if sort is None:
+        return str(job_app.id)
+    return f"{job_app.id}:{getattr(job_app, sort.lstrip('-')) or ''}"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Evaluate If-None-Match with the weak comparison RFC 9110 requires for GET."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+async def _conditional_get(request: Request, response: Response, id: Optional[int] = None) -> Optional[Response]:
+    """Set ETag for the data (or one record) and return a 304 response if the client has it.
+
+    The version tag is taken before the data is read, so the data sent with
+    an ETag is never older than the version it names.
+    """
+    tag = await async_db.version_tag(id)
+    if tag is None:
+        return None
+    etag = f'"{tag}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    # Let browsers store the response but revalidate it on every use
+    response.headers["Cache-Control"] = "no-cache"
+    return None
 
 # Send interactive user to swagger page by default
 @app.get("/")
 async def redirect_to_swagger():
     return RedirectResponse(url="/swagger")
 
+# A plain function, so FastAPI runs it on a worker thread: the gauges may stat
+# files or query the database
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _check_profiling_enabled():
+    if not profiling.SETTINGS.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+@app.get("/debug/profiles", include_in_schema=False)
+def get_profiles(limit: int = Query(100, ge=1, le=1000)):
+    _check_profiling_enabled()
+    return profiling.list_profiles(profiling.SETTINGS.directory, limit)
+
+@app.get("/debug/profiles/{id}", include_in_schema=False)
+def get_profile(
+    id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="text report or the raw pstats file"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(40, ge=1, description="functions listed in the text report"),
+):
+    _check_profiling_enabled()
+    path = profiling.profile_path(profiling.SETTINGS.directory, id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{id}.prof")
+    return PlainTextResponse(profiling.profile_summary(path, sort, limit))
+
 @app.get("/api/JobApplications", response_model=List[JobApplication], tags=["JobApplications"], operation_id="GetJobApplications")
-async def get_job_applications():
-    return db.get_all_job_applications()
+async def get_job_applications(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    after_id: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; in id order, the id to continue after"),
+    status: Optional[str] = Query(None, description="Case-insensitive status filter"),
+    company: Optional[str] = Query(None, description="Case-insensitive company filter"),
+    dateFrom: Optional[date] = Query(None, description="Earliest dateApplied, inclusive"),
+    dateTo: Optional[date] = Query(None, description="Latest dateApplied, inclusive"),
+    sort: Optional[str] = Query(None, pattern="^-?(status|company|dateApplied)$", description="Sort field, prefix with - for descending"),
+):
+    not_modified = await _conditional_get(request, response)
+    if not_modified is not None:
+        return not_modified
+    # Without paging parameters the whole result is returned, as older clients expect
+    page_size = None
+    if limit is not None or after_id is not None:
+        page_size = limit or DEFAULT_PAGE_SIZE
+    cursor_id, cursor_value = _parse_cursor(after_id) if after_id is not None else (None, None)
+    try:
+        page, next_cursor = await async_db.query_job_applications(
+            status=status,
+            company=company,
+            date_from=dateFrom.isoformat() if dateFrom else None,
+            date_to=dateTo.isoformat() if dateTo else None,
+            sort=sort,
+            after_id=cursor_id,
+            limit=page_size,
+            after_value=cursor_value,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor is not None:
+        cursor = _next_cursor(page[-1], sort)
+        next_url = request.url.include_query_params(limit=page_size, after_id=cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+        response.headers["X-Next-Cursor"] = cursor
+    return await _json_list(page, response)
+
+
+@app.get("/api/JobApplications/search", response_model=List[JobApplication], tags=["JobApplications"], operation_id="SearchJobApplications")
+async def search_job_applications(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, description="Words to search for; each word also matches as a prefix"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+):
+    not_modified = await _conditional_get(request, response)
+    if not_modified is not None:
+        return not_modified
+    return await _json_list(await async_db.search_job_applications(q, limit), response)
+
+
+@app.get(
+    "/api/JobApplications/events",
+    tags=["JobApplications"],
+    operation_id="GetJobApplicationEvents",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def get_job_application_events(
+    after: Optional[str] = Query(None, description="Event id to resume after; defaults to the current position"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    # Each client only holds its position in the shared feed; see changefeed.py
+    feed = getattr(async_db.database, "changes", None)
+    if feed is None:
+        raise HTTPException(status_code=501, detail="This storage engine does not publish changes")
+    return StreamingResponse(
+        feed.stream(after if after is not None else last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/JobApplications/changes", response_model=JobApplicationChanges, tags=["JobApplications"], operation_id="GetJobApplicationChanges")
+async def get_job_application_changes(
+    since: Optional[str] = Query(None, description="Token from the previous sync, or a list ETag; omit for a full sync"),
+    limit: int = Query(DEFAULT_CHANGES_SIZE, ge=1, le=MAX_BULK_SIZE, description="Changes per response; a commit is never split"),
+):
+    if since is None:
+        # Taken before the read, so changes made meanwhile are sent again next time
+        token = await async_db.version_tag()
+        job_apps, deleted, has_more = await async_db.get_all_job_applications(), [], False
+    else:
+        # Accept an ETag header value as sent: quoted, possibly weak
+        changes = await async_db.get_changes(since.strip().removeprefix("W/").strip('"'), limit)
+        if changes is None:
+            raise HTTPException(status_code=410, detail="Sync token has expired; sync again without one")
+        token, job_apps, deleted, has_more = changes
+    content = (
+        b'{"token":' + json.dumps(token).encode() + b',"hasMore":' + (b"true" if has_more else b"false")
+        + b',"records":' + await async_db.encode_job_applications(job_apps)
+        + b',"deleted":' + json.dumps(deleted, separators=(",", ":")).encode() + b"}"
+    )
+    return Response(content=content, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+
+@app.get("/api/JobApplications/stats", response_model=JobApplicationStats, tags=["JobApplications"], operation_id="GetJobApplicationStats")
+async def get_job_application_stats(request: Request, response: Response):
+    # Counters are maintained on every write; reading them never scans the records
+    not_modified = await _conditional_get(request, response)
+    if not_modified is not None:
+        return not_modified
+    return await async_db.get_job_application_stats()
+
+
+@app.get(
+    "/api/JobApplications/export",
+    tags=["JobApplications"],
+    operation_id="ExportJobApplications",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_job_applications(format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv")):
+    # Streams one consistent snapshot; memory use does not depend on the record count
+    job_apps = await async_db.iter_job_applications()
+    if format == "csv":
+        return StreamingResponse(
+            csv_export(job_apps),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="job_applications.csv"'},
+        )
+    return StreamingResponse(ndjson_export(job_apps), media_type="application/x-ndjson")
+
+
+@app.post(
+    "/api/JobApplications/import",
+    response_model=ImportResult,
+    tags=["JobApplications"],
+    operation_id="ImportJobApplications",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def import_job_applications(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv")):
+    # The body is parsed as it arrives and committed in chunks, so neither
+    # side has to hold the whole upload in memory. Rows that fail parsing or
+    # validation are listed by line number; valid rows are still imported.
+    lines = iter_lines(request.stream())
+    rows = parse_csv(lines) if format == "csv" else parse_ndjson(lines)
+    return await import_rows(rows, async_db.create_job_applications)
+
+
+@app.get("/api/JobApplications/bulk", response_model=List[Optional[JobApplication]], tags=["JobApplications"], operation_id="GetJobApplicationsByIds")
+async def get_job_applications_by_ids(
+    request: Request,
+    response: Response,
+    ids: List[int] = Query(..., description="Ids to fetch; missing ids yield null"),
+):
+    _check_bulk_size(len(ids))
+    not_modified = await _conditional_get(request, response)
+    if not_modified is not None:
+        return not_modified
+    return await _json_list(await async_db.get_job_applications_by_ids(ids), response)
+
+
+# Batch items are validated one by one, so an invalid item fails on its own
+# instead of failing the whole request with a 422.
+@app.post(
+    "/api/JobApplications/bulk",
+    response_model=List[BulkOperationResult],
+    tags=["JobApplications"],
+    operation_id="CreateJobApplications",
+    openapi_extra=_bulk_body(CreateJobApplicationCommand),
+)
+async def create_job_applications(items: List[Any] = Body(...)):
+    _check_bulk_size(len(items))
+    validated = _validate_items(CreateJobApplicationCommand, items)
+    ids = iter(await async_db.create_job_applications([item for item in validated if not isinstance(item, str)]))
+    return [
+        BulkOperationResult(success=False, error=item) if isinstance(item, str) else BulkOperationResult(id=next(ids), success=True)
+        for item in validated
+    ]
+
+
+@app.put(
+    "/api/JobApplications/bulk",
+    response_model=List[BulkOperationResult],
+    tags=["JobApplications"],
+    operation_id="UpdateJobApplications",
+    openapi_extra=_bulk_body(BulkUpdateJobApplicationCommand),
+)
+async def update_job_applications(items: List[Any] = Body(...)):
+    _check_bulk_size(len(items))
+    validated = _validate_items(BulkUpdateJobApplicationCommand, items)
+    commands = [item for item in validated if not isinstance(item, str)]
+    results = iter(await async_db.update_job_applications([(command.id, command) for command in commands]))
+    response = []
+    for item, validated_item in zip(items, validated):
+        if isinstance(validated_item, str):
+            id = item.get("id") if isinstance(item, dict) else None
+            response.append(BulkOperationResult(id=id if isinstance(id, int) else None, success=False, error=validated_item))
+        else:
+            success = next(results)
+            response.append(BulkOperationResult(id=validated_item.id, success=success, error=None if success else NOT_FOUND))
+    return response
+
+
+@app.post("/api/JobApplications/bulk/delete", response_model=List[BulkOperationResult], tags=["JobApplications"], operation_id="DeleteJobApplications")
+async def delete_job_applications(ids: List[int]):
+    _check_bulk_size(len(ids))
+    results = await async_db.delete_job_applications(ids)
+    return [
+        BulkOperationResult(id=id, success=success, error=None if success else NOT_FOUND)
+        for id, success in zip(ids, results)
+    ]
 
 
 @app.get("/api/JobApplications/{id}", response_model=JobApplication, tags=["JobApplications"], operation_id="GetJobApplication")
-async def get_job_application(id: int):
-    job_app = db.get_job_application_by_id(id)
+async def get_job_application(id: int, request: Request, response: Response):
+    not_modified = await _conditional_get(request, response, id)
+    if not_modified is not None:
+        return not_modified
+    job_app = await async_db.get_job_application_by_id(id)
     if not job_app:
-        raise HTTPException(status_code=404, detail="Job application not found")
-    return job_app
+        raise HTTPException(status_code=404, detail=NOT_FOUND)
+    content = await async_db.encode_job_application(job_app)
+    return Response(content=content, media_type="application/json", headers=response.headers)
 
 
 @app.post("/api/JobApplications", response_model=int, tags=["JobApplications"], operation_id="CreateJobApplication")
 async def create_job_application(command: CreateJobApplicationCommand):
-    job_app_id = db.create_job_application(command)
+    job_app_id = await async_db.create_job_application(command)
     return job_app_id
 
 
 @app.put("/api/JobApplications/{id}", tags=["JobApplications"], operation_id="UpdateJobApplication")
 async def update_job_application(id: int, command: UpdateJobApplicationCommand):
-    success = db.update_job_application(id, command)
+    success = await async_db.update_job_application(id, command)
     if not success:
-        raise HTTPException(status_code=404, detail="Job application not found")
+        raise HTTPException(status_code=404, detail=NOT_FOUND)
     
     return Response(status_code=200)
 
 
+@app.patch("/api/JobApplications/{id}", response_model=JobApplication, tags=["JobApplications"], operation_id="PatchJobApplication")
+async def patch_job_application(id: int, command: PatchJobApplicationCommand):
+    # Only the fields present in the body are changed; a patch that changes
+    # nothing is not written
+    job_app = await async_db.patch_job_application(id, command.model_dump(exclude_unset=True))
+    if job_app is None:
+        raise HTTPException(status_code=404, detail=NOT_FOUND)
+    content = await async_db.encode_job_application(job_app)
+    return Response(content=content, media_type="application/json")
+
+
 @app.delete("/api/JobApplications/{id}", tags=["JobApplications"], operation_id="DeleteJobApplication")
 async def delete_job_application(id: int):
-    success = db.delete_job_application(id)
+    success = await async_db.delete_job_application(id)
     if not success:
-        raise HTTPException(status_code=404, detail="Job application not found")
+        raise HTTPException(status_code=404, detail=NOT_FOUND)
     
     return Response(status_code=200)
@@ -0,0 +1,282 @@
+"""Prometheus text-format metrics using only the standard library.
+
+Metrics are created at module level next to the code they measure and
+register themselves with REGISTRY, which /metrics renders. Updates take a
+per-series lock, so they are safe from the database threads and cost well
+under a microsecond.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import bisect
+import math
+import threading
+import time
+
+import timing
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Registry:
+    """The metrics rendered by one /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: List["Metric"] = []
+
+    def register(self, metric: "Metric"):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """A named metric family whose series are selected with labels()."""
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._children_lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._child()
+        registry.register(self)
+
+    def _child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the series for ``values``, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._children_lock:
+                child = self._children.setdefault(values, self._child())
+        return child
+
+    def _series(self) -> List[Tuple[str, object]]:
+        with self._children_lock:
+            items = list(self._children.items())
+        return [(_format_labels(self.labelnames, values), child) for values, child in items]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "function", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from ``function`` whenever the metrics are rendered."""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+
+class Counter(Metric):
+    """A value that only goes up; its name should end in ``_total``."""
+    type = "counter"
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{labels} {_format_value(child.get())}" for labels, child in self._series()]
+
+
+class Gauge(Counter):
+    """A value that is set, or computed when the metrics are rendered."""
+    type = "gauge"
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._children[()].set_function(function)
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        position = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.sum += value
+
+    def time(self) -> "_Timer":
+        """Context manager that observes the seconds spent in its body."""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("_buckets", "_start")
+
+    def __init__(self, buckets: _Buckets):
+        self._buckets = buckets
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._buckets.observe(time.perf_counter() - self._start)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class Histogram(Metric):
+    """Counts of observations in cumulative ``le`` buckets, with their sum and count."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def time(self) -> _Timer:
+        return self._children[()].time()
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, child in self._series():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            prefix = labels[:-1] + "," if labels else "{"
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{prefix}le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class InstrumentedLock:
+    """threading.Lock that records how long each acquisition waited.
+
+    An uncontended acquisition is recorded as a zero wait without reading
+    the clock.
+    """
+
+    def __init__(self, wait_seconds: Histogram):
+        self._lock = threading.Lock()
+        self._wait = wait_seconds._children[()]
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            self._wait.observe(0.0)
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        if acquired:
+            wait = time.perf_counter() - start
+            self._wait.observe(wait)
+            timing.record("lock", wait)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware counting HTTP requests and timing them per route.
+
+    Requests are labelled with the route's path template rather than the
+    URL, so ``/api/JobApplications/{id}`` is one series however many ids are
+    requested. The duration runs until the response has been sent, which
+    includes streaming the body.
+    """
+
+    def __init__(self, app, requests: Counter, duration: Histogram):
+        self.app = app
+        self.requests = requests
+        self.duration = duration
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            self.duration.labels(method, path).observe(elapsed)
+            self.requests.labels(method, path, str(status)).inc()
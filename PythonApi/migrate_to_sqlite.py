@@ -0,0 +1,24 @@
+# migrate_to_sqlite.py
+
+"""Copy the JSON file database (and its write-ahead log, if any) into SQLite.
+
+Usage: python migrate_to_sqlite.py [json_file] [sqlite_file]
+"""
+
+import sys
+from sqlite_database import SqliteDatabase
+
+
+def main(argv):
+    json_file = argv[1] if len(argv) > 1 else "job_applications.json"
+    sqlite_file = argv[2] if len(argv) > 2 else "job_applications.db"
+    database = SqliteDatabase(sqlite_file)
+    try:
+        count = database.import_json(json_file)
+    finally:
+        database.close()
+    print(f"Imported {count} job applications from {json_file} into {sqlite_file}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import Dict, List, Optional
 from datetime import date
 
 
@@ -34,4 +34,58 @@ class UpdateJobApplicationCommand(BaseModel):
     description: Optional[str] = None
     jobUrl: Optional[str] = None
     salary: Optional[str] = None
-    location: Optional[str] = None
\ No newline at end of file
+    location: Optional[str] = None
+
+
+class PatchJobApplicationCommand(BaseModel):
+    """The fields to change; fields left out of the request keep their value."""
+    jobTitle: Optional[str] = None
+    company: Optional[str] = None
+    dateApplied: Optional[str] = None
+    status: Optional[str] = None
+    description: Optional[str] = None
+    jobUrl: Optional[str] = None
+    salary: Optional[str] = None
+    location: Optional[str] = None
+
+    @model_validator(mode="after")
+    def required_fields_not_null(self):
+        for field in ("jobTitle", "company", "dateApplied", "status"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
+class BulkUpdateJobApplicationCommand(UpdateJobApplicationCommand):
+    id: int
+
+
+class BulkOperationResult(BaseModel):
+    id: Optional[int] = None
+    success: bool
+    error: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+
+
+class JobApplicationChanges(BaseModel):
+    token: str
+    hasMore: bool
+    records: List[JobApplication]
+    deleted: List[int]
+
+
+class JobApplicationStats(BaseModel):
+    total: int
+    byStatus: Dict[str, int]
+    byCompany: Dict[str, int]
+    byWeek: Dict[str, int]
\ No newline at end of file
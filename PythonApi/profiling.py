@@ -0,0 +1,213 @@
+"""Opt-in cProfile profiling of individual requests.
+
+With profiling enabled, a request is profiled when it carries
+``X-Profile: 1`` or is picked at the sampling rate. One profiler runs for
+the whole request and is saved as a pstats file with a JSON description
+next to it. Only the newest ``keep`` profiles are kept.
+
+From Python 3.12 cProfile is built on sys.monitoring, which allows one
+profiler per interpreter and reports calls on every thread, so that
+profiler also covers the database calls on AsyncDatabase's worker threads.
+Before 3.12 a profiler only sees the thread that enabled it, so each
+database call the request makes gets a profiler of its own on its worker
+thread, merged into the request's profile when it is saved.
+
+cProfile sees everything on the threads it covers, so work for other
+requests served at the same time appears in a profile. Only one request is
+profiled at a time; a request that would overlap a running profile is
+served unprofiled, as are streaming endpoints, which would hold the
+profiler for as long as the client stays connected.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z-]+$")
+# sys.monitoring based cProfile: one profiler per interpreter, seeing every thread
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+class ProfilingSettings:
+    """Read on every request, so profiling can be reconfigured while serving."""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.0, directory: str = "profiles", keep: int = 100):
+        self.enabled = enabled
+        # Fraction of requests profiled without asking for it
+        self.sample_rate = sample_rate
+        self.directory = directory
+        # Older profiles are deleted once there are more than this many
+        self.keep = keep
+
+
+SETTINGS = ProfilingSettings(
+    enabled=os.environ.get("JOB_TRACKER_PROFILING") == "1",
+    sample_rate=float(os.environ.get("JOB_TRACKER_PROFILE_SAMPLE_RATE", "0")),
+    directory=os.environ.get("JOB_TRACKER_PROFILE_DIR", "profiles"),
+    keep=int(os.environ.get("JOB_TRACKER_PROFILE_KEEP", "100")),
+)
+
+
+class RequestProfile:
+    """The profilers of one request: one for the request and, before Python 3.12, one per database call."""
+
+    def __init__(self):
+        self.id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ") + "-" + secrets.token_hex(3)
+        self.profiler = cProfile.Profile()
+        self._thread_profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run_in_thread(self, function: Callable, *args, **kwargs):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._thread_profilers.append(profiler)
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.profiler)
+        with self._lock:
+            for profiler in self._thread_profilers:
+                stats.add(profiler)
+        return stats
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+# Set while a request is profiled; the event loop thread, and from 3.12 the
+# interpreter, fit one profiler
+_profile_lock = threading.Lock()
+
+
+def profiled(function: Callable) -> Callable:
+    """Wrap ``function`` to run under a profiler of its own if the current request is being
+    profiled and the request's profiler does not already see the worker thread."""
+    profile = _current.get()
+    if profile is None or PROFILER_SEES_ALL_THREADS:
+        return function
+    return functools.partial(profile.run_in_thread, function)
+
+
+def _wants_profile(scope, settings: ProfilingSettings) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.strip().lower() in (b"1", b"true")
+    return settings.sample_rate > 0 and random.random() < settings.sample_rate
+
+
+def save_profile(directory: str, keep: int, profile: RequestProfile, description: dict):
+    """Write ``<id>.prof`` and ``<id>.json`` and delete all but the newest ``keep`` profiles."""
+    os.makedirs(directory, exist_ok=True)
+    profile.stats().dump_stats(os.path.join(directory, profile.id + ".prof"))
+    with open(os.path.join(directory, profile.id + ".json"), "w") as f:
+        json.dump(description, f)
+    # Ids start with the UTC time, so they sort oldest first
+    ids = sorted(name[:-len(".json")] for name in os.listdir(directory) if name.endswith(".json"))
+    for old in ids[:max(0, len(ids) - keep)]:
+        for suffix in (".json", ".prof"):
+            path = os.path.join(directory, old + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_profiles(directory: str, limit: int = 100) -> List[dict]:
+    """Descriptions of the newest profiles, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    ids = sorted((name[:-len(".json")] for name in os.listdir(directory) if name.endswith(".json")), reverse=True)
+    profiles = []
+    for id in ids[:limit]:
+        try:
+            with open(os.path.join(directory, id + ".json")) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            # Rotated away or half-written since the directory was listed
+            continue
+    return profiles
+
+
+def profile_path(directory: str, id: str) -> Optional[str]:
+    """Path of the pstats file for ``id``, or None if there is no such profile."""
+    if not PROFILE_ID_PATTERN.match(id):
+        return None
+    path = os.path.join(directory, id + ".prof")
+    return path if os.path.exists(path) else None
+
+
+def profile_summary(path: str, sort: str = "cumulative", limit: int = 40) -> str:
+    """pstats text report of the ``limit`` most expensive functions."""
+    output = io.StringIO()
+    pstats.Stats(path, stream=output).sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests picked by ``settings``.
+
+    A profiled response carries an ``X-Profile-Id`` header naming its
+    profile. Unprofiled requests only pay for the settings check, and the
+    header scan while profiling is enabled. Requests for ``excluded_paths``,
+    such as streaming endpoints, are never profiled.
+    """
+
+    def __init__(self, app, settings: ProfilingSettings = SETTINGS, excluded_paths: Iterable[str] = ()):
+        self.app = app
+        self.settings = settings
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        settings = self.settings
+        if (
+            scope["type"] != "http" or not settings.enabled or scope["path"] in self.excluded_paths
+            or not _wants_profile(scope, settings)
+        ):
+            await self.app(scope, receive, send)
+            return
+        if not _profile_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode("ascii"))])
+            await send(message)
+
+        token = _current.set(profile)
+        start = time.perf_counter()
+        profile.profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.profiler.disable()
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            _profile_lock.release()
+            route = scope.get("route")
+            description = {
+                "id": profile.id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route.path if route is not None else None,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 3),
+            }
+            await asyncio.to_thread(save_profile, settings.directory, settings.keep, profile, description)
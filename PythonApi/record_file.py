@@ -0,0 +1,367 @@
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+from collections.abc import Mapping
+from array import array
+from database import JobApplicationRecord, intern_record
+import bisect
+import heapq
+import mmap
+import os
+import secrets
+import struct
+import sys
+import zlib
+
+
+DATA_MAGIC = b"JTRD"
+INDEX_MAGIC = b"JTRI"
+FORMAT_VERSION = 1
+
+# Magic, format version and a generation number that ties the index to the
+# data file it was written for
+DATA_HEADER = struct.Struct("<4sIQ")
+# Magic, format version, generation, next id, length of the data file the
+# index covers, bytes of superseded entries in it, and the number of index
+# entries, which follow as little-endian (id, offset) pairs sorted by id
+INDEX_HEADER = struct.Struct("<4sIQQQQQ")
+INDEX_ENTRY_SIZE = 16
+# Payload length and CRC-32 of the payload
+ENTRY_HEADER = struct.Struct("<II")
+# A record payload starts with its id and the UTF-8 length of every other
+# field, NULL_LENGTH for None; the field bytes follow. A tombstone payload is
+# the deleted id alone.
+RECORD_HEADER = struct.Struct(f"<Q{len(JobApplicationRecord._fields) - 1}I")
+TOMBSTONE = struct.Struct("<Q")
+NULL_LENGTH = 0xFFFFFFFF
+
+
+class CorruptEntryError(Exception):
+    """An entry of a record file is truncated or fails its checksum.
+
+    Not a ValueError: damaged storage is a server fault, not a bad request.
+    """
+
+
+def _frame(payload: bytes) -> bytes:
+    return ENTRY_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def pack_record(record: JobApplicationRecord) -> bytes:
+    """Encode a record as one length-prefixed entry."""
+    values = [value.encode("utf-8") if value is not None else None for value in record[1:]]
+    lengths = [len(value) if value is not None else NULL_LENGTH for value in values]
+    return _frame(RECORD_HEADER.pack(record.id, *lengths) + b"".join(value for value in values if value is not None))
+
+
+def pack_tombstone(id: int) -> bytes:
+    """Encode the deletion of ``id`` as one length-prefixed entry."""
+    return _frame(TOMBSTONE.pack(id))
+
+
+def read_entry(buffer, offset: int) -> Tuple[int, Optional[JobApplicationRecord], int]:
+    """Decode the entry at ``offset`` into its id, its record (None for a
+    tombstone) and its size in bytes.
+
+    Raises CorruptEntryError if the entry is truncated or fails its checksum.
+    """
+    if offset + ENTRY_HEADER.size > len(buffer):
+        raise CorruptEntryError(f"Truncated entry at offset {offset}")
+    length, crc = ENTRY_HEADER.unpack_from(buffer, offset)
+    start = offset + ENTRY_HEADER.size
+    end = start + length
+    if end > len(buffer) or length < TOMBSTONE.size or zlib.crc32(buffer[start:end]) != crc:
+        raise CorruptEntryError(f"Corrupt entry at offset {offset}")
+    if length == TOMBSTONE.size:
+        return TOMBSTONE.unpack_from(buffer, start)[0], None, end - offset
+    header = RECORD_HEADER.unpack_from(buffer, start)
+    values = [header[0]]
+    position = start + RECORD_HEADER.size
+    for size in header[1:]:
+        if size == NULL_LENGTH:
+            values.append(None)
+        else:
+            values.append(str(buffer[position:position + size], "utf-8"))
+            position += size
+    return header[0], intern_record(values), end - offset
+
+
+def _map(path: str):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedIndex(NamedTuple):
+    """The mapped data file and the sorted ids and offsets indexed in it."""
+    data: mmap.mmap
+    ids: Sequence[int]
+    offsets: Sequence[int]
+
+    def find(self, id: int) -> Optional[int]:
+        """Offset of the entry for ``id``, or None if it is not indexed."""
+        position = bisect.bisect_left(self.ids, id)
+        if position < len(self.ids) and self.ids[position] == id:
+            return self.offsets[position]
+        return None
+
+
+class TailEntry(NamedTuple):
+    """An entry appended after the index was written; record is None for a tombstone."""
+    offset: int
+    size: int
+    record: Optional[JobApplicationRecord]
+
+
+def _entries(base: MappedIndex, tail: Dict[int, TailEntry], after_id: Optional[int]) -> Iterator[Tuple[int, int, Optional[JobApplicationRecord]]]:
+    """Merge indexed and appended entries into ``(id, offset, record)`` in id order.
+
+    Indexed entries carry no record; they are decoded by the caller if needed.
+    """
+    start = 0 if after_id is None else bisect.bisect_right(base.ids, after_id)
+    indexed = ((id, offset, None) for id, offset in zip(base.ids[start:], base.offsets[start:]) if id not in tail)
+    appended = sorted(
+        (id, entry.offset, entry.record) for id, entry in tail.items()
+        if entry.record is not None and (after_id is None or id > after_id)
+    )
+    return heapq.merge(indexed, appended, key=lambda item: item[0])
+
+
+def _records(base: MappedIndex, tail: Dict[int, TailEntry], after_id: Optional[int]) -> Iterator[JobApplicationRecord]:
+    for _, offset, record in _entries(base, tail, after_id):
+        yield record if record is not None else read_entry(base.data, offset)[1]
+
+
+class RecordFile(Mapping):
+    """Job application records kept on disk and read through mmap.
+
+    ``<path>`` holds a header and then length-prefixed, checksummed entries,
+    each a record or the tombstone of a deleted id. Changes are appended, so
+    the latest entry for an id wins. ``<path>.idx`` holds the sorted ids and
+    offsets of the live records in a prefix of the data file. Opening maps
+    both files, so it does not read the records, and a lookup decodes a
+    single entry.
+
+    Entries appended since the index was written form the tail. The tail is
+    kept in memory, decoded, until write_index() folds it into a new index,
+    and is found again on open by scanning the data file past the indexed
+    length. compact() rewrites the data file without superseded entries.
+
+    Writes must be serialized by the caller. Reads need no lock: a new index
+    is published before the tail it absorbed is dropped, and maps of replaced
+    files stay valid for as long as a reader holds them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._file = None
+        self._open()
+
+    def _open(self):
+        data = _map(self.path)
+        magic, version, generation = DATA_HEADER.unpack_from(data) if len(data) >= DATA_HEADER.size else (None, None, None)
+        if magic != DATA_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a job application record file")
+        self._generation = generation
+        self._size = len(data)
+        index = self._read_index()
+        if index is not None:
+            self.next_id, indexed_size, self._dead_bytes, ids, offsets = index
+        else:
+            # Missing or stale, e.g. after a crash while compacting: rebuild it
+            # from the whole data file.
+            self.next_id, indexed_size, self._dead_bytes, ids, offsets = 1, DATA_HEADER.size, 0, [], []
+        self._base = MappedIndex(data, ids, offsets)
+        self._tail: Dict[int, TailEntry] = {}
+        self._appended = 0
+        self._count = len(ids)
+        offset = indexed_size
+        while offset < self._size:
+            try:
+                id, record, size = read_entry(data, offset)
+            except CorruptEntryError:
+                # A crash during an append can leave a partial last entry;
+                # nothing after it was acknowledged.
+                os.truncate(self.path, offset)
+                self._size = offset
+                break
+            self._apply(id, offset, size, record)
+            offset += size
+        self._file = open(self.path, "ab")
+        if index is None:
+            self.write_index()
+
+    def _read_index(self) -> Optional[tuple]:
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < INDEX_HEADER.size:
+            return None
+        index = _map(self.index_path)
+        magic, version, generation, next_id, indexed_size, dead_bytes, count = INDEX_HEADER.unpack_from(index)
+        if (magic != INDEX_MAGIC or version != FORMAT_VERSION or generation != self._generation
+                or len(index) != INDEX_HEADER.size + count * INDEX_ENTRY_SIZE or indexed_size > self._size):
+            return None
+        if sys.byteorder == "little":
+            pairs = memoryview(index)[INDEX_HEADER.size:].cast("Q")
+        else:
+            pairs = array("Q", index[INDEX_HEADER.size:])
+            pairs.byteswap()
+        return next_id, indexed_size, dead_bytes, pairs[0::2], pairs[1::2]
+
+    @staticmethod
+    def _write_index_file(path: str, generation: int, next_id: int, indexed_size: int, dead_bytes: int, pairs: array):
+        if sys.byteorder != "little":
+            pairs = array("Q", pairs)
+            pairs.byteswap()
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, generation, next_id, indexed_size, dead_bytes, len(pairs) // 2))
+            pairs.tofile(f)
+        os.replace(tmp_file, path)
+
+    @classmethod
+    def write(cls, path: str, records: Iterable[JobApplicationRecord], next_id: int) -> int:
+        """Create or replace ``path`` and its index with ``records``.
+
+        Returns the number of records written.
+        """
+        generation = secrets.randbits(63)
+        entries = []
+        offset = DATA_HEADER.size
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(DATA_HEADER.pack(DATA_MAGIC, FORMAT_VERSION, generation))
+            for record in records:
+                entry = pack_record(record)
+                f.write(entry)
+                entries.append((record.id, offset))
+                offset += len(entry)
+        entries.sort()
+        pairs = array("Q")
+        for id, entry_offset in entries:
+            pairs.append(id)
+            pairs.append(entry_offset)
+        # The data file is replaced first; an index left over from the old
+        # file has the wrong generation and is rebuilt on open.
+        os.replace(tmp_file, path)
+        cls._write_index_file(path + ".idx", generation, next_id, offset, 0, pairs)
+        return len(entries)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def appended_entries(self) -> int:
+        """Number of entries appended since the index was written."""
+        return self._appended
+
+    @property
+    def dead_bytes(self) -> int:
+        """Bytes of the data file taken up by superseded entries and tombstones."""
+        return self._dead_bytes
+
+    @property
+    def live_bytes(self) -> int:
+        return self._size - DATA_HEADER.size - self._dead_bytes
+
+    def get(self, id: int, default=None):
+        # The tail is read before the base, see the class docstring
+        entry = self._tail.get(id)
+        if entry is not None:
+            return entry.record if entry.record is not None else default
+        base = self._base
+        offset = base.find(id)
+        return read_entry(base.data, offset)[1] if offset is not None else default
+
+    def __getitem__(self, id: int) -> JobApplicationRecord:
+        record = self.get(id)
+        if record is None:
+            raise KeyError(id)
+        return record
+
+    def __contains__(self, id) -> bool:
+        entry = self._tail.get(id)
+        if entry is not None:
+            return entry.record is not None
+        return self._base.find(id) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        return (id for id, _, _ in _entries(self._base, dict(self._tail), None))
+
+    def records(self, after_id: Optional[int] = None) -> Iterator[JobApplicationRecord]:
+        """Iterate over the records with an id greater than ``after_id``, in id order.
+
+        The iterator reflects the records as of this call, so it can be
+        consumed without holding any lock while writes continue.
+        """
+        tail = dict(self._tail)
+        return _records(self._base, tail, after_id)
+
+    def _supersede(self, id: int) -> Optional[JobApplicationRecord]:
+        """Count the current entry for ``id`` as dead and return its record."""
+        entry = self._tail.get(id)
+        if entry is not None:
+            if entry.record is not None:
+                self._dead_bytes += entry.size
+            return entry.record
+        offset = self._base.find(id)
+        if offset is None:
+            return None
+        _, record, size = read_entry(self._base.data, offset)
+        self._dead_bytes += size
+        return record
+
+    def _apply(self, id: int, offset: int, size: int, record: Optional[JobApplicationRecord]) -> Optional[JobApplicationRecord]:
+        previous = self._supersede(id)
+        self._tail[id] = TailEntry(offset, size, record)
+        if record is None:
+            self._dead_bytes += size
+            if previous is not None:
+                self._count -= 1
+        elif previous is None:
+            self._count += 1
+        self.next_id = max(self.next_id, id + 1)
+        self._appended += 1
+        return previous
+
+    def _append(self, entry: bytes) -> int:
+        offset = self._size
+        self._file.write(entry)
+        self._size += len(entry)
+        return offset
+
+    def put(self, record: JobApplicationRecord) -> Optional[JobApplicationRecord]:
+        """Append ``record``, replacing the record with its id; returns the replaced record."""
+        entry = pack_record(record)
+        return self._apply(record.id, self._append(entry), len(entry), record)
+
+    def delete(self, id: int) -> Optional[JobApplicationRecord]:
+        """Append a tombstone for ``id``; returns the deleted record, or None if there was none."""
+        if id not in self:
+            return None
+        entry = pack_tombstone(id)
+        return self._apply(id, self._append(entry), len(entry), None)
+
+    def flush(self):
+        self._file.flush()
+
+    def write_index(self):
+        """Index the whole data file, so the tail no longer needs to be kept in memory."""
+        self.flush()
+        pairs = array("Q")
+        for id, offset, _ in _entries(self._base, self._tail, None):
+            pairs.append(id)
+            pairs.append(offset)
+        self._write_index_file(self.index_path, self._generation, self.next_id, self._size, self._dead_bytes, pairs)
+        _, _, _, ids, offsets = self._read_index()
+        self._base = MappedIndex(_map(self.path), ids, offsets)
+        self._tail = {}
+        self._appended = 0
+
+    def compact(self):
+        """Rewrite the data file with only the live records, in id order."""
+        self.flush()
+        self.write(self.path, self.records(), self.next_id)
+        self.close()
+        self._open()
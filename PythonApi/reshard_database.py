@@ -0,0 +1,24 @@
+# reshard_database.py
+
+"""Split a JSON file database into shards, or change the number of shards of a sharded one.
+
+The target may be the source directory itself; stop the API first.
+
+Usage: python reshard_database.py job_applications.json job_applications.shards 8
+       python reshard_database.py job_applications.shards job_applications.shards 16
+"""
+
+import sys
+from sharded_database import reshard
+
+
+def main(argv):
+    if len(argv) != 4 or not argv[3].isdigit():
+        raise SystemExit(__doc__)
+    source, target, shards = argv[1], argv[2], int(argv[3])
+    count = reshard(source, target, shards)
+    print(f"Wrote {count} job applications from {source} to {shards} shards in {target}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -6,11 +6,18 @@ import os
 if __name__ == "__main__":
     # Retrieve the PORT environment variable if it exists, otherwise default to 8000
     port = int(os.environ.get("PORT", 8000))
+    workers = int(os.environ.get("WORKERS", 1))
+    engine = os.environ.get("JOB_TRACKER_DB_ENGINE", "file").lower()
+
+    # The file database keeps its state in process memory, so several workers
+    # would overwrite each other's changes. Use JOB_TRACKER_DB_ENGINE=sqlite.
+    if workers > 1 and engine != "sqlite":
+        raise SystemExit("WORKERS > 1 requires JOB_TRACKER_DB_ENGINE=sqlite")
 
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
-        workers=1, # Single worker for file-based database with thread safety
+        workers=workers,
         reload=False  # Set to False in production
     )
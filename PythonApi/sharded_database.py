@@ -0,0 +1,200 @@
+from typing import Callable, Dict, Iterable, List, Optional
+from database import FileDatabase, JobApplicationRecord, JsonCache, SAMPLE_DATA, intern_record
+import json
+import os
+import secrets
+import shutil
+import threading
+
+MANIFEST_FILE = "manifest.json"
+# Records go to shard ``id % shards``. Ids are handed out in sequence, so
+# shards stay the same size and new records are spread over all of them.
+PARTITIONING = "id-modulo"
+
+
+def shard_file(directory: str, shard: int) -> str:
+    return os.path.join(directory, f"shard-{shard:03d}.json")
+
+
+class Shard:
+    """One partition: its records and the lock that orders rewrites of its file."""
+
+    def __init__(self, path: str, records: Dict[int, JobApplicationRecord]):
+        self.path = path
+        self.records = records
+        self.io_lock = threading.Lock()
+        # As FileDatabase._snapshot_seq and _written_seq, per shard
+        self.snapshot_seq = 0
+        self.written_seq = 0
+
+
+class ShardedDatabase(FileDatabase):
+    """FileDatabase whose records are split over several snapshot files.
+
+    ``db_dir`` holds a manifest and one file per shard, each in the
+    FileDatabase snapshot format. A write rewrites only the shards it
+    touched, so its cost follows the shard size rather than the total, and
+    every shard has its own I/O lock, so writes to different shards flush in
+    parallel. Records, indexes and versions stay in memory as in
+    FileDatabase and are changed under its lock, which is only held for the
+    in-memory work; reads see all shards merged.
+
+    The number of shards is fixed when the directory is created; use
+    reshard() to change it. Each shard file is replaced atomically, but a
+    batch spanning several shards is not, so a crash while it is being
+    flushed can persist it in some shards only. Like FileDatabase, an
+    instance must be the only writer of its files.
+    """
+
+    def __init__(self, db_dir: str = "job_applications.shards", shards: int = 8, import_from: Optional[str] = None,
+                 trusted_load: bool = True, tombstone_retention: int = 100000):
+        if shards < 1:
+            raise ValueError("A sharded database needs at least one shard")
+        self._shard_count = shards
+        self._import_from = import_from
+        self._shards: List[Shard] = []
+        super().__init__(db_dir, trusted_load=trusted_load, tombstone_retention=tombstone_retention)
+
+    def _ensure_db_file_exists(self):
+        if not os.path.exists(os.path.join(self._db_file, MANIFEST_FILE)):
+            if self._import_from is not None and os.path.exists(self._import_from):
+                reshard(self._import_from, self._db_file, self._shard_count)
+            else:
+                self._init_sample_data()
+
+    def _init_sample_data(self):
+        fields = JobApplicationRecord._fields
+        write_shards(
+            self._db_file,
+            self._shard_count,
+            SAMPLE_DATA["next_id"],
+            [intern_record([app.get(field) for field in fields]) for app in SAMPLE_DATA["job_applications"]]
+        )
+
+    def _load_data(self):
+        self._shard_count = read_manifest(self._db_file)
+        self._shards = []
+        self._next_id = 1
+        for shard in range(self._shard_count):
+            path = shard_file(self._db_file, shard)
+            next_id, records = self._read_document(path)
+            self._shards.append(Shard(path, records))
+            # Every write stores the current next id in the shards it
+            # rewrites, so the newest of them is the largest.
+            self._next_id = max(self._next_id, next_id)
+        merged = [job_app for shard in self._shards for job_app in shard.records.values()]
+        # Records are tuples led by their unique id, so this sorts by id
+        merged.sort()
+        self._job_applications = {job_app.id: job_app for job_app in merged}
+        self._rebuild_indexes()
+        self._json_cache = JsonCache()
+        self._version += 1
+        self._epoch = secrets.token_hex(4)
+        self._snapshot = None
+
+    def _shard(self, id: int) -> Shard:
+        return self._shards[id % self._shard_count]
+
+    def _insert(self, job_app: JobApplicationRecord, changed: Optional[Iterable[str]] = None):
+        super()._insert(job_app, changed)
+        self._shard(job_app.id).records[job_app.id] = job_app
+
+    def _discard(self, id: int) -> Optional[JobApplicationRecord]:
+        job_app = super()._discard(id)
+        if job_app is not None:
+            del self._shard(id).records[id]
+        return job_app
+
+    def _commit(self, entries: List[dict]) -> Optional[Callable[[], None]]:
+        # Capture the touched shards under the lock; their files are written
+        # once it has been released.
+        touched = dict.fromkeys(
+            self._shard(entry["record"]["id"] if entry["op"] == "put" else entry["id"]) for entry in entries
+        )
+        writes = []
+        for shard in touched:
+            shard.snapshot_seq += 1
+            writes.append((shard, shard.snapshot_seq, self._next_id, tuple(shard.records.values())))
+        return lambda: self._write_shards(writes)
+
+    def _write_shards(self, writes: list):
+        for shard, seq, next_id, job_applications in writes:
+            with shard.io_lock:
+                if seq <= shard.written_seq:
+                    continue
+                self._write_file(shard.path, self._snapshot_data(next_id, job_applications))
+                shard.written_seq = seq
+
+    @property
+    def shard_count(self) -> int:
+        return self._shard_count
+
+    def storage_bytes(self) -> int:
+        return sum(os.path.getsize(shard.path) for shard in self._shards if os.path.exists(shard.path))
+
+
+def read_manifest(directory: str) -> int:
+    """Number of shards in the sharded database at ``directory``."""
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("partitioning") != PARTITIONING:
+        raise ValueError(f"Unsupported partitioning {manifest.get('partitioning')!r} in {directory}")
+    return manifest["shards"]
+
+
+def write_shards(directory: str, shards: int, next_id: int, job_applications: Iterable[JobApplicationRecord]) -> int:
+    """Write ``job_applications`` as a sharded database in ``directory``. Returns the number of records.
+
+    The manifest is written last, so a directory without one is incomplete.
+    """
+    os.makedirs(directory, exist_ok=True)
+    partitions: List[List[JobApplicationRecord]] = [[] for _ in range(shards)]
+    for job_app in job_applications:
+        partitions[job_app.id % shards].append(job_app)
+    for shard, records in enumerate(partitions):
+        path = shard_file(directory, shard)
+        with open(path + ".tmp", "wb") as f:
+            FileDatabase._write_document(f, FileDatabase._snapshot_data(next_id, records))
+        os.replace(path + ".tmp", path)
+    with open(os.path.join(directory, MANIFEST_FILE + ".tmp"), "w") as f:
+        json.dump({"shards": shards, "partitioning": PARTITIONING}, f)
+    os.replace(os.path.join(directory, MANIFEST_FILE + ".tmp"), os.path.join(directory, MANIFEST_FILE))
+    return sum(map(len, partitions))
+
+
+def reshard(source: str, target: str, shards: int) -> int:
+    """Write the records of ``source`` to a sharded database at ``target`` with ``shards`` shards.
+
+    ``source`` is a sharded database directory or a FileDatabase JSON file,
+    read with its write-ahead log if there is one. ``target`` may be
+    ``source`` itself: the new shards are written next to it and swapped in
+    once complete. The database must not be open for writing meanwhile.
+    Returns the number of records.
+    """
+    if shards < 1:
+        raise ValueError("A sharded database needs at least one shard")
+    if os.path.isdir(source):
+        read_manifest(source)
+        database = ShardedDatabase(source)
+    elif os.path.exists(source):
+        database = FileDatabase(source, write_ahead_log=os.path.exists(source + ".log"))
+    else:
+        raise FileNotFoundError(source)
+    if os.path.exists(target) and not os.path.isdir(target):
+        raise ValueError(f"{target} is a file, not a sharded database directory")
+    try:
+        next_id, job_applications = database.next_id, database.get_all_job_applications()
+    finally:
+        database.close()
+    staging = target + ".resharding"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    count = write_shards(staging, shards, next_id, job_applications)
+    if os.path.exists(target):
+        retired = target + ".old"
+        os.rename(target, retired)
+        os.rename(staging, target)
+        shutil.rmtree(retired)
+    else:
+        os.rename(staging, target)
+    return count
@@ -0,0 +1,542 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from models import CreateJobApplicationCommand, UpdateJobApplicationCommand, JobApplicationStats
+from database import (
+    FileDatabase, ChangeSet, DatabaseSnapshot, JobApplicationRecord, SAMPLE_DATA, SORTABLE_FIELDS, encode_job_application,
+    first_changes, intern_record
+)
+from indexes import TextIndex
+from contextlib import contextmanager
+import sqlite3
+import secrets
+import threading
+import timing
+import os
+
+
+COLUMNS = JobApplicationRecord._fields
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jobTitle TEXT NOT NULL,
+    company TEXT NOT NULL,
+    dateApplied TEXT NOT NULL,
+    status TEXT NOT NULL,
+    description TEXT,
+    jobUrl TEXT,
+    salary TEXT,
+    location TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_job_applications_status ON job_applications (status COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS ix_job_applications_company ON job_applications (company COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS ix_job_applications_date_applied ON job_applications (dateApplied, id);
+CREATE INDEX IF NOT EXISTS ix_job_applications_version ON job_applications (version);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+-- Deleted ids with the version that deleted them, for get_changes
+CREATE TABLE IF NOT EXISTS tombstones (
+    version INTEGER NOT NULL,
+    id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tombstones_version ON tombstones (version);
+CREATE TRIGGER IF NOT EXISTS job_applications_tombstone AFTER DELETE ON job_applications BEGIN
+    INSERT INTO tombstones (version, id) VALUES ((SELECT value + 1 FROM meta WHERE key = 'version'), old.id);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS job_applications_fts USING fts5(
+    jobTitle, company, location, description,
+    content='job_applications', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS job_applications_fts_insert AFTER INSERT ON job_applications BEGIN
+    INSERT INTO job_applications_fts (rowid, jobTitle, company, location, description)
+    VALUES (new.id, new.jobTitle, new.company, new.location, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS job_applications_fts_delete AFTER DELETE ON job_applications BEGIN
+    INSERT INTO job_applications_fts (job_applications_fts, rowid, jobTitle, company, location, description)
+    VALUES ('delete', old.id, old.jobTitle, old.company, old.location, old.description);
+END;
+-- Only fires for updates that change an indexed column
+CREATE TRIGGER IF NOT EXISTS job_applications_fts_update
+AFTER UPDATE OF jobTitle, company, location, description ON job_applications BEGIN
+    INSERT INTO job_applications_fts (job_applications_fts, rowid, jobTitle, company, location, description)
+    VALUES ('delete', old.id, old.jobTitle, old.company, old.location, old.description);
+    INSERT INTO job_applications_fts (rowid, jobTitle, company, location, description)
+    VALUES (new.id, new.jobTitle, new.company, new.location, new.description);
+END;
+"""
+
+
+def _week(row: str) -> str:
+    # Monday of the week, only for valid dates written exactly as YYYY-MM-DD,
+    # as indexes.week_start computes it. The '+0 days' modifier makes SQLite
+    # normalise impossible days such as 2025-02-30, so they fail the check.
+    return (f"CASE WHEN date({row}.dateApplied, '+0 days') = {row}.dateApplied "
+            f"THEN date({row}.dateApplied, '-6 days', 'weekday 1') END")
+
+
+def _stats_keys(row: str) -> str:
+    return f"VALUES ('total', ''), ('status', {row}.status), ('company', {row}.company), ('week', {_week(row)})"
+
+
+def _stats_increment(row: str) -> str:
+    return (f"INSERT INTO stats (dimension, key, count) SELECT column1, column2, 1 FROM ({_stats_keys(row)}) "
+            f"WHERE column2 IS NOT NULL ON CONFLICT (dimension, key) DO UPDATE SET count = count + 1;")
+
+
+def _stats_decrement(row: str) -> str:
+    keys = _stats_keys(row)
+    return (f"UPDATE stats SET count = count - 1 WHERE (dimension, key) IN ({keys});\n"
+            f"    DELETE FROM stats WHERE count = 0 AND dimension <> 'total' AND (dimension, key) IN ({keys});")
+
+
+# Counts by status, company and week, adjusted by triggers on every write so
+# reading them never scans job_applications.
+STATS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS stats (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO stats (dimension, key, count) VALUES ('total', '', 0);
+CREATE TRIGGER IF NOT EXISTS job_applications_stats_insert AFTER INSERT ON job_applications BEGIN
+    {_stats_increment("new")}
+END;
+CREATE TRIGGER IF NOT EXISTS job_applications_stats_delete AFTER DELETE ON job_applications BEGIN
+    {_stats_decrement("old")}
+END;
+CREATE TRIGGER IF NOT EXISTS job_applications_stats_update AFTER UPDATE OF status, company, dateApplied ON job_applications BEGIN
+    {_stats_decrement("old")}
+    {_stats_increment("new")}
+END;
+"""
+
+SELECT_COLUMNS = ", ".join(COLUMNS)
+# Written rows are stamped with the version their transaction commits, which
+# _write bumps at the end, for per-record version tags.
+NEXT_VERSION = "(SELECT value + 1 FROM meta WHERE key = 'version')"
+INSERT_SQL = f"INSERT INTO job_applications ({SELECT_COLUMNS}, version) VALUES ({', '.join('?' * len(COLUMNS))}, {NEXT_VERSION})"
+CREATE_SQL = f"INSERT INTO job_applications ({', '.join(COLUMNS[1:])}, version) VALUES ({', '.join('?' * (len(COLUMNS) - 1))}, {NEXT_VERSION})"
+UPDATE_SQL = "UPDATE job_applications SET " + ", ".join(f"{column} = ?" for column in COLUMNS[1:]) + f", version = {NEXT_VERSION} WHERE id = ?"
+
+# Column weights for bm25(), in the column order of job_applications_fts;
+# they mirror TextIndex.FIELD_WEIGHTS.
+SEARCH_WEIGHTS = ", ".join(str(TextIndex.FIELD_WEIGHTS[field]) for field in ("jobTitle", "company", "location", "description"))
+
+
+class SqliteDatabase:
+    """Job application store backed by the standard-library sqlite3 module.
+
+    Exposes the same methods as FileDatabase. The database runs in WAL mode so
+    readers never block the writer, and every process or thread opens its own
+    connection, which makes it safe to serve the API from several uvicorn
+    workers. A ``meta`` row holds a version counter bumped by each write
+    transaction, so snapshots can be cached per version across processes.
+    """
+
+    def __init__(self, db_file: str = "job_applications.db", import_from: Optional[str] = None,
+                 tombstone_retention: int = 100000):
+        self._db_file = db_file
+        self._tombstone_retention = tombstone_retention
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._snapshot: Optional[DatabaseSnapshot] = None
+        self._encoded_snapshot: Optional[Tuple[Sequence[JobApplicationRecord], bytes]] = None
+        self._initialize(import_from)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._db_file, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _initialize(self, import_from: Optional[str]):
+        connection = self._connection()
+        connection.executescript(SCHEMA + STATS_SCHEMA)
+        with self._write() as connection:
+            if connection.execute("SELECT 1 FROM meta WHERE key = 'version'").fetchone() is None:
+                connection.execute("INSERT INTO meta (key, value) VALUES ('version', 0)")
+                # Sync tokens older than this cannot be served; raised as tombstones are pruned
+                connection.execute("INSERT INTO meta (key, value) VALUES ('tombstone_horizon', 0)")
+                # Tells version tags of a recreated database apart from the old ones
+                connection.execute("INSERT INTO meta (key, value) VALUES ('epoch', ?)", (secrets.randbits(48),))
+                if import_from is not None and os.path.exists(import_from):
+                    self._import_json(connection, import_from)
+                else:
+                    self._insert_rows(connection, SAMPLE_DATA["job_applications"], SAMPLE_DATA["next_id"])
+
+    @contextmanager
+    def _write(self):
+        """Run the body in an immediate write transaction.
+
+        The version counter is bumped when the body changed any row. Waiting
+        for the write lock and committing are charged to the request's lock
+        and storage timings.
+        """
+        connection = self._connection()
+        with timing.timed("lock"):
+            connection.execute("BEGIN IMMEDIATE")
+        try:
+            changes = connection.total_changes
+            yield connection
+            if connection.total_changes != changes:
+                connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            with timing.timed("storage"):
+                connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _read(self):
+        """Run the body in a read transaction so multiple queries see one state."""
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            yield connection
+        finally:
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _insert_rows(connection: sqlite3.Connection, records: Sequence[dict], next_id: int):
+        connection.executemany(INSERT_SQL, [tuple(record.get(column) for column in COLUMNS) for record in records])
+        # Keep AUTOINCREMENT in step with the source so deleted ids are never reused
+        if connection.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'job_applications'", (next_id - 1,)).rowcount == 0:
+            connection.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('job_applications', ?)", (next_id - 1,))
+
+    def _import_json(self, connection: sqlite3.Connection, json_file: str):
+        source = FileDatabase(json_file, write_ahead_log=os.path.exists(json_file + ".log"))
+        try:
+            records = [job_app._asdict() for job_app in source.get_all_job_applications()]
+            next_id = source.next_id
+        finally:
+            source.close()
+        self._insert_rows(connection, records, next_id)
+
+    def import_json(self, json_file: str) -> int:
+        """Replace every row with the contents of a FileDatabase JSON file.
+
+        Ids and the next id are preserved. Returns the number of imported records.
+        """
+        with self._write() as connection:
+            connection.execute("DELETE FROM job_applications")
+            # Every earlier sync token is void; clients fetch everything again
+            connection.execute("DELETE FROM tombstones")
+            connection.execute(f"UPDATE meta SET value = {NEXT_VERSION} WHERE key = 'tombstone_horizon'")
+            self._import_json(connection, json_file)
+            return connection.execute("SELECT COUNT(*) FROM job_applications").fetchone()[0]
+
+    def close(self):
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    @staticmethod
+    def _to_record(row) -> JobApplicationRecord:
+        return intern_record(row)
+
+    def snapshot(self) -> DatabaseSnapshot:
+        """Return every record as of the current version, cached until the next write."""
+        with self._read() as connection:
+            version = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            rows = connection.execute(f"SELECT {SELECT_COLUMNS} FROM job_applications ORDER BY id").fetchall()
+        snapshot = DatabaseSnapshot(version, tuple(self._to_record(row) for row in rows))
+        current = self._snapshot
+        if current is None or current.version < version:
+            self._snapshot = snapshot
+        return snapshot
+
+    def version_tag(self, id: Optional[int] = None) -> Optional[str]:
+        """Return an opaque token that changes whenever the data, or record ``id``, changes."""
+        connection = self._connection()
+        epoch = connection.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+        if id is None:
+            version = connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            return f"{epoch:x}-{version}"
+        row = connection.execute("SELECT version FROM job_applications WHERE id = ?", (id,)).fetchone()
+        return f"{epoch:x}-{id}-{row[0]}" if row is not None else None
+    
+    def count_job_applications(self) -> int:
+        row = self._connection().execute("SELECT count FROM stats WHERE dimension = 'total'").fetchone()
+        return row[0] if row is not None else 0
+
+    def storage_bytes(self) -> int:
+        """Size of the database file and its write-ahead log."""
+        paths = (self._db_file, self._db_file + "-wal")
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+    def get_all_job_applications(self) -> Sequence[JobApplicationRecord]:
+        return self.snapshot().job_applications
+
+    def iter_job_applications(self, batch_size: int = 1000) -> Iterator[JobApplicationRecord]:
+        """Iterate over every record as of one read transaction, ``batch_size`` rows at a time.
+
+        The transaction runs on a dedicated connection, so the iterator can be
+        advanced from any thread and does not hold up other queries.
+        """
+        connection = sqlite3.connect(self._db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        try:
+            connection.execute("BEGIN")
+            cursor = connection.execute(f"SELECT {SELECT_COLUMNS} FROM job_applications ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._to_record(row)
+        finally:
+            connection.close()
+    
+    def create_job_application(self, command: CreateJobApplicationCommand) -> int:
+        return self.create_job_applications([command])[0]
+
+    def update_job_application(self, id: int, command: UpdateJobApplicationCommand) -> bool:
+        return self.update_job_applications([(id, command)])[0]
+
+    def delete_job_application(self, id: int) -> bool:
+        return self.delete_job_applications([id])[0]
+
+    @staticmethod
+    def _values(command) -> tuple:
+        return tuple(getattr(command, column) for column in COLUMNS[1:])
+
+    def create_job_applications(self, commands: List[CreateJobApplicationCommand]) -> List[int]:
+        """Create several records in one transaction and return their ids."""
+        with self._write() as connection:
+            return [
+                connection.execute(CREATE_SQL, self._values(command)).lastrowid
+                for command in commands
+            ]
+
+    def update_job_applications(self, updates: List[Tuple[int, UpdateJobApplicationCommand]]) -> List[bool]:
+        """Apply several ``(id, command)`` updates in one transaction."""
+        with self._write() as connection:
+            return [
+                connection.execute(UPDATE_SQL, self._values(command) + (id,)).rowcount > 0
+                for id, command in updates
+            ]
+
+    def patch_job_application(self, id: int, fields: Dict[str, Optional[str]]) -> Optional[JobApplicationRecord]:
+        """Change only the given columns of a row and return the result, or None if ``id`` does not exist.
+
+        The row is only written when a value differs, and only the search
+        and stats triggers of the written columns fire.
+        """
+        columns = [column for column in COLUMNS[1:] if column in fields]
+        with self._write() as connection:
+            if columns:
+                values = [fields[column] for column in columns]
+                connection.execute(
+                    f"UPDATE job_applications SET {', '.join(f'{column} = ?' for column in columns)}, version = {NEXT_VERSION} "
+                    f"WHERE id = ? AND ({' OR '.join(f'{column} IS NOT ?' for column in columns)})",
+                    values + [id] + values
+                )
+            row = connection.execute(f"SELECT {SELECT_COLUMNS} FROM job_applications WHERE id = ?", (id,)).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def delete_job_applications(self, ids: List[int]) -> List[bool]:
+        """Delete several records in one transaction."""
+        with self._write() as connection:
+            results = [
+                connection.execute("DELETE FROM job_applications WHERE id = ?", (id,)).rowcount > 0
+                for id in ids
+            ]
+            self._prune_tombstones(connection)
+            return results
+
+    def _prune_tombstones(self, connection: sqlite3.Connection):
+        """Keep the newest ``tombstone_retention`` tombstones, moving the horizon past the dropped ones."""
+        newest = connection.execute("SELECT MAX(rowid) FROM tombstones").fetchone()[0]
+        if newest is None or newest <= self._tombstone_retention:
+            return
+        cutoff = newest - self._tombstone_retention
+        row = connection.execute(
+            "SELECT version FROM tombstones WHERE rowid <= ? ORDER BY rowid DESC LIMIT 1", (cutoff,)
+        ).fetchone()
+        if row is not None:
+            connection.execute("DELETE FROM tombstones WHERE rowid <= ?", (cutoff,))
+            connection.execute("UPDATE meta SET value = MAX(value, ?) WHERE key = 'tombstone_horizon'", (row[0],))
+
+    def get_changes(self, since: str, limit: int = 1000) -> Optional[ChangeSet]:
+        """Rows written and ids deleted after the version named by ``since``; see FileDatabase.get_changes."""
+        epoch, _, version = since.rpartition("-")
+        with self._read() as connection:
+            meta = dict(connection.execute(
+                "SELECT key, value FROM meta WHERE key IN ('epoch', 'version', 'tombstone_horizon')"
+            ).fetchall())
+            if epoch != f"{meta['epoch']:x}" or not version.isdigit():
+                return None
+            version = int(version)
+            if version > meta["version"] or version < meta["tombstone_horizon"]:
+                return None
+            rows = {row[0]: row for row in connection.execute(
+                f"SELECT {SELECT_COLUMNS}, version FROM job_applications WHERE version > ?", (version,)
+            )}
+            changes = [(row[-1], id, False) for id, row in rows.items()]
+            changes += [(written, id, True) for written, id in connection.execute(
+                "SELECT version, id FROM tombstones WHERE version > ?", (version,)
+            )]
+        changes, end = first_changes(changes, limit)
+        return ChangeSet(
+            f"{meta['epoch']:x}-{end if end is not None else meta['version']}",
+            [self._to_record(rows[id][:-1]) for _, id, deleted in changes if not deleted],
+            [id for _, id, deleted in changes if deleted],
+            end is not None,
+        )
+
+    def get_job_applications_by_ids(self, ids: List[int]) -> List[Optional[JobApplicationRecord]]:
+        found = {}
+        with self._read() as connection:
+            # Stay well below SQLite's bound-parameter limit
+            for offset in range(0, len(ids), 500):
+                chunk = ids[offset:offset + 500]
+                rows = connection.execute(
+                    f"SELECT {SELECT_COLUMNS} FROM job_applications WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = self._to_record(row)
+        return [found.get(id) for id in ids]
+
+    def get_job_application_by_id(self, id: int) -> Optional[JobApplicationRecord]:
+        row = self._connection().execute(
+            f"SELECT {SELECT_COLUMNS} FROM job_applications WHERE id = ?", (id,)
+        ).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def encode_job_application(self, job_app: Optional[JobApplicationRecord]) -> bytes:
+        with timing.timed("encode"):
+            return encode_job_application(job_app)
+    
+    def encode_job_applications(self, job_apps: Sequence[Optional[JobApplicationRecord]]) -> bytes:
+        """JSON array of records; the encoding of the cached snapshot is kept until it changes.
+
+        Rows are read into new objects, so unlike FileDatabase there is no
+        per-record cache to reuse.
+        """
+        cached = self._encoded_snapshot
+        if cached is not None and cached[0] is job_apps:
+            return cached[1]
+        with timing.timed("encode"):
+            encoded = b"[" + b",".join(map(encode_job_application, job_apps)) + b"]"
+        snapshot = self._snapshot
+        if snapshot is not None and job_apps is snapshot.job_applications:
+            self._encoded_snapshot = (job_apps, encoded)
+        return encoded
+    
+    def get_job_applications_page(self, after_id: Optional[int] = None, limit: int = 100) -> Tuple[List[JobApplicationRecord], Optional[int]]:
+        rows = self._connection().execute(
+            f"SELECT {SELECT_COLUMNS} FROM job_applications WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id if after_id is not None else 0, limit + 1)
+        ).fetchall()
+        page = [self._to_record(row) for row in rows]
+        if len(page) > limit:
+            return page[:limit], page[limit - 1].id
+        return page, None
+
+    def query_job_applications(self, status: Optional[str] = None, company: Optional[str] = None,
+                               date_from: Optional[str] = None, date_to: Optional[str] = None,
+                               sort: Optional[str] = None, after_id: Optional[int] = None,
+                               limit: Optional[int] = None,
+                               after_value: Optional[str] = None) -> Tuple[Sequence[JobApplicationRecord], Optional[int]]:
+        """Filter and sort with the same semantics as FileDatabase.query_job_applications."""
+        descending = bool(sort) and sort.startswith("-")
+        sort_field = sort.lstrip("-") if sort else None
+        if sort_field is not None and sort_field not in SORTABLE_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort_field}'")
+        if status is None and company is None and date_from is None and date_to is None and sort_field is None:
+            if limit is None and after_id is None:
+                return self.get_all_job_applications(), None
+            return self.get_job_applications_page(after_id, limit or 100)
+
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ? COLLATE NOCASE")
+            params.append(status)
+        if company is not None:
+            clauses.append("company = ? COLLATE NOCASE")
+            params.append(company)
+        if date_from is not None:
+            clauses.append("dateApplied >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append("dateApplied <= ?")
+            params.append(date_to)
+
+        if sort_field is None:
+            sort_key = "id"
+        elif sort_field == "dateApplied":
+            sort_key = "dateApplied"
+        else:
+            sort_key = f"{sort_field} COLLATE NOCASE"
+        direction = "DESC" if descending else "ASC"
+
+        with self._read() as connection:
+            if after_id is not None:
+                if sort_field is None:
+                    clauses.append("id > ?")
+                    params.append(after_id)
+                else:
+                    if after_value is None:
+                        row = connection.execute(f"SELECT {sort_field} FROM job_applications WHERE id = ?", (after_id,)).fetchone()
+                        if row is None:
+                            raise ValueError(f"Unknown cursor {after_id}")
+                        after_value = row[0]
+                    comparison = "<" if descending else ">"
+                    clauses.append(f"({sort_key}, id) {comparison} (?, ?)")
+                    params.extend([after_value, after_id])
+            sql = f"SELECT {SELECT_COLUMNS} FROM job_applications"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += f" ORDER BY {sort_key} {direction}, id {direction}"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit + 1)
+            rows = connection.execute(sql, params).fetchall()
+
+        matches = [self._to_record(row) for row in rows]
+        if limit is not None and len(matches) > limit:
+            return matches[:limit], matches[limit - 1].id
+        return matches, None
+
+    def get_job_application_stats(self) -> JobApplicationStats:
+        """Counts by status, company and week, read from the trigger-maintained stats table."""
+        summary = {"total": 0, "byStatus": {}, "byCompany": {}, "byWeek": {}}
+        buckets = {"status": summary["byStatus"], "company": summary["byCompany"], "week": summary["byWeek"]}
+        rows = self._connection().execute("SELECT dimension, key, count FROM stats ORDER BY dimension, key").fetchall()
+        for dimension, key, count in rows:
+            if dimension == "total":
+                summary["total"] = count
+            else:
+                buckets[dimension][key] = count
+        return JobApplicationStats(**summary)
+    
+    def search_job_applications(self, query: str, limit: int = 20) -> List[JobApplicationRecord]:
+        """Ranked full-text search through FTS5, with every word matched as a prefix."""
+        tokens = TextIndex.tokenize(query)
+        if not tokens:
+            return []
+        match = " ".join(f'"{token}"*' for token in tokens)
+        columns = ", ".join(f"j.{column}" for column in COLUMNS)
+        rows = self._connection().execute(
+            f"SELECT {columns} FROM job_applications_fts f JOIN job_applications j ON j.id = f.rowid "
+            f"WHERE job_applications_fts MATCH ? "
+            f"ORDER BY bm25(job_applications_fts, {SEARCH_WEIGHTS}), j.id LIMIT ?",
+            (match, limit)
+        ).fetchall()
+        return [self._to_record(row) for row in rows]
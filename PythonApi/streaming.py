@@ -0,0 +1,193 @@
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from models import CreateJobApplicationCommand, ImportResult, ImportRowError
+from database import JobApplicationRecord, encode_job_application
+import csv
+import io
+import json
+import timing
+
+
+CSV_COLUMNS = list(JobApplicationRecord._fields)
+
+# Records encoded per yielded chunk; large enough to amortise the write calls,
+# small enough that a chunk stays a few hundred kilobytes.
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _chunks(job_apps: Iterable[JobApplicationRecord], chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for job_app in job_apps:
+        chunk.append(job_app)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ndjson_export(job_apps: Iterable[JobApplicationRecord], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield records as newline-delimited JSON, one chunk of lines at a time.
+
+    Records are encoded without going through the response cache, so an
+    export does not leave a second copy of the data behind.
+    """
+    for chunk in _chunks(job_apps, chunk_size):
+        with timing.timed("encode"):
+            lines = b"".join(encode_job_application(job_app) + b"\n" for job_app in chunk)
+        yield lines
+
+
+def csv_export(job_apps: Iterable[JobApplicationRecord], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a header row and then the records as CSV, one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+    for chunk in _chunks(job_apps, chunk_size):
+        with timing.timed("encode"):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([getattr(job_app, column) for column in CSV_COLUMNS] for job_app in chunk)
+            rows = buffer.getvalue().encode("utf-8")
+        yield rows
+
+
+# Valid rows committed per create_job_applications call, i.e. per storage flush
+IMPORT_CHUNK_SIZE = 1000
+# A longer line is reported as an error instead of being buffered
+MAX_LINE_BYTES = 1024 * 1024
+# Only the first errors are listed in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# A parsed row: its first line number and either the field values or a parse error
+ParsedRow = Tuple[int, Union[dict, str]]
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Optional[str]]:
+    """Split a stream of UTF-8 bytes into lines as the bytes arrive.
+
+    Only the current partial line is buffered. Lines are split and
+    measured as bytes, which is safe because a newline byte never occurs
+    inside a multi-byte UTF-8 character, and each line is decoded on its
+    own. A line longer than MAX_LINE_BYTES is skipped and yielded as None
+    so it can be reported.
+    """
+    pending = b""
+    oversized = False
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if oversized or len(line) > MAX_LINE_BYTES:
+                oversized = False
+                yield None
+            else:
+                yield line.removesuffix(b"\r").decode("utf-8", errors="replace")
+        if len(pending) > MAX_LINE_BYTES:
+            pending = b""
+            oversized = True
+    if oversized:
+        yield None
+    elif pending:
+        yield pending.removesuffix(b"\r").decode("utf-8", errors="replace")
+
+
+async def parse_ndjson(lines: AsyncIterable[Optional[str]]) -> AsyncIterator[ParsedRow]:
+    """Parse one JSON object per line; blank lines are skipped."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if line is None:
+            yield number, f"Line is longer than {MAX_LINE_BYTES} bytes"
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f"Invalid JSON: {e.msg}"
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+async def parse_csv(lines: AsyncIterable[Optional[str]]) -> AsyncIterator[ParsedRow]:
+    """Parse CSV whose first row names the columns, as written by csv_export.
+
+    A quoted value may span lines: a record ends at the first line break
+    after an even number of quote characters. Empty values become null, so
+    an exported file imports unchanged; unknown columns such as ``id`` are
+    ignored by validation.
+    """
+    header = None
+    record: List[str] = []
+    quotes = 0
+    start = number = 0
+    async for line in lines:
+        number += 1
+        if line is None:
+            record, quotes = [], 0
+            yield number, f"Line is longer than {MAX_LINE_BYTES} bytes"
+            continue
+        if not record:
+            start = number
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield start, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield start, f"Expected {len(header)} values, got {len(values)}"
+            continue
+        yield start, {column: value if value != "" else None for column, value in zip(header, values)}
+    if record:
+        yield start, "Invalid CSV: unterminated quoted value"
+
+
+def validation_error_message(error: ValidationError) -> str:
+    """One line naming each invalid field and what is wrong with it."""
+    return "; ".join(f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}" for detail in error.errors())
+
+
+async def import_rows(rows: AsyncIterable[ParsedRow],
+                      create: Callable[[List[CreateJobApplicationCommand]], Awaitable[List[int]]],
+                      chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportResult:
+    """Validate parsed rows and commit the valid ones ``chunk_size`` at a time.
+
+    ``create`` receives each chunk, so every chunk is one storage flush.
+    Memory is bounded by the chunk size plus the listed errors.
+    """
+    result = ImportResult(imported=0, failed=0, errors=[])
+    chunk: List[CreateJobApplicationCommand] = []
+
+    def fail(line: int, error: str):
+        result.failed += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(ImportRowError(line=line, error=error))
+
+    async for line, row in rows:
+        if isinstance(row, str):
+            fail(line, row)
+            continue
+        try:
+            chunk.append(CreateJobApplicationCommand(**row))
+        except ValidationError as e:
+            fail(line, validation_error_message(e))
+            continue
+        if len(chunk) >= chunk_size:
+            result.imported += len(await create(chunk))
+            chunk = []
+    if chunk:
+        result.imported += len(await create(chunk))
+    return result
@@ -6,6 +6,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from fastapi.testclient import TestClient
 from main import app
 from database import db
+import json
 
 
 @pytest.fixture(autouse=True)
@@ -42,6 +43,189 @@ class TestJobApplicationAPI:
         assert job_apps[0]["salary"] == "$120,000 - $150,000"
         assert job_apps[0]["location"] == "San Francisco, CA"
     
+    def test_get_job_applications_paginated(self):
+        """Test keyset pagination with limit and after_id"""
+        response = self.client.get("/api/JobApplications?limit=2")
+        assert response.status_code == 200
+        assert [app["id"] for app in response.json()] == [1, 2]
+        assert response.headers["X-Next-Cursor"] == "2"
+        assert 'rel="next"' in response.headers["Link"]
+        assert "after_id=2" in response.headers["Link"]
+        
+        response = self.client.get("/api/JobApplications?limit=2&after_id=2")
+        assert response.status_code == 200
+        assert [app["id"] for app in response.json()] == [3]
+        assert "X-Next-Cursor" not in response.headers
+        assert "Link" not in response.headers
+    
+    def test_get_job_applications_invalid_limit(self):
+        """Test that out-of-range page sizes are rejected"""
+        assert self.client.get("/api/JobApplications?limit=0").status_code == 422
+        assert self.client.get("/api/JobApplications?limit=100000").status_code == 422
+    
+    def test_filter_job_applications(self):
+        """Test filtering the list by status, company and date range"""
+        response = self.client.get("/api/JobApplications?status=Interview")
+        assert response.status_code == 200
+        assert [app["company"] for app in response.json()] == ["Google"]
+        
+        response = self.client.get("/api/JobApplications?company=microsoft")
+        assert [app["id"] for app in response.json()] == [3]
+        
+        response = self.client.get("/api/JobApplications?dateFrom=2025-08-06&dateTo=2025-08-12")
+        assert [app["id"] for app in response.json()] == [2]
+        
+        response = self.client.get("/api/JobApplications?dateFrom=not-a-date")
+        assert response.status_code == 422
+    
+    def test_sort_job_applications(self):
+        """Test sorting the list, with and without pagination"""
+        response = self.client.get("/api/JobApplications?sort=-dateApplied")
+        assert response.status_code == 200
+        assert [app["id"] for app in response.json()] == [1, 2, 3]
+        
+        response = self.client.get("/api/JobApplications?sort=company&limit=2")
+        assert [app["company"] for app in response.json()] == ["Google", "Microsoft"]
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get(f"/api/JobApplications?sort=company&limit=2&after_id={cursor}")
+        assert [app["company"] for app in response.json()] == ["OpenAI"]
+        
+        assert self.client.get("/api/JobApplications?sort=salary").status_code == 422
+    
+    def test_sorted_cursor_survives_changes_to_its_record(self):
+        """Test that the next sorted page follows on after the cursor record is deleted or re-dated"""
+        response = self.client.get("/api/JobApplications?sort=company&limit=1")
+        cursor = response.headers["X-Next-Cursor"]
+        self.client.delete("/api/JobApplications/2")
+        response = self.client.get("/api/JobApplications", params={"sort": "company", "limit": 1, "after_id": cursor})
+        assert response.status_code == 200
+        assert [app["company"] for app in response.json()] == ["Microsoft"]
+        
+        response = self.client.get("/api/JobApplications?sort=dateApplied&limit=1")
+        assert [app["id"] for app in response.json()] == [3]
+        next_url = response.links["next"]["url"]
+        self.client.patch("/api/JobApplications/3", json={"dateApplied": "2030-01-01"})
+        assert [app["id"] for app in self.client.get(next_url).json()] == [1]
+        
+        assert self.client.get("/api/JobApplications?sort=company&after_id=x").status_code == 400
+    
+    def test_corrupt_storage_is_a_server_error(self, monkeypatch):
+        """Test that a damaged record file gives a 500, not a 400 blaming the filter"""
+        from record_file import CorruptEntryError
+        
+        def query_job_applications(**kwargs):
+            raise CorruptEntryError("Corrupt entry at offset 0")
+        
+        monkeypatch.setattr(db, "query_job_applications", query_job_applications)
+        client = TestClient(app, raise_server_exceptions=False)
+        assert client.get("/api/JobApplications?status=Applied").status_code == 500
+    
+    def test_search_job_applications(self):
+        """Test the full-text search endpoint"""
+        response = self.client.get("/api/JobApplications/search?q=mountain")
+        assert response.status_code == 200
+        assert [app["id"] for app in response.json()] == [2]
+        
+        response = self.client.get("/api/JobApplications/search?q=dev&limit=1")
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        
+        assert self.client.get("/api/JobApplications/search?q=").status_code == 422
+        assert self.client.get("/api/JobApplications/search").status_code == 422
+    
+    def test_conditional_get_returns_not_modified(self):
+        """Test ETag and If-None-Match on the list and item endpoints"""
+        response = self.client.get("/api/JobApplications")
+        etag = response.headers["ETag"]
+        response = self.client.get("/api/JobApplications", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        
+        item = self.client.get("/api/JobApplications/1")
+        item_etag = item.headers["ETag"]
+        other_etag = self.client.get("/api/JobApplications/2").headers["ETag"]
+        assert item_etag != other_etag
+        assert self.client.get("/api/JobApplications/1", headers={"If-None-Match": f'"x", W/{item_etag}'}).status_code == 304
+        
+        # Changing record 2 invalidates the list and record 2, but not record 1
+        self.client.put("/api/JobApplications/2", json={
+            "jobTitle": "Changed", "company": "Google", "dateApplied": "2025-08-10", "status": "Offer"
+        })
+        response = self.client.get("/api/JobApplications", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert self.client.get("/api/JobApplications/1", headers={"If-None-Match": item_etag}).status_code == 304
+        response = self.client.get("/api/JobApplications/2", headers={"If-None-Match": other_etag})
+        assert response.status_code == 200
+        assert response.json()["jobTitle"] == "Changed"
+        
+        self.client.delete("/api/JobApplications/1")
+        assert self.client.get("/api/JobApplications/1", headers={"If-None-Match": item_etag}).status_code == 404
+    
+    def test_job_application_stats(self):
+        """Test the stats endpoint follows creates, status changes and deletes"""
+        response = self.client.get("/api/JobApplications/stats")
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["total"] == 3
+        assert stats["byStatus"] == {"Rejected": 1, "Interview": 1, "Applied": 1}
+        assert stats["byWeek"] == {"2025-08-04": 2, "2025-08-11": 1}
+        
+        self.client.put("/api/JobApplications/3", json={
+            "jobTitle": "Full Stack Engineer", "company": "Microsoft", "dateApplied": "2025-08-05", "status": "Interview"
+        })
+        self.client.delete("/api/JobApplications/1")
+        stats = self.client.get("/api/JobApplications/stats").json()
+        assert stats["total"] == 2
+        assert stats["byStatus"] == {"Interview": 2}
+        assert stats["byCompany"] == {"Google": 1, "Microsoft": 1}
+        assert stats["byWeek"] == {"2025-08-04": 2}
+    
+    def test_export_job_applications(self):
+        """Test the streaming NDJSON and CSV export endpoint"""
+        response = self.client.get("/api/JobApplications/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+        
+        response = self.client.get("/api/JobApplications/export?format=csv")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        assert response.text.splitlines()[0] == "id,jobTitle,company,dateApplied,status,description,jobUrl,salary,location"
+        assert len(response.text.splitlines()) == 4
+        
+        assert self.client.get("/api/JobApplications/export?format=xml").status_code == 422
+    
+    def test_import_job_applications(self):
+        """Test streaming NDJSON and CSV imports with a per-line error report"""
+        def upload(data: bytes):
+            # A generator body is sent with chunked transfer encoding
+            for offset in range(0, len(data), 16):
+                yield data[offset:offset + 16]
+        
+        ndjson = (
+            b'{"jobTitle": "Imported A", "company": "Acme", "dateApplied": "2025-09-01", "status": "Applied"}\n'
+            b'{"jobTitle": "No company", "dateApplied": "2025-09-01", "status": "Applied"}\n'
+            b'{"jobTitle": "Imported B", "company": "Acme", "dateApplied": "2025-09-02", "status": "Offer"}\n'
+        )
+        response = self.client.post("/api/JobApplications/import", content=upload(ndjson))
+        assert response.status_code == 200
+        result = response.json()
+        assert result["imported"] == 2
+        assert result["failed"] == 1
+        assert result["errors"][0]["line"] == 2
+        assert "company" in result["errors"][0]["error"]
+        
+        exported = self.client.get("/api/JobApplications/export?format=csv").content
+        response = self.client.post("/api/JobApplications/import?format=csv", content=upload(exported))
+        assert response.json() == {"imported": 5, "failed": 0, "errors": []}
+        job_apps = self.client.get("/api/JobApplications").json()
+        assert len(job_apps) == 10
+        assert [app["jobTitle"] for app in job_apps[5:]] == [app["jobTitle"] for app in job_apps[:5]]
+    
     def test_create_job_application(self):
         """Test creating a new job application"""
         job_data = {
@@ -111,6 +295,64 @@ class TestJobApplicationAPI:
         assert new_apps[0]["jobTitle"] == "Frontend Developer"
         assert new_apps[1]["jobTitle"] == "Backend Developer"
     
+    def test_bulk_create_update_delete_and_get(self):
+        """Test the batch endpoints and their per-item results"""
+        response = self.client.post("/api/JobApplications/bulk", json=[
+            {"jobTitle": "Bulk 1", "company": "Batch Co", "dateApplied": "2025-08-20", "status": "Applied"},
+            {"jobTitle": "Bulk 2", "company": "Batch Co", "dateApplied": "2025-08-21", "status": "Applied"},
+        ])
+        assert response.status_code == 200
+        assert response.json() == [
+            {"id": 4, "success": True, "error": None},
+            {"id": 5, "success": True, "error": None},
+        ]
+        
+        response = self.client.put("/api/JobApplications/bulk", json=[
+            {"id": 4, "jobTitle": "Bulk 1b", "company": "Batch Co", "dateApplied": "2025-08-22", "status": "Interview"},
+            {"id": 999, "jobTitle": "Ghost", "company": "Batch Co", "dateApplied": "2025-08-22", "status": "Interview"},
+        ])
+        assert response.status_code == 200
+        assert [item["success"] for item in response.json()] == [True, False]
+        assert response.json()[1]["error"] == "Job application not found"
+        
+        response = self.client.post("/api/JobApplications/bulk/delete", json=[5, 999])
+        assert response.status_code == 200
+        assert [item["success"] for item in response.json()] == [True, False]
+        
+        response = self.client.get("/api/JobApplications/bulk?ids=4&ids=5&ids=1")
+        assert response.status_code == 200
+        items = response.json()
+        assert items[0]["jobTitle"] == "Bulk 1b"
+        assert items[1] is None
+        assert items[2]["id"] == 1
+    
+    def test_bulk_reports_invalid_items_individually(self):
+        """Test that an invalid item fails on its own while the rest of the batch is applied"""
+        response = self.client.post("/api/JobApplications/bulk", json=[
+            {"jobTitle": "Valid", "company": "Batch Co", "dateApplied": "2025-08-20", "status": "Applied"},
+            {"jobTitle": "Missing company", "dateApplied": "2025-08-20", "status": "Applied"},
+            "not an object",
+            {"jobTitle": "Also valid", "company": "Batch Co", "dateApplied": "2025-08-21", "status": "Applied"},
+        ])
+        assert response.status_code == 200
+        results = response.json()
+        assert [(item["id"], item["success"]) for item in results] == [(4, True), (None, False), (None, False), (5, True)]
+        assert "company" in results[1]["error"]
+        assert len(self.client.get("/api/JobApplications").json()) == 5
+        
+        response = self.client.put("/api/JobApplications/bulk", json=[
+            {"id": 4, "jobTitle": "Updated", "company": "Batch Co", "dateApplied": "2025-08-22", "status": "Offer"},
+            {"id": 5, "jobTitle": "No date", "company": "Batch Co", "status": "Offer"},
+            {"id": 999, "jobTitle": "Ghost", "company": "Batch Co", "dateApplied": "2025-08-22", "status": "Offer"},
+        ])
+        results = response.json()
+        assert [(item["id"], item["success"]) for item in results] == [(4, True), (5, False), (999, False)]
+        assert "dateApplied" in results[1]["error"]
+        assert results[2]["error"] == "Job application not found"
+        assert self.client.get("/api/JobApplications/5").json()["jobTitle"] == "Also valid"
+        
+        assert self.client.post("/api/JobApplications/bulk", json={"not": "a list"}).status_code == 422
+    
     def test_update_job_application(self):
         """Test updating an existing job application"""
         # Update sample data job application with id=1
@@ -152,6 +394,63 @@ class TestJobApplicationAPI:
         assert response.status_code == 404
         assert response.json()["detail"] == "Job application not found"
     
+    def test_patch_job_application(self):
+        """Test that PATCH changes only the fields sent and returns the record"""
+        before = self.client.get("/api/JobApplications/1").json()
+        response = self.client.patch("/api/JobApplications/1", json={"status": "Interview"})
+        assert response.status_code == 200
+        assert response.json() == dict(before, status="Interview")
+        assert self.client.get("/api/JobApplications/1").json() == dict(before, status="Interview")
+        
+        response = self.client.patch("/api/JobApplications/1", json={"salary": None})
+        assert response.json()["salary"] is None
+        assert response.json()["status"] == "Interview"
+    
+    def test_noop_patch_keeps_etag(self):
+        """Test that a patch repeating the stored values leaves the data version alone"""
+        etag = self.client.get("/api/JobApplications").headers["etag"]
+        current = self.client.get("/api/JobApplications/2").json()
+        response = self.client.patch("/api/JobApplications/2", json={"status": current["status"]})
+        assert response.status_code == 200
+        assert self.client.get("/api/JobApplications", headers={"If-None-Match": etag}).status_code == 304
+    
+    def test_patch_validation_and_missing_record(self):
+        """Test that required fields cannot be nulled and unknown ids return 404"""
+        response = self.client.patch("/api/JobApplications/1", json={"status": None})
+        assert response.status_code == 422
+        response = self.client.patch("/api/JobApplications/999", json={"status": "Offer"})
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Job application not found"
+    
+    def test_delta_sync(self):
+        """Test a full sync followed by a sync of only what changed since its token"""
+        full = self.client.get("/api/JobApplications/changes").json()
+        assert [app["id"] for app in full["records"]] == [1, 2, 3]
+        assert full["deleted"] == [] and not full["hasMore"]
+        
+        self.client.patch("/api/JobApplications/2", json={"status": "Offer"})
+        self.client.delete("/api/JobApplications/3")
+        response = self.client.get("/api/JobApplications/changes", params={"since": full["token"]})
+        assert response.status_code == 200
+        changes = response.json()
+        assert [(app["id"], app["status"]) for app in changes["records"]] == [(2, "Offer")]
+        assert changes["deleted"] == [3]
+        assert f'"{changes["token"]}"' == self.client.get("/api/JobApplications").headers["etag"]
+        
+        response = self.client.get("/api/JobApplications/changes", params={"since": "stale-1"})
+        assert response.status_code == 410
+    
+    def test_delta_sync_from_list_etag(self):
+        """Test that the list ETag header value can be passed as the sync token unchanged"""
+        etag = self.client.get("/api/JobApplications").headers["etag"]
+        assert etag.startswith('"')
+        self.client.patch("/api/JobApplications/2", json={"status": "Offer"})
+        
+        for since in (etag, f"W/{etag}"):
+            response = self.client.get("/api/JobApplications/changes", params={"since": since})
+            assert response.status_code == 200
+            assert [app["id"] for app in response.json()["records"]] == [2]
+    
     def test_delete_job_application(self):
         """Test deleting an existing job application"""
         # Delete sample job application with id=1
@@ -329,4 +628,328 @@ class TestJobApplicationAPI:
         # Verify special characters are preserved
         new_apps = [app for app in job_apps if "React/Vue.js 🚀" in app["jobTitle"]]
         assert len(new_apps) == 1
-        assert new_apps[0]["company"] == "Tech Corp & Co."
\ No newline at end of file
+        assert new_apps[0]["company"] == "Tech Corp & Co."
+
+
+class TestMetrics:
+    """Tests for the Prometheus /metrics endpoint"""
+    
+    def setup_method(self):
+        self.client = TestClient(app)
+    
+    def _samples(self):
+        response = self.client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        samples = {}
+        for line in response.text.splitlines():
+            if line and not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+    
+    def test_requests_are_counted_by_route_template(self):
+        """Test that requests for different ids share one series labelled with the route"""
+        item = 'method="GET",route="/api/JobApplications/{id}"'
+        before = self._samples()
+        for id in (1, 2, 999):
+            self.client.get(f"/api/JobApplications/{id}")
+        after = self._samples()
+        
+        def increase(name):
+            return after.get(name, 0) - before.get(name, 0)
+        
+        assert increase(f'job_tracker_http_requests_total{{{item},status="200"}}') == 2
+        assert increase(f'job_tracker_http_requests_total{{{item},status="404"}}') == 1
+        assert increase(f"job_tracker_http_request_seconds_count{{{item}}}") == 3
+        assert increase(f'job_tracker_http_request_seconds_bucket{{{item},le="+Inf"}}') == 3
+        assert not any("/api/JobApplications/1" in name for name in after)
+    
+    def test_database_metrics(self):
+        """Test that record count, file size and save metrics reflect the database"""
+        import os
+        before = self._samples()
+        self.client.post("/api/JobApplications", json={
+            "jobTitle": "Metrics Engineer",
+            "company": "Observability Inc.",
+            "dateApplied": "2025-08-20",
+            "status": "Applied"
+        })
+        after = self._samples()
+        
+        assert after["job_tracker_records"] == len(db.get_all_job_applications())
+        assert after["job_tracker_storage_bytes"] == os.path.getsize(db._db_file)
+        assert after["job_tracker_save_seconds_count"] == before["job_tracker_save_seconds_count"] + 1
+        assert after["job_tracker_save_bytes_sum"] - before["job_tracker_save_bytes_sum"] == os.path.getsize(db._db_file)
+        assert after["job_tracker_lock_wait_seconds_count"] > before["job_tracker_lock_wait_seconds_count"]
+        assert "job_tracker_load_seconds" in after
+
+
+class TestChangeEvents:
+    """Tests for the Server-Sent Events change feed"""
+    
+    def test_writes_are_pushed_to_connected_clients(self):
+        """Test that creates, patches and deletes reach an open event stream"""
+        import asyncio
+        import httpx
+        
+        async def scenario():
+            body = []
+            done = asyncio.Event()
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": "/api/JobApplications/events", "raw_path": b"/api/JobApplications/events",
+                "query_string": b"", "root_path": "", "headers": [], "server": ("test", 80), "client": ("test", 1),
+            }
+            requested = False
+            
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await done.wait()
+                return {"type": "http.disconnect"}
+            
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    assert message["status"] == 200
+                    assert (b"content-type", b"text/event-stream; charset=utf-8") in message["headers"]
+                elif message.get("body"):
+                    body.append(message["body"])
+                    if b"event: delete" in message["body"]:
+                        done.set()
+            
+            stream = asyncio.ensure_future(app(scope, receive, send))
+            while not body:
+                await asyncio.sleep(0.01)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                id = (await client.post("/api/JobApplications", json={
+                    "jobTitle": "Streaming Engineer",
+                    "company": "Events Inc.",
+                    "dateApplied": "2025-08-20",
+                    "status": "Applied"
+                })).json()
+                await client.patch(f"/api/JobApplications/{id}", json={"status": "Interview"})
+                await client.delete(f"/api/JobApplications/{id}")
+            await asyncio.wait_for(stream, 5)
+            return id, b"".join(body).decode("utf-8")
+        
+        id, text = asyncio.run(scenario())
+        events = [
+            json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")
+        ]
+        assert [event.get("op") for event in events] == [None, "create", "update", "delete"]
+        assert events[1]["record"]["jobTitle"] == "Streaming Engineer"
+        assert events[2] == {"seq": events[1]["seq"] + 1, "op": "update", "id": id, "fields": {"status": "Interview"}}
+        assert events[3]["id"] == id
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header and access log"""
+    
+    @pytest.fixture(autouse=True)
+    def timing_settings(self):
+        import timing
+        header, access_log = timing.SETTINGS.header, timing.SETTINGS.access_log
+        yield timing.SETTINGS
+        timing.SETTINGS.header, timing.SETTINGS.access_log = header, access_log
+    
+    def setup_method(self):
+        self.client = TestClient(app)
+    
+    @staticmethod
+    def _durations(header):
+        durations = {}
+        for metric in header.split(", "):
+            name, *params = metric.split(";")
+            durations[name] = float(next(param for param in params if param.startswith("dur="))[4:])
+        return durations
+    
+    def test_disabled_by_default(self, timing_settings):
+        """Test that no header is sent while timing is switched off"""
+        timing_settings.header = False
+        timing_settings.access_log = False
+        response = self.client.get("/api/JobApplications")
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+    
+    def test_header_breaks_down_phases(self, timing_settings):
+        """Test that writes report storage time and reads report encoding time"""
+        timing_settings.header = True
+        response = self.client.post("/api/JobApplications", json={
+            "jobTitle": "Timing Engineer",
+            "company": "Latency Labs",
+            "dateApplied": "2025-08-20",
+            "status": "Applied"
+        })
+        write = self._durations(response.headers["server-timing"])
+        assert list(write) == ["lock", "storage", "encode", "total"]
+        assert write["storage"] > 0
+        assert write["total"] >= write["storage"]
+        
+        read = self._durations(self.client.get("/api/JobApplications").headers["server-timing"])
+        assert read["encode"] > 0
+        assert read["storage"] == 0
+    
+    def test_access_log(self, timing_settings, caplog):
+        """Test that the access log line names the route and includes body streaming"""
+        import logging
+        timing_settings.header = False
+        timing_settings.access_log = True
+        with caplog.at_level(logging.INFO, logger="job_tracker.access"):
+            response = self.client.get("/api/JobApplications/export")
+        assert "server-timing" not in response.headers
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry["route"] == "/api/JobApplications/export"
+        assert entry["status"] == 200
+        assert entry["encode_ms"] > 0
+        assert set(entry) == {"method", "path", "route", "status", "duration_ms", "lock_ms", "storage_ms", "encode_ms"}
+
+
+class TestProfiling:
+    """Tests for on-demand request profiling"""
+    
+    @pytest.fixture(autouse=True)
+    def profiling_settings(self, tmp_path):
+        import profiling
+        saved = vars(profiling.SETTINGS).copy()
+        profiling.SETTINGS.enabled = True
+        profiling.SETTINGS.sample_rate = 0.0
+        profiling.SETTINGS.directory = str(tmp_path)
+        profiling.SETTINGS.keep = 100
+        yield profiling.SETTINGS
+        vars(profiling.SETTINGS).update(saved)
+    
+    def setup_method(self):
+        self.client = TestClient(app)
+    
+    def test_only_requested_profiles_are_taken(self, tmp_path):
+        """Test that only requests with the X-Profile header are profiled"""
+        response = self.client.get("/api/JobApplications/1")
+        assert "x-profile-id" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+        
+        response = self.client.get("/api/JobApplications/1", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        id = response.headers["x-profile-id"]
+        assert sorted(path.name for path in tmp_path.iterdir()) == [f"{id}.json", f"{id}.prof"]
+    
+    def test_profile_includes_database_calls(self):
+        """Test that the report covers the handler and the database call on its worker thread"""
+        id = self.client.get("/api/JobApplications/1", headers={"X-Profile": "1"}).headers["x-profile-id"]
+        
+        profiles = self.client.get("/debug/profiles").json()
+        assert profiles[0]["id"] == id
+        assert profiles[0]["route"] == "/api/JobApplications/{id}"
+        assert profiles[0]["status"] == 200
+        
+        report = self.client.get(f"/debug/profiles/{id}", params={"limit": 1000}).text
+        assert "get_job_application_by_id" in report
+        assert "get_job_application" in report
+        
+        raw = self.client.get(f"/debug/profiles/{id}", params={"format": "pstats"})
+        assert raw.status_code == 200
+        assert len(raw.content) > 0
+        
+        assert self.client.get("/debug/profiles/..%2Fmain").status_code == 404
+        assert self.client.get("/debug/profiles/unknown").status_code == 404
+    
+    def test_sampling_and_rotation(self, profiling_settings, tmp_path):
+        """Test that sampled profiles are taken without the header and only the newest are kept"""
+        profiling_settings.sample_rate = 1.0
+        profiling_settings.keep = 3
+        ids = [self.client.get("/api/JobApplications").headers["x-profile-id"] for _ in range(5)]
+        
+        assert [profile["id"] for profile in self.client.get("/debug/profiles").json()] == ids[:1:-1]
+        assert len(list(tmp_path.iterdir())) == 6
+    
+    def test_streams_are_not_profiled(self, profiling_settings, tmp_path):
+        """Test that streaming endpoints, which can stay open for hours, are never profiled"""
+        profiling_settings.sample_rate = 1.0
+        response = self.client.get("/api/JobApplications/export", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+        assert "x-profile-id" in self.client.get("/api/JobApplications").headers
+    
+    def test_disabled(self, profiling_settings):
+        """Test that the header is ignored and the endpoints hidden while profiling is disabled"""
+        profiling_settings.enabled = False
+        response = self.client.get("/api/JobApplications", headers={"X-Profile": "1"})
+        assert "x-profile-id" not in response.headers
+        assert self.client.get("/debug/profiles").status_code == 404
+
+
+@pytest.mark.slow
+class TestReadLatencyDuringWrites:
+    """Load test: reads must stay fast while a large snapshot is being written"""
+    
+    RECORDS = 40000
+    
+    def _seed(self):
+        import json
+        with open(db._db_file, "w") as f:
+            json.dump({
+                "next_id": self.RECORDS + 1,
+                "job_applications": [
+                    {
+                        "id": i,
+                        "jobTitle": f"Engineer {i}",
+                        "company": f"Company {i % 50}",
+                        "dateApplied": "2025-08-20",
+                        "status": "Applied",
+                        "description": "Seeded for the read latency load test " * 4,
+                        "location": "Remote"
+                    }
+                    for i in range(1, self.RECORDS + 1)
+                ]
+            }, f)
+        db._load_data()
+    
+    @staticmethod
+    def _p99(latencies):
+        latencies = sorted(latencies)
+        return latencies[int(len(latencies) * 0.99) - 1]
+    
+    def test_read_p99_stays_flat_during_large_write(self):
+        """Test that item reads are served while a full-file write is in flight"""
+        import asyncio
+        import time
+        import httpx
+        
+        self._seed()
+        
+        async def timed_get(client, latencies):
+            start = time.perf_counter()
+            response = await client.get("/api/JobApplications/1")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+        
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                idle = []
+                for _ in range(100):
+                    await timed_get(client, idle)
+                
+                during_write = []
+                write_start = time.perf_counter()
+                write = asyncio.ensure_future(client.post("/api/JobApplications", json={
+                    "jobTitle": "Large write",
+                    "company": "Load Test",
+                    "dateApplied": "2025-08-21",
+                    "status": "Applied"
+                }))
+                while not write.done() and time.perf_counter() - write_start < 60:
+                    await timed_get(client, during_write)
+                    await asyncio.sleep(0)
+                response = await write
+                assert response.status_code == 200
+                return idle, during_write, time.perf_counter() - write_start
+        
+        idle, during_write, write_duration = asyncio.run(scenario())
+        
+        assert len(during_write) >= 20, "reads were not served while the write was in flight"
+        assert self._p99(during_write) < max(10 * self._p99(idle), 0.02)
+        assert self._p99(during_write) < write_duration / 4
\ No newline at end of file
@@ -0,0 +1,127 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from changefeed import Change, ChangeFeed, changes_from_log_entries
+from database import FileDatabase
+from models import CreateJobApplicationCommand, UpdateJobApplicationCommand
+import asyncio
+import json
+import os
+import threading
+
+
+def parse_messages(chunks):
+    """(event, id, data) of every SSE message in ``chunks``; comments are skipped."""
+    messages = []
+    for block in b"".join(chunks).decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            messages.append((fields["event"], fields["id"], json.loads(fields["data"])))
+    return messages
+
+
+async def take(stream, count: int):
+    """The first ``count`` chunks of ``stream``, which is then closed."""
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        if len(chunks) == count:
+            break
+    await stream.aclose()
+    return chunks
+
+
+def test_read_returns_changes_after_a_sequence_number():
+    feed = ChangeFeed(capacity=3)
+    feed.publish([Change("delete", id) for id in range(1, 5)])
+    
+    assert feed.last_seq == 4
+    assert [change.id for change in feed.read(1)] == [2, 3, 4]
+    assert [change.id for change in feed.read(2, limit=1)] == [3]
+    assert feed.read(4) == []
+    # Change 1 has left the ring buffer
+    assert feed.read(0) is None
+    assert feed.read(5) is None
+
+
+def test_changes_from_log_entries_tell_creates_from_updates():
+    entries = [
+        {"op": "put", "record": {"id": 3, "status": "Offer"}},
+        {"op": "put", "record": {"id": 7, "status": "Applied"}},
+        {"op": "patch", "id": 3, "fields": {"status": "Rejected"}},
+        {"op": "delete", "id": 2},
+    ]
+    changes = changes_from_log_entries(entries, first_new_id=7)
+    assert [(change.op, change.id) for change in changes] == [("update", 3), ("create", 7), ("update", 3), ("delete", 2)]
+    assert changes[2].fields == {"status": "Rejected"}
+
+
+def test_stream_replays_from_an_event_id_then_follows_new_changes():
+    feed = ChangeFeed()
+    feed.publish([Change("delete", 1), Change("delete", 2)])
+    
+    async def scenario():
+        stream = feed.stream(f"{feed.epoch}-1", keepalive=5)
+        later = asyncio.get_running_loop().call_later(0.05, feed.publish, [Change("delete", 3)])
+        chunks = await take(stream, 3)
+        later.cancel()
+        return chunks
+    
+    messages = parse_messages(asyncio.run(scenario()))
+    assert [(event, data["seq"]) for event, _, data in messages] == [("ready", 1), ("delete", 2), ("delete", 3)]
+    assert messages[-1][1] == f"{feed.epoch}-3"
+
+
+def test_stream_resets_clients_that_cannot_be_caught_up():
+    feed = ChangeFeed(capacity=2)
+    feed.publish([Change("delete", id) for id in range(1, 5)])
+    
+    for after in ("1", "otherepoch-4", "garbage"):
+        messages = parse_messages(asyncio.run(take(feed.stream(after), 1)))
+        assert messages == [("reset", f"{feed.epoch}-4", {"seq": 4})]
+
+
+def test_slow_consumer_does_not_hold_up_writers():
+    """Test that a stream that stops reading costs writers nothing and is reset once it resumes"""
+    feed = ChangeFeed(capacity=10)
+    
+    async def scenario():
+        stream = feed.stream()
+        assert parse_messages([await stream.__anext__()])[0][0] == "ready"
+        # The client stops reading while far more changes than the buffer holds are published
+        writer = threading.Thread(target=lambda: [feed.publish([Change("delete", id)]) for id in range(100)])
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        chunks = await take(stream, 1)
+        return chunks
+    
+    assert parse_messages(asyncio.run(scenario())) == [("reset", f"{feed.epoch}-100", {"seq": 100})]
+
+
+def test_database_mutations_are_published_in_commit_order():
+    db_file = "test_job_applications_changes.json"
+    if os.path.exists(db_file):
+        os.remove(db_file)
+    db = FileDatabase(db_file)
+    try:
+        id = db.create_job_application(CreateJobApplicationCommand(
+            jobTitle="Feed Engineer", company="Stream Co", dateApplied="2025-08-20", status="Applied"
+        ))
+        db.update_job_application(1, UpdateJobApplicationCommand(
+            jobTitle="Frontend Developer", company="OpenAI", dateApplied="2025-08-20", status="Offer"
+        ))
+        db.patch_job_application(id, {"status": "Interview"})
+        db.patch_job_application(id, {"status": "Interview"})
+        db.delete_job_applications([2, 999])
+        
+        changes = db.changes.read(0)
+        assert [(change.seq, change.op, change.id) for change in changes] == [
+            (1, "create", id), (2, "update", 1), (3, "update", id), (4, "delete", 2)
+        ]
+        assert changes[0].record["jobTitle"] == "Feed Engineer"
+        assert changes[2].fields == {"status": "Interview"}
+    finally:
+        if os.path.exists(db_file):
+            os.remove(db_file)
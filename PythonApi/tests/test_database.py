@@ -3,9 +3,17 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import FileDatabase
+from database import FileDatabase, INDEX_FACTORIES, JobApplicationRecord
+from indexes import TextIndex
+from sqlite_database import SqliteDatabase
+from binary_database import BinaryDatabase, convert_binary_to_json, convert_json_to_binary
+from record_file import CorruptEntryError
+from sharded_database import ShardedDatabase, reshard
 from models import JobApplication, CreateJobApplicationCommand, UpdateJobApplicationCommand
+from pydantic import ValidationError
+import json
 import os
+import shutil
 
 
 class TestFileDatabase:
@@ -27,7 +35,7 @@ class TestFileDatabase:
         """Test that database starts with sample data"""
         job_apps = self.db.get_all_job_applications()
         assert len(job_apps) == 3  # Sample data has 3 entries
-        assert all(isinstance(app, JobApplication) for app in job_apps)
+        assert all(isinstance(app, JobApplicationRecord) for app in job_apps)
     
     def test_create_single_job_application(self):
         """Test creating a single job application"""
@@ -155,6 +163,496 @@ class TestFileDatabase:
         job_app = self.db.get_job_application_by_id(999)
         assert job_app is None
     
+    def test_update_and_delete_preserve_order(self):
+        """Test that point updates and deletes keep the remaining records in order"""
+        update_command = UpdateJobApplicationCommand(
+            jobTitle="Reordered?",
+            company="Google",
+            dateApplied="2025-08-10",
+            status="Offer"
+        )
+        assert self.db.update_job_application(1, update_command) == True
+        assert self.db.delete_job_application(2) == True
+        
+        job_apps = self.db.get_all_job_applications()
+        assert [app.id for app in job_apps] == [1, 3]
+        assert job_apps[0].jobTitle == "Reordered?"
+    
+    def test_keyset_pagination(self):
+        """Test paging through records with a limit and an after_id cursor"""
+        for i in range(4):
+            self.db.create_job_application(CreateJobApplicationCommand(
+                jobTitle=f"Paged Job {i}",
+                company="Pager Inc",
+                dateApplied="2025-08-20",
+                status="Applied"
+            ))
+        self.db.delete_job_application(2)
+        self.db.delete_job_application(5)
+        
+        page, cursor = self.db.get_job_applications_page(limit=2)
+        assert [app.id for app in page] == [1, 3]
+        assert cursor == 3
+        
+        page, cursor = self.db.get_job_applications_page(after_id=cursor, limit=2)
+        assert [app.id for app in page] == [4, 6]
+        assert cursor == 6
+        
+        page, cursor = self.db.get_job_applications_page(after_id=cursor, limit=2)
+        assert [app.id for app in page] == [7]
+        assert cursor is None
+    
+    def test_pagination_after_many_deletes(self):
+        """Test that pages stay correct once deleted ids are compacted away"""
+        ids = [
+            self.db.create_job_application(CreateJobApplicationCommand(
+                jobTitle=f"Job {i}",
+                company="Churn Corp",
+                dateApplied="2025-08-20",
+                status="Applied"
+            ))
+            for i in range(10)
+        ]
+        for id in [1, 2, 3] + ids[:8]:
+            self.db.delete_job_application(id)
+        
+        page, cursor = self.db.get_job_applications_page(limit=5)
+        assert [app.id for app in page] == ids[8:]
+        assert cursor is None
+        assert self.db.get_job_applications_page(after_id=ids[-1], limit=5) == ([], None)
+    
+    def test_query_filters_by_status_company_and_date(self):
+        """Test filtering through the status, company and dateApplied indexes"""
+        page, cursor = self.db.query_job_applications(status="interview")
+        assert [app.id for app in page] == [2]
+        assert cursor is None
+        
+        page, _ = self.db.query_job_applications(company="OPENAI")
+        assert [app.id for app in page] == [1]
+        
+        page, _ = self.db.query_job_applications(date_from="2025-08-06", date_to="2025-08-15")
+        assert [app.id for app in page] == [1, 2]
+        
+        page, _ = self.db.query_job_applications(status="Rejected", date_to="2025-08-10")
+        assert page == []
+    
+    def test_query_sorting_and_paging(self):
+        """Test sorting on indexed fields combined with keyset paging"""
+        page, _ = self.db.query_job_applications(sort="dateApplied")
+        assert [app.id for app in page] == [3, 2, 1]
+        
+        page, _ = self.db.query_job_applications(sort="-company")
+        assert [app.company for app in page] == ["OpenAI", "Microsoft", "Google"]
+        
+        page, cursor = self.db.query_job_applications(sort="status", limit=2)
+        assert [app.status for app in page] == ["Applied", "Interview"]
+        page, cursor = self.db.query_job_applications(sort="status", after_id=cursor, limit=2)
+        assert [app.status for app in page] == ["Rejected"]
+        assert cursor is None
+        
+        page, cursor = self.db.query_job_applications(sort="-dateApplied", limit=1)
+        page, _ = self.db.query_job_applications(sort="-dateApplied", after_id=cursor)
+        assert [app.id for app in page] == [2, 3]
+    
+    def test_sorted_paging_survives_changes_to_the_cursor_record(self):
+        """Test that a sorted page resumes after the cursor's (value, id) when that record changed or went"""
+        page, cursor = self.db.query_job_applications(sort="dateApplied", limit=1)
+        assert [app.id for app in page] == [3]
+        self.db.patch_job_application(3, {"dateApplied": "2030-01-01"})
+        page, _ = self.db.query_job_applications(sort="dateApplied", after_id=cursor, after_value="2025-08-05")
+        assert [app.id for app in page] == [2, 1, 3]
+        
+        page, cursor = self.db.query_job_applications(sort="company", limit=1)
+        assert [app.company for app in page] == ["Google"]
+        self.db.delete_job_application(cursor)
+        page, _ = self.db.query_job_applications(sort="company", after_id=cursor, after_value="Google")
+        assert [app.company for app in page] == ["Microsoft", "OpenAI"]
+    
+    def test_date_sorted_pages_walk_the_date_index(self):
+        """Test paging by date in both directions, within a date range, without a full sort"""
+        ids = self.db.create_job_applications([
+            CreateJobApplicationCommand(jobTitle=f"Dated {i}", company="Date Corp", dateApplied="2025-08-10", status="Applied")
+            for i in range(3)
+        ])
+        seen, cursor, value = [], None, None
+        while True:
+            page, cursor = self.db.query_job_applications(sort="-dateApplied", after_id=cursor, after_value=value, limit=2)
+            seen += [app.id for app in page]
+            if cursor is None:
+                break
+            value = page[-1].dateApplied
+        assert seen == [1] + ids[::-1] + [2, 3]
+        
+        page, cursor = self.db.query_job_applications(sort="dateApplied", date_from="2025-08-06", date_to="2025-08-14", limit=3)
+        assert [app.id for app in page] == [2] + ids[:2]
+        page, cursor = self.db.query_job_applications(
+            sort="dateApplied", date_from="2025-08-06", date_to="2025-08-14", after_id=cursor, after_value="2025-08-10", limit=3
+        )
+        assert [app.id for app in page] == ids[2:]
+        assert cursor is None
+    
+    def test_query_rejects_unknown_sort_field(self):
+        """Test that sorting by a non-indexed field is refused"""
+        with pytest.raises(ValueError):
+            self.db.query_job_applications(sort="salary")
+    
+    def test_indexes_stay_consistent_after_updates_and_deletes(self):
+        """Test that index-backed queries match a brute-force scan after random mutations"""
+        import random
+        
+        rng = random.Random(7)
+        statuses = ["Applied", "Interview", "Offer", "Rejected"]
+        companies = ["Acme", "Globex", "Initech"]
+        for i in range(40):
+            self.db.create_job_application(CreateJobApplicationCommand(
+                jobTitle=f"Job {i}",
+                company=rng.choice(companies),
+                dateApplied=f"2025-08-{rng.randint(1, 28):02d}",
+                status=rng.choice(statuses)
+            ))
+        for _ in range(60):
+            ids = [app.id for app in self.db.get_all_job_applications()]
+            id = rng.choice(ids)
+            if rng.random() < 0.3:
+                self.db.delete_job_application(id)
+            else:
+                self.db.update_job_application(id, UpdateJobApplicationCommand(
+                    jobTitle="Changed",
+                    company=rng.choice(companies),
+                    dateApplied=f"2025-08-{rng.randint(1, 28):02d}",
+                    status=rng.choice(statuses)
+                ))
+        
+        all_apps = self.db.get_all_job_applications()
+        for status in statuses:
+            for company in companies:
+                expected = [
+                    app.id for app in all_apps
+                    if app.status == status and app.company == company
+                    and "2025-08-05" <= app.dateApplied <= "2025-08-20"
+                ]
+                page, _ = self.db.query_job_applications(
+                    status=status, company=company, date_from="2025-08-05", date_to="2025-08-20"
+                )
+                assert [app.id for app in page] == expected
+        
+        page, _ = self.db.query_job_applications(sort="dateApplied")
+        assert [app.id for app in page] == [
+            app.id for app in sorted(all_apps, key=lambda app: (app.dateApplied, app.id))
+        ]
+    
+    def test_stats_match_brute_force_after_random_mutations(self):
+        """Test that incrementally kept stats equal a full recount after every mutation"""
+        import random
+        from collections import Counter
+        from datetime import date, timedelta
+        
+        def recount():
+            all_apps = self.db.get_all_job_applications()
+            weeks = Counter()
+            for app in all_apps:
+                try:
+                    day = date.fromisoformat(app.dateApplied)
+                except ValueError:
+                    continue
+                weeks[(day - timedelta(days=day.weekday())).isoformat()] += 1
+            return {
+                "total": len(all_apps),
+                "byStatus": dict(Counter(app.status for app in all_apps)),
+                "byCompany": dict(Counter(app.company for app in all_apps)),
+                "byWeek": dict(weeks),
+            }
+        
+        def random_fields():
+            return dict(
+                jobTitle="Job",
+                company=rng.choice(["Acme", "Globex", "Initech"]),
+                # Mostly real dates spread over several weeks, some that are not dates at all
+                dateApplied=rng.choice([f"2025-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d}", "soon", "2025-02-30"]),
+                status=rng.choice(["Applied", "Interview", "Offer", "Rejected", "applied"])
+            )
+        
+        rng = random.Random(11)
+        for step in range(150):
+            ids = [app.id for app in self.db.get_all_job_applications()]
+            action = rng.random()
+            if action < 0.4 or not ids:
+                self.db.create_job_application(CreateJobApplicationCommand(**random_fields()))
+            elif action < 0.75:
+                self.db.update_job_application(rng.choice(ids), UpdateJobApplicationCommand(**random_fields()))
+            elif action < 0.9:
+                self.db.delete_job_application(rng.choice(ids))
+            else:
+                self.db.create_job_applications([CreateJobApplicationCommand(**random_fields()) for _ in range(3)])
+            stats = self.db.get_job_application_stats()
+            assert stats.dict() == recount(), f"stats diverged at step {step}"
+    
+    def test_search_matches_words_and_prefixes(self):
+        """Test full-text search across title, company, description and location"""
+        assert [app.id for app in self.db.search_job_applications("google")] == [2]
+        assert [app.id for app in self.db.search_job_applications("linked")] == [1]
+        assert [app.id for app in self.db.search_job_applications("seattle full")] == [3]
+        assert [app.id for app in self.db.search_job_applications("developer")] == [1, 2]
+        assert self.db.search_job_applications("developer seattle") == []
+        assert self.db.search_job_applications("   ") == []
+    
+    def test_search_ranks_title_matches_first(self):
+        """Test that a match in the job title outranks one in the description"""
+        self.db.create_job_application(CreateJobApplicationCommand(
+            jobTitle="Platform Engineer",
+            company="Acme",
+            dateApplied="2025-08-20",
+            status="Applied",
+            description="Kubernetes platform team"
+        ))
+        self.db.create_job_application(CreateJobApplicationCommand(
+            jobTitle="Kubernetes Engineer",
+            company="Globex",
+            dateApplied="2025-08-21",
+            status="Applied"
+        ))
+        results = self.db.search_job_applications("kubernetes")
+        assert [app.jobTitle for app in results] == ["Kubernetes Engineer", "Platform Engineer"]
+        assert len(self.db.search_job_applications("kubernetes", limit=1)) == 1
+    
+    def test_search_index_follows_updates_and_deletes(self):
+        """Test that the inverted index is maintained on every mutation"""
+        self.db.update_job_application(2, UpdateJobApplicationCommand(
+            jobTitle="Site Reliability Engineer",
+            company="Alphabet",
+            dateApplied="2025-08-10",
+            status="Interview"
+        ))
+        assert self.db.search_job_applications("google") == []
+        assert [app.id for app in self.db.search_job_applications("reliab")] == [2]
+        
+        self.db.delete_job_application(2)
+        assert self.db.search_job_applications("alphabet") == []
+        assert [app.id for app in self.db.search_job_applications("developer")] == [1]
+    
+    def test_search_index_is_built_outside_the_lock(self, monkeypatch):
+        """Test that writes made while the text index is built go through and are caught up"""
+        db = self.db
+        
+        class WritingTextIndex(TextIndex):
+            def rebuild(self, records):
+                assert not db._lock.locked()
+                db.patch_job_application(1, {"jobTitle": "Platform Engineer"})
+                db.delete_job_application(2)
+                db.create_job_application(CreateJobApplicationCommand(
+                    jobTitle="Frontend Lead", company="New Corp", dateApplied="2025-08-20", status="Applied"
+                ))
+                super().rebuild(records)
+        
+        monkeypatch.setitem(INDEX_FACTORIES, "text", WritingTextIndex)
+        assert [app.id for app in self.db.search_job_applications("frontend")] == [4]
+        assert [app.id for app in self.db.search_job_applications("platform")] == [1]
+        assert self.db.search_job_applications("mountain") == []
+    
+    def test_version_tags_change_with_the_data(self):
+        """Test that data and record version tags change only when written"""
+        data_tag = self.db.version_tag()
+        first_tag = self.db.version_tag(1)
+        second_tag = self.db.version_tag(2)
+        assert self.db.version_tag(999) is None
+        assert self.db.version_tag() == data_tag
+        
+        self.db.update_job_application(2, UpdateJobApplicationCommand(
+            jobTitle="Changed", company="Google", dateApplied="2025-08-10", status="Offer"
+        ))
+        assert self.db.version_tag() != data_tag
+        assert self.db.version_tag(1) == first_tag
+        assert self.db.version_tag(2) != second_tag
+        
+        data_tag = self.db.version_tag()
+        assert self.db.delete_job_application(999) == False
+        assert self.db.version_tag() == data_tag
+        assert self.db.delete_job_application(1)
+        assert self.db.version_tag(1) is None
+    
+    def test_encoded_json_follows_mutations(self):
+        """Test that cached JSON encodings match the records after every write"""
+        def expected(job_apps):
+            return [app._asdict() if app is not None else None for app in job_apps]
+        
+        job_apps = self.db.get_all_job_applications()
+        assert json.loads(self.db.encode_job_applications(job_apps)) == expected(job_apps)
+        assert self.db.encode_job_applications(job_apps) == self.db.encode_job_applications(job_apps)
+        
+        self.db.update_job_application(2, UpdateJobApplicationCommand(
+            jobTitle="Développeur", company="Google", dateApplied="2025-08-10", status="Offer"
+        ))
+        self.db.delete_job_application(3)
+        job_apps = self.db.get_all_job_applications()
+        encoded = self.db.encode_job_applications(job_apps)
+        assert json.loads(encoded) == expected(job_apps)
+        assert "Développeur".encode("utf-8") in encoded
+        
+        found = self.db.get_job_applications_by_ids([2, 3])
+        assert json.loads(self.db.encode_job_applications(found)) == expected(found)
+        assert json.loads(self.db.encode_job_application(found[0]))["jobTitle"] == "Développeur"
+    
+    def test_iter_job_applications_reads_one_version(self):
+        """Test that iteration is unaffected by writes made while it runs"""
+        records = self.db.iter_job_applications()
+        first = next(records)
+        self.db.delete_job_application(3)
+        assert [first.id] + [app.id for app in records] == [1, 2, 3]
+        assert [app.id for app in self.db.iter_job_applications()] == [1, 2]
+    
+    def test_snapshot_follows_writes_between_reads(self):
+        """Test that every snapshot, merged from the previous one and the writes since, matches the data"""
+        def rows():
+            return [(app.id, app.jobTitle, app.status) for app in self.db.get_all_job_applications()]
+        
+        assert rows() == [(1, "Frontend Developer", "Rejected"), (2, "Backend Developer", "Interview"), (3, "Full Stack Engineer", "Applied")]
+        new_id = self.db.create_job_application(CreateJobApplicationCommand(
+            jobTitle="Merged", company="Snapshot Corp", dateApplied="2025-08-21", status="Applied"
+        ))
+        assert rows()[-1] == (new_id, "Merged", "Applied")
+        
+        self.db.patch_job_application(2, {"status": "Offer"})
+        self.db.delete_job_application(1)
+        assert rows() == [(2, "Backend Developer", "Offer"), (3, "Full Stack Engineer", "Applied"), (new_id, "Merged", "Applied")]
+        
+        last_id = self.db.create_job_application(CreateJobApplicationCommand(
+            jobTitle="Gone", company="Snapshot Corp", dateApplied="2025-08-22", status="Applied"
+        ))
+        self.db.delete_job_application(last_id)
+        self.db.delete_job_application(new_id)
+        assert rows() == [(2, "Backend Developer", "Offer"), (3, "Full Stack Engineer", "Applied")]
+    
+    def test_patch_changes_only_given_fields(self):
+        """Test that a patch keeps the other fields and keeps queries, search and stats in step"""
+        before = self.db.get_job_application_by_id(1)
+        tag = self.db.version_tag(1)
+        
+        patched = self.db.patch_job_application(1, {"status": "Offer", "salary": None})
+        assert patched == before._replace(status="Offer", salary=None)
+        assert self.db.get_job_application_by_id(1) == patched
+        assert self.db.version_tag(1) != tag
+        assert [app.id for app in self.db.query_job_applications(status="Offer")[0]] == [1]
+        assert self.db.get_job_application_stats().byStatus.get("Offer") == 1
+        assert [app.id for app in self.db.search_job_applications("frontend")] == [1]
+        
+        self.db.patch_job_application(1, {"jobTitle": "Platform Engineer"})
+        assert self.db.search_job_applications("frontend") == []
+        assert [app.id for app in self.db.search_job_applications("platform")] == [1]
+        assert self.db.get_job_application_by_id(1).status == "Offer"
+        
+        assert self.db.patch_job_application(999, {"status": "Offer"}) is None
+    
+    def test_noop_patch_is_not_written(self):
+        """Test that a patch repeating the stored values changes no version"""
+        job_app = self.db.get_job_application_by_id(2)
+        tag, record_tag = self.db.version_tag(), self.db.version_tag(2)
+        
+        assert self.db.patch_job_application(2, {"status": job_app.status, "company": job_app.company}) == job_app
+        assert self.db.patch_job_application(2, {}) == job_app
+        assert self.db.version_tag() == tag
+        assert self.db.version_tag(2) == record_tag
+    
+    def test_status_patch_leaves_unrelated_indexes_alone(self):
+        """Test that a status patch re-indexes status and stats but not the search index"""
+        for name in ("status", "company", "dateApplied", "text", "stats"):
+            self.db._index(name)
+        touched = []
+        for name, index in self.db._indexes.items():
+            index.remove = lambda record, name=name, remove=index.remove: (touched.append(name), remove(record))
+        
+        self.db.patch_job_application(1, {"status": "Offer"})
+        assert sorted(touched) == ["stats", "status"]
+    
+    def test_changes_since_token(self):
+        """Test that get_changes returns writes and deletes after a token, oldest first"""
+        token = self.db.version_tag()
+        new_id = self.db.create_job_application(CreateJobApplicationCommand(
+            jobTitle="Sync Job", company="Sync Corp", dateApplied="2025-08-20", status="Applied"
+        ))
+        self.db.patch_job_application(2, {"status": "Offer"})
+        self.db.delete_job_application(3)
+        
+        changes = self.db.get_changes(token)
+        assert [app.id for app in changes.job_applications] == [new_id, 2]
+        assert changes.job_applications[1].status == "Offer"
+        assert changes.deleted_ids == [3]
+        assert not changes.has_more
+        assert changes.token == self.db.version_tag()
+        
+        empty = self.db.get_changes(changes.token)
+        assert (empty.job_applications, empty.deleted_ids, empty.token) == ([], [], changes.token)
+    
+    def test_changes_are_paged_without_splitting_a_commit(self):
+        """Test that a page holds whole commits and its token continues from the last one"""
+        token = self.db.version_tag()
+        ids = self.db.create_job_applications([
+            CreateJobApplicationCommand(jobTitle=f"Batch {i}", company="Sync Corp", dateApplied="2025-08-20", status="Applied")
+            for i in range(5)
+        ])
+        self.db.delete_job_application(1)
+        
+        first = self.db.get_changes(token, limit=2)
+        assert [app.id for app in first.job_applications] == ids
+        assert first.deleted_ids == []
+        assert first.has_more
+        second = self.db.get_changes(first.token, limit=2)
+        assert second.job_applications == [] and second.deleted_ids == [1]
+        assert not second.has_more
+        assert second.token == self.db.version_tag()
+    
+    def test_unusable_change_tokens(self):
+        """Test that tokens from elsewhere, from the future or older than the tombstones are refused"""
+        epoch, _, version = self.db.version_tag().rpartition("-")
+        assert self.db.get_changes(f"other-{version}") is None
+        assert self.db.get_changes(f"{epoch}-x") is None
+        assert self.db.get_changes(f"{epoch}-{int(version) + 1}") is None
+        assert self.db.get_changes(self.db.version_tag(1)) is None
+        
+        self.db.close()
+        self.db = type(self.db)(self.test_db_file, tombstone_retention=2)
+        token = self.db.version_tag()
+        for id in (1, 2, 3):
+            self.db.delete_job_application(id)
+        assert self.db.get_changes(token) is None
+        assert self.db.get_changes(self.db.version_tag()).deleted_ids == []
+    
+    def test_bulk_operations_write_storage_once(self):
+        """Test that each batch is persisted with a single write and reports per item"""
+        writes = []
+        original_save = self.db._save_data
+        self.db._save_data = lambda data=None: (writes.append(1), original_save(data))
+        
+        ids = self.db.create_job_applications([
+            CreateJobApplicationCommand(
+                jobTitle=f"Bulk Job {i}",
+                company="Bulk Corp",
+                dateApplied="2025-08-20",
+                status="Applied"
+            )
+            for i in range(5)
+        ])
+        assert ids == [4, 5, 6, 7, 8]
+        assert len(writes) == 1
+        
+        results = self.db.update_job_applications([
+            (4, UpdateJobApplicationCommand(jobTitle="Bulk A", company="Bulk Corp", dateApplied="2025-08-21", status="Interview")),
+            (999, UpdateJobApplicationCommand(jobTitle="Missing", company="None", dateApplied="2025-08-21", status="Applied")),
+        ])
+        assert results == [True, False]
+        assert len(writes) == 2
+        
+        assert self.db.delete_job_applications([5, 6, 999, 5]) == [True, True, False, False]
+        assert len(writes) == 3
+        
+        assert self.db.delete_job_applications([999]) == [False]
+        assert len(writes) == 3
+        
+        found = self.db.get_job_applications_by_ids([4, 5, 1])
+        assert found[0].jobTitle == "Bulk A"
+        assert found[1] is None
+        assert found[2].company == "OpenAI"
+        assert len(self.db.get_all_job_applications()) == 6
+    
     def test_delete_and_update_sequence(self):
         """Test the sequence: delete one job, update another"""
         # Delete job application with id=2
@@ -265,4 +763,622 @@ class TestFileDatabase:
         # Check that we have 30 new job applications + 3 sample = 33 total with unique IDs
         job_apps = self.db.get_all_job_applications()
         assert len(job_apps) == 33
-        assert len(set(results)) == 30  # All new IDs should be unique
\ No newline at end of file
+        assert len(set(results)) == 30  # All new IDs should be unique
+    
+    def test_concurrent_read_throughput(self):
+        """Test that snapshot reads stay consistent and keep going under a mixed read/write load"""
+        import threading
+        import time
+        
+        duration = 0.5
+        stop = threading.Event()
+        read_counts = []
+        inconsistencies = []
+        
+        def read_job_applications():
+            reads = 0
+            last_version = 0
+            while not stop.is_set():
+                snapshot = self.db.snapshot()
+                # Only creates run concurrently, so every version must hold
+                # strictly ascending ids and never go backwards.
+                ids = [app.id for app in snapshot.job_applications]
+                if snapshot.version < last_version or ids != sorted(set(ids)):
+                    inconsistencies.append(snapshot.version)
+                last_version = snapshot.version
+                reads += 1
+            read_counts.append(reads)
+        
+        def write_job_applications():
+            i = 0
+            while not stop.is_set():
+                self.db.create_job_application(CreateJobApplicationCommand(
+                    jobTitle=f"Mixed Load Job {i}",
+                    company="Throughput Inc",
+                    dateApplied="2025-08-20",
+                    status="Applied"
+                ))
+                i += 1
+        
+        readers = [threading.Thread(target=read_job_applications) for _ in range(4)]
+        writer = threading.Thread(target=write_job_applications)
+        for t in readers + [writer]:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in readers + [writer]:
+            t.join()
+        
+        assert inconsistencies == []
+        assert min(read_counts) > 0
+        
+        # Repeated reads of an unchanged version share one snapshot object
+        assert self.db.get_all_job_applications() is self.db.get_all_job_applications()
+
+class TestSqliteDatabase(TestFileDatabase):
+    """Runs the FileDatabase tests against the SQLite engine"""
+    
+    def setup_method(self):
+        """Create a fresh SQLite database for each test"""
+        self.test_db_file = "test_job_applications.db"
+        self._remove_files()
+        self.db = SqliteDatabase(self.test_db_file)
+    
+    def teardown_method(self):
+        """Close connections and remove the database and its WAL files"""
+        self.db.close()
+        self._remove_files()
+    
+    def _remove_files(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_db_file + suffix):
+                os.remove(self.test_db_file + suffix)
+    
+    def test_bulk_operations_write_storage_once(self):
+        """Test that each batch commits one transaction and reports per item"""
+        version = self.db.snapshot().version
+        ids = self.db.create_job_applications([
+            CreateJobApplicationCommand(
+                jobTitle=f"Bulk Job {i}",
+                company="Bulk Corp",
+                dateApplied="2025-08-20",
+                status="Applied"
+            )
+            for i in range(5)
+        ])
+        assert ids == [4, 5, 6, 7, 8]
+        assert self.db.snapshot().version == version + 1
+        
+        assert self.db.delete_job_applications([5, 6, 999, 5]) == [True, True, False, False]
+        assert self.db.delete_job_applications([999]) == [False]
+        assert self.db.snapshot().version == version + 2
+    
+    def test_search_matches_words_and_prefixes(self):
+        """Test full-text search; FTS5's bm25 also favours shorter records on ties"""
+        assert [app.id for app in self.db.search_job_applications("google")] == [2]
+        assert [app.id for app in self.db.search_job_applications("linked")] == [1]
+        assert [app.id for app in self.db.search_job_applications("seattle full")] == [3]
+        assert [app.id for app in self.db.search_job_applications("developer")] == [2, 1]
+        assert self.db.search_job_applications("developer seattle") == []
+        assert self.db.search_job_applications("   ") == []
+    
+    def test_search_index_is_built_outside_the_lock(self):
+        """Test that search sees writes at once; triggers keep the FTS table current, so nothing is built"""
+        self.db.patch_job_application(1, {"jobTitle": "Platform Engineer"})
+        self.db.delete_job_application(2)
+        assert [app.id for app in self.db.search_job_applications("platform")] == [1]
+        assert self.db.search_job_applications("mountain") == []
+    
+    def test_status_patch_leaves_unrelated_indexes_alone(self):
+        """Test that a status patch does not fire the search index trigger"""
+        statements = []
+        self.db._connection().set_trace_callback(statements.append)
+        
+        self.db.patch_job_application(1, {"status": "Offer"})
+        assert not any("job_applications_fts" in statement for statement in statements)
+        
+        self.db.patch_job_application(1, {"jobTitle": "Platform Engineer"})
+        assert any("job_applications_fts" in statement for statement in statements)
+    
+    def test_state_is_shared_between_instances(self):
+        """Test that a second instance, as in another worker process, sees every write"""
+        other = SqliteDatabase(self.test_db_file)
+        try:
+            job_id = other.create_job_application(CreateJobApplicationCommand(
+                jobTitle="Worker Job",
+                company="Shared Corp",
+                dateApplied="2025-08-20",
+                status="Applied"
+            ))
+            assert self.db.get_job_application_by_id(job_id).company == "Shared Corp"
+            assert len(self.db.get_all_job_applications()) == 4
+            assert self.db.delete_job_application(job_id)
+            assert other.get_job_application_by_id(job_id) is None
+        finally:
+            other.close()
+    
+    def test_import_json_preserves_ids(self):
+        """Test migrating a JSON file database, including its next id"""
+        json_file = "test_import_job_applications.json"
+        try:
+            source = FileDatabase(json_file)
+            source.delete_job_application(3)
+            source.create_job_application(CreateJobApplicationCommand(
+                jobTitle="Migrated Job",
+                company="Legacy Corp",
+                dateApplied="2025-08-20",
+                status="Applied"
+            ))
+            source.close()
+            
+            assert self.db.import_json(json_file) == 3
+            assert [app.id for app in self.db.get_all_job_applications()] == [1, 2, 4]
+            assert self.db.get_job_application_by_id(4).company == "Legacy Corp"
+            assert self.db.create_job_application(CreateJobApplicationCommand(
+                jobTitle="After Migration",
+                company="New Corp",
+                dateApplied="2025-08-21",
+                status="Applied"
+            )) == 5
+        finally:
+            if os.path.exists(json_file):
+                os.remove(json_file)
+
+class TestBinaryDatabase(TestFileDatabase):
+    """Runs the FileDatabase tests against the memory-mapped binary engine"""
+    
+    def setup_method(self):
+        """Create a fresh binary database that rewrites its index every few writes"""
+        self.test_db_file = "test_job_applications.bin"
+        self._remove_files()
+        self.db = BinaryDatabase(self.test_db_file, index_after_entries=4)
+    
+    def teardown_method(self):
+        """Close the database and remove its data and index files"""
+        self.db.close()
+        self._remove_files()
+    
+    def _remove_files(self):
+        for suffix in ("", ".idx", ".tmp", ".idx.tmp"):
+            if os.path.exists(self.test_db_file + suffix):
+                os.remove(self.test_db_file + suffix)
+    
+    def _reopen(self, **kwargs):
+        self.db.close()
+        self.db = BinaryDatabase(self.test_db_file, **kwargs)
+    
+    def _command(self, title="Binary Job"):
+        return CreateJobApplicationCommand(
+            jobTitle=title,
+            company="Mapped Corp",
+            dateApplied="2025-08-20",
+            status="Applied"
+        )
+    
+    def test_bulk_operations_write_storage_once(self):
+        """Test that each batch is flushed once and reports per item"""
+        self._reopen(index_after_entries=1000)
+        flushes = []
+        records = self.db._job_applications
+        original_flush = records.flush
+        records.flush = lambda: (flushes.append(1), original_flush())
+        
+        assert self.db.create_job_applications([self._command(f"Bulk Job {i}") for i in range(3)]) == [4, 5, 6]
+        assert len(flushes) == 1
+        assert self.db.delete_job_applications([5, 999, 5]) == [True, False, False]
+        assert len(flushes) == 2
+        assert self.db.delete_job_applications([999]) == [False]
+        assert len(flushes) == 2
+    
+    def test_state_survives_reopen(self):
+        """Test that indexed and appended entries are both found after a restart"""
+        self._reopen(index_after_entries=1000)
+        job_id = self.db.create_job_application(self._command())
+        self.db.update_job_application(1, UpdateJobApplicationCommand(
+            jobTitle="Reopened", company="OpenAI", dateApplied="2025-08-15", status="Offer"
+        ))
+        self.db.delete_job_application(2)
+        assert self.db._job_applications.appended_entries == 3
+        
+        self._reopen()
+        assert [app.id for app in self.db.get_all_job_applications()] == [1, 3, job_id]
+        assert self.db.get_job_application_by_id(1).jobTitle == "Reopened"
+        assert self.db.get_job_application_by_id(2) is None
+        assert self.db.create_job_application(self._command()) == job_id + 1
+    
+    def test_index_rewrite_and_compaction(self):
+        """Test that appended entries are indexed and superseded ones dropped"""
+        for i in range(3):
+            self.db.update_job_application(1, UpdateJobApplicationCommand(
+                jobTitle=f"Revision {i}", company="OpenAI", dateApplied="2025-08-15", status="Applied"
+            ))
+        assert self.db._job_applications.appended_entries == 3
+        size = os.path.getsize(self.test_db_file)
+        
+        # The fourth write supersedes more bytes than are live, so the file is compacted
+        self.db.delete_job_application(3)
+        records = self.db._job_applications
+        assert records.appended_entries == 0
+        assert records.dead_bytes == 0
+        assert os.path.getsize(self.test_db_file) < size
+        assert self.db.get_job_application_by_id(1).jobTitle == "Revision 2"
+        
+        self._reopen()
+        assert [app.id for app in self.db.get_all_job_applications()] == [1, 2]
+        assert self.db.next_id == 4
+    
+    def test_torn_last_entry_is_ignored(self):
+        """Test that a partial entry left by a crash is cut off on open"""
+        self.db.create_job_application(self._command())
+        self.db.close()
+        with open(self.test_db_file, "ab") as f:
+            f.write(b"\x40\x00\x00\x00partial")
+        
+        self._reopen()
+        assert [app.id for app in self.db.get_all_job_applications()] == [1, 2, 3, 4]
+        assert self.db.create_job_application(self._command()) == 5
+        self._reopen()
+        assert len(self.db.get_all_job_applications()) == 5
+    
+    def test_stale_index_is_rebuilt(self):
+        """Test that a missing index, as after a crash while compacting, is rebuilt from the data"""
+        self.db.create_job_application(self._command())
+        self.db.close()
+        os.remove(self.test_db_file + ".idx")
+        
+        self._reopen()
+        assert [app.id for app in self.db.get_all_job_applications()] == [1, 2, 3, 4]
+        assert os.path.exists(self.test_db_file + ".idx")
+    
+    def test_corrupt_entry_is_rejected(self):
+        """Test that a damaged record fails its checksum instead of being served"""
+        self.db.close()
+        with open(self.test_db_file, "r+b") as f:
+            data = f.read()
+            f.seek(data.index(b"Google"))
+            f.write(b"G00gle")
+        
+        self._reopen()
+        assert self.db.get_job_application_by_id(1).company == "OpenAI"
+        with pytest.raises(CorruptEntryError):
+            self.db.get_job_application_by_id(2)
+        # Building an index reads every record; the damage must not pass for
+        # a bad filter, which the API would answer with a 400
+        with pytest.raises(CorruptEntryError):
+            self.db.query_job_applications(status="Applied")
+        assert not issubclass(CorruptEntryError, ValueError)
+    
+    def test_json_round_trip(self):
+        """Test converting to JSON and back, preserving ids and the next id"""
+        json_file = "test_convert_job_applications.json"
+        try:
+            self.db.delete_job_application(3)
+            self.db.create_job_application(self._command("Convert Me"))
+            assert convert_binary_to_json(self.test_db_file, json_file) == 3
+            source = FileDatabase(json_file)
+            assert [app.id for app in source.get_all_job_applications()] == [1, 2, 4]
+            assert source.next_id == 5
+            
+            self._remove_files()
+            assert convert_json_to_binary(json_file, self.test_db_file) == 3
+            self._reopen()
+            assert self.db.get_job_application_by_id(4).jobTitle == "Convert Me"
+            assert self.db.create_job_application(self._command()) == 5
+        finally:
+            if os.path.exists(json_file):
+                os.remove(json_file)
+    
+    def test_conversion_only_reads_the_source(self):
+        """Test that converting leaves the JSON file and its log untouched and refuses a missing file"""
+        json_file = "test_convert_job_applications.json"
+        with pytest.raises(FileNotFoundError):
+            convert_json_to_binary(json_file, self.test_db_file)
+        assert not os.path.exists(json_file)
+        
+        try:
+            source = FileDatabase(json_file, write_ahead_log=True)
+            source.delete_job_application(1)
+            source.create_job_application(self._command("Logged"))
+            source.close()
+            # As after a crash during compaction, which opening the database would finish
+            os.replace(json_file + ".log", json_file + ".log.compacting")
+            before = {path: Path(path).read_bytes() for path in (json_file, json_file + ".log.compacting")}
+            
+            assert convert_json_to_binary(json_file, self.test_db_file) == 3
+            assert {path: Path(path).read_bytes() for path in before} == before
+            assert not os.path.exists(json_file + ".log")
+            self._reopen()
+            assert [app.id for app in self.db.get_all_job_applications()] == [2, 3, 4]
+            assert self.db.get_job_application_by_id(4).jobTitle == "Logged"
+        finally:
+            for suffix in ("", ".log", ".log.compacting"):
+                if os.path.exists(json_file + suffix):
+                    os.remove(json_file + suffix)
+
+
+class TestShardedDatabase(TestFileDatabase):
+    """Runs the FileDatabase tests against the sharded engine"""
+    
+    def setup_method(self):
+        """Create a fresh four-shard database for each test"""
+        self.test_db_file = "test_job_applications.shards"
+        self._remove_files()
+        self.db = ShardedDatabase(self.test_db_file, shards=4)
+    
+    def teardown_method(self):
+        self._remove_files()
+    
+    def _remove_files(self):
+        for suffix in ("", ".resharding", ".old"):
+            shutil.rmtree(self.test_db_file + suffix, ignore_errors=True)
+    
+    def _command(self, title="Sharded Job"):
+        return CreateJobApplicationCommand(
+            jobTitle=title,
+            company="Shard Corp",
+            dateApplied="2025-08-20",
+            status="Applied"
+        )
+    
+    def _record_writes(self):
+        writes = []
+        original_write = self.db._write_file
+        self.db._write_file = lambda path, data: (writes.append(os.path.basename(path)), original_write(path, data))
+        return writes
+    
+    def test_bulk_operations_write_storage_once(self):
+        """Test that a batch rewrites each shard it touches once, and no other shard"""
+        writes = self._record_writes()
+        assert self.db.create_job_applications([self._command(f"Bulk Job {i}") for i in range(5)]) == [4, 5, 6, 7, 8]
+        assert sorted(writes) == ["shard-000.json", "shard-001.json", "shard-002.json", "shard-003.json"]
+        
+        writes.clear()
+        self.db.patch_job_application(5, {"status": "Offer"})
+        self.db.delete_job_application(1)
+        assert writes == ["shard-001.json", "shard-001.json"]
+        assert self.db.delete_job_applications([6, 2, 999, 6]) == [True, True, False, False]
+        assert writes == ["shard-001.json", "shard-001.json", "shard-002.json"]
+        assert self.db.delete_job_applications([999]) == [False]
+        assert len(writes) == 3
+    
+    def test_state_survives_reopen(self):
+        """Test that records and the next id are merged back from every shard"""
+        job_id = self.db.create_job_application(self._command())
+        self.db.patch_job_application(1, {"jobTitle": "Reopened"})
+        self.db.delete_job_application(2)
+        self.db.delete_job_application(job_id)
+        
+        self.db = ShardedDatabase(self.test_db_file, shards=2)
+        assert self.db.shard_count == 4
+        assert [app.id for app in self.db.get_all_job_applications()] == [1, 3]
+        assert self.db.get_job_application_by_id(1).jobTitle == "Reopened"
+        assert self.db.create_job_application(self._command()) == job_id + 1
+    
+    def test_reshard_in_place_and_from_json(self):
+        """Test resharding a sharded directory in place and splitting a JSON file"""
+        self.db.delete_job_application(3)
+        job_id = self.db.create_job_application(self._command("Reshard Me"))
+        
+        assert reshard(self.test_db_file, self.test_db_file, 3) == 3
+        self.db = ShardedDatabase(self.test_db_file)
+        assert self.db.shard_count == 3
+        assert [app.id for app in self.db.get_all_job_applications()] == [1, 2, job_id]
+        assert self.db.next_id == job_id + 1
+        assert not os.path.exists(self.test_db_file + ".old")
+        
+        json_file = "test_reshard_job_applications.json"
+        try:
+            source = FileDatabase(json_file)
+            source.create_job_application(self._command("From JSON"))
+            source.close()
+            self._remove_files()
+            self.db = ShardedDatabase(self.test_db_file, shards=2, import_from=json_file)
+            assert self.db.shard_count == 2
+            assert self.db.get_job_application_by_id(4).jobTitle == "From JSON"
+            assert self.db.next_id == 5
+        finally:
+            if os.path.exists(json_file):
+                os.remove(json_file)
+        
+        with pytest.raises(FileNotFoundError):
+            reshard("missing_job_applications.json", self.test_db_file, 2)
+    
+    def test_shard_files_open_as_file_databases(self):
+        """Test that every shard is an ordinary FileDatabase snapshot holding its own ids"""
+        self.db.create_job_applications([self._command(f"Job {i}") for i in range(5)])
+        for shard in range(4):
+            ids = [app.id for app in FileDatabase(os.path.join(self.test_db_file, f"shard-{shard:03d}.json")).get_all_job_applications()]
+            assert ids and all(id % 4 == shard for id in ids)
+
+
+class TestWriteAheadLog:
+    """Unit tests for the FileDatabase write-ahead-log storage mode"""
+
+    def setup_method(self):
+        """Create a fresh log-backed database for each test"""
+        self.test_db_file = "test_job_applications_wal.json"
+        self._remove_files()
+        self.db = FileDatabase(self.test_db_file, write_ahead_log=True)
+
+    def teardown_method(self):
+        """Close the database and remove snapshot and log files"""
+        self.db.close()
+        self._remove_files()
+
+    def _remove_files(self):
+        for suffix in ("", ".log", ".log.compacting", ".tmp"):
+            if os.path.exists(self.test_db_file + suffix):
+                os.remove(self.test_db_file + suffix)
+
+    def _reopen(self, **kwargs):
+        self.db.close()
+        self.db = FileDatabase(self.test_db_file, write_ahead_log=True, **kwargs)
+
+    def _command(self, title="Log Job"):
+        return CreateJobApplicationCommand(
+            jobTitle=title,
+            company="Log Corp",
+            dateApplied="2025-08-20",
+            status="Applied"
+        )
+
+    def test_mutations_append_to_log_without_rewriting_snapshot(self):
+        """Test that writes go to the log and leave the snapshot untouched"""
+        with open(self.test_db_file) as f:
+            snapshot_before = f.read()
+
+        job_id = self.db.create_job_application(self._command())
+        self.db.update_job_application(job_id, UpdateJobApplicationCommand(
+            jobTitle="Updated Log Job",
+            company="Log Corp",
+            dateApplied="2025-08-21",
+            status="Interview"
+        ))
+        self.db.delete_job_application(1)
+
+        with open(self.test_db_file) as f:
+            assert f.read() == snapshot_before
+        with open(self.test_db_file + ".log") as f:
+            assert len(f.readlines()) == 3
+
+    def test_replay_restores_state_after_restart(self):
+        """Test that snapshot plus log are replayed when the database is reopened"""
+        job_id = self.db.create_job_application(self._command())
+        self.db.update_job_application(2, UpdateJobApplicationCommand(
+            jobTitle="Staff Backend Developer",
+            company="Google",
+            dateApplied="2025-08-10",
+            status="Offer"
+        ))
+        self.db.delete_job_application(1)
+
+        self._reopen()
+
+        job_apps = self.db.get_all_job_applications()
+        assert [app.id for app in job_apps] == [2, 3, job_id]
+        assert self.db.get_job_application_by_id(2).status == "Offer"
+        assert self.db.create_job_application(self._command("Next")) == job_id + 1
+
+    def test_patch_logs_changed_fields_only(self):
+        """Test that a patch appends only its changed fields and is replayed after restart"""
+        self.db.patch_job_application(2, {"status": "Offer", "company": "Google"})
+        with open(self.test_db_file + ".log") as f:
+            assert json.loads(f.readlines()[-1]) == {"op": "patch", "id": 2, "fields": {"status": "Offer"}}
+        
+        self._reopen()
+        
+        job_app = self.db.get_job_application_by_id(2)
+        assert (job_app.status, job_app.company, job_app.jobTitle) == ("Offer", "Google", "Backend Developer")
+    
+    def test_torn_last_entry_is_ignored(self):
+        """Test that a partially written log entry does not break replay"""
+        job_id = self.db.create_job_application(self._command())
+        self.db.close()
+        with open(self.test_db_file + ".log", "a") as f:
+            f.write('{"op": "put", "record": {"id": 99')
+
+        self._reopen()
+
+        assert self.db.get_job_application_by_id(job_id) is not None
+        assert self.db.get_job_application_by_id(99) is None
+        new_id = self.db.create_job_application(self._command("After crash"))
+        self._reopen()
+        assert self.db.get_job_application_by_id(new_id).jobTitle == "After crash"
+
+    def test_compaction_folds_log_into_snapshot(self):
+        """Test that passing the entry threshold compacts the log in the background"""
+        self._reopen(compact_after_entries=5)
+        ids = [self.db.create_job_application(self._command(f"Job {i}")) for i in range(7)]
+        self.db.wait_for_compaction()
+
+        with open(self.test_db_file) as f:
+            snapshot_ids = [app["id"] for app in json.load(f)["job_applications"]]
+        assert ids[4] in snapshot_ids
+        assert not os.path.exists(self.test_db_file + ".log.compacting")
+        with open(self.test_db_file + ".log") as f:
+            assert len(f.readlines()) == 2
+
+        self._reopen()
+        assert len(self.db.get_all_job_applications()) == 10
+
+    def test_interrupted_compaction_is_recovered(self):
+        """Test that a rotated log left behind by a crash is replayed and folded"""
+        job_id = self.db.create_job_application(self._command())
+        self.db.close()
+        os.replace(self.test_db_file + ".log", self.test_db_file + ".log.compacting")
+
+        self._reopen()
+
+        assert self.db.get_job_application_by_id(job_id) is not None
+        assert not os.path.exists(self.test_db_file + ".log.compacting")
+        with open(self.test_db_file) as f:
+            assert job_id in [app["id"] for app in json.load(f)["job_applications"]]
+
+
+class TestTrustedLoad:
+    """Unit tests for checksummed snapshots and loading them without validation"""
+
+    def setup_method(self):
+        self.test_db_file = "test_job_applications_trusted.json"
+        if os.path.exists(self.test_db_file):
+            os.remove(self.test_db_file)
+        self.db = FileDatabase(self.test_db_file)
+
+    def teardown_method(self):
+        if os.path.exists(self.test_db_file):
+            os.remove(self.test_db_file)
+
+    @pytest.fixture(autouse=True)
+    def count_validations(self, monkeypatch):
+        """Record the ids of records loaded through model validation"""
+        self.validated = []
+        original = FileDatabase._load_record
+        monkeypatch.setattr(FileDatabase, "_load_record", staticmethod(
+            lambda data: (self.validated.append(data["id"]), original(data))[1]
+        ))
+
+    def _rewrite(self, old: str, new: str):
+        with open(self.test_db_file) as f:
+            text = f.read()
+        assert old in text
+        with open(self.test_db_file, "w") as f:
+            f.write(text.replace(old, new))
+
+    def test_own_snapshot_loads_without_validation(self):
+        """Test that a snapshot with a matching checksum skips per-record validation"""
+        self.db.update_job_application(2, UpdateJobApplicationCommand(
+            jobTitle="Développeur", company="Google", dateApplied="2025-08-10", status="Offer"
+        ))
+        reloaded = FileDatabase(self.test_db_file)
+        assert self.validated == []
+        assert reloaded.get_all_job_applications() == self.db.get_all_job_applications()
+        assert reloaded.get_job_application_by_id(2).jobTitle == "Développeur"
+        assert reloaded.next_id == 4
+
+    def test_edited_snapshot_is_validated(self):
+        """Test that a checksum mismatch falls back to validating every record"""
+        self._rewrite('"status": "Interview"', '"status": "Offer"')
+        reloaded = FileDatabase(self.test_db_file)
+        assert self.validated == [1, 2, 3]
+        assert reloaded.get_job_application_by_id(2).status == "Offer"
+
+    def test_corrupt_record_is_rejected(self):
+        """Test that a corrupted record fails validation instead of being trusted"""
+        self._rewrite('"jobTitle": "Backend Developer"', '"jobTitle": 42')
+        with pytest.raises(ValidationError):
+            FileDatabase(self.test_db_file)
+
+    def test_snapshot_without_checksum_is_validated(self):
+        """Test that files written before checksums existed still load"""
+        with open(self.test_db_file, "w") as f:
+            json.dump({"next_id": 2, "job_applications": [
+                {"id": 1, "jobTitle": "Legacy", "company": "Old Corp", "dateApplied": "2025-01-01", "status": "Applied"}
+            ]}, f, indent=2)
+        reloaded = FileDatabase(self.test_db_file, trusted_load=True)
+        assert self.validated == [1]
+        assert reloaded.get_job_application_by_id(1).company == "Old Corp"
+
+    def test_trusted_load_can_be_disabled(self):
+        """Test that trusted_load=False validates even a matching snapshot"""
+        FileDatabase(self.test_db_file, trusted_load=False)
+        assert self.validated == [1, 2, 3]
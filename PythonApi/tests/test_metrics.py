@@ -0,0 +1,96 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from metrics import Counter, Gauge, Histogram, InstrumentedLock, Registry
+import contextvars
+import threading
+import time
+import timing
+
+
+def test_render_counter_and_gauge():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ("method",), registry=registry)
+    records = Gauge("records", "Records.", registry=registry)
+    requests.labels("GET").inc()
+    requests.labels("GET").inc(2)
+    requests.labels('P"O\\ST').inc()
+    records.set(5)
+    
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{method="GET"} 3.0',
+        'requests_total{method="P\\"O\\\\ST"} 1.0',
+        "# HELP records Records.",
+        "# TYPE records gauge",
+        "records 5.0",
+    ]
+    
+    records.set_function(lambda: 7)
+    assert "records 7.0" in registry.render().splitlines()
+
+
+def test_labels_must_match_label_names():
+    requests = Counter("requests_total", "Requests.", ("method", "route"), registry=Registry())
+    with pytest.raises(ValueError):
+        requests.labels("GET")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.labels("/").observe(value)
+    
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/",le="0.1"} 2',
+        'latency_seconds_bucket{route="/",le="1.0"} 3',
+        'latency_seconds_bucket{route="/",le="+Inf"} 4',
+        'latency_seconds_sum{route="/"} 2.65',
+        'latency_seconds_count{route="/"} 4',
+    ]
+
+
+def test_instrumented_lock_records_wait():
+    registry = Registry()
+    wait = Histogram("wait_seconds", "Wait.", buckets=(0.01,), registry=registry)
+    lock = InstrumentedLock(wait)
+    with lock:
+        pass
+    
+    lock.acquire()
+    waiter = threading.Thread(target=lambda: lock.acquire() and lock.release())
+    waiter.start()
+    time.sleep(0.05)
+    lock.release()
+    waiter.join()
+    
+    assert not lock.locked()
+    assert lock.acquire(blocking=False)
+    lock.release()
+    lines = registry.render().splitlines()
+    # The uncontended acquisitions waited no time; the thread waited over 10 ms
+    assert 'wait_seconds_bucket{le="0.01"} 3' in lines
+    assert "wait_seconds_count 4" in lines
+
+
+def test_contended_lock_wait_is_charged_to_the_request():
+    lock = InstrumentedLock(Histogram("wait_seconds", "Wait.", registry=Registry()))
+    phases = {}
+    
+    def request():
+        timing._phases.set(phases)
+        with lock:
+            pass
+    
+    lock.acquire()
+    waiter = threading.Thread(target=contextvars.copy_context().run, args=(request,))
+    waiter.start()
+    time.sleep(0.05)
+    lock.release()
+    waiter.join()
+    
+    assert phases["lock"] >= 0.04
@@ -0,0 +1,187 @@
+import pytest
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import FileDatabase
+from streaming import CSV_COLUMNS, csv_export, import_rows, iter_lines, ndjson_export, parse_csv, parse_ndjson
+import streaming
+import asyncio
+import csv
+import io
+import json
+import os
+import tracemalloc
+
+
+def seed_records(path: str, count: int):
+    with open(path, "w") as f:
+        json.dump({
+            "next_id": count + 1,
+            "job_applications": [
+                {
+                    "id": i,
+                    "jobTitle": f"Engineer {i}",
+                    "company": f"Company {i % 50}",
+                    "dateApplied": "2025-08-20",
+                    "status": "Applied",
+                    "description": "Seeded for the export tests, with a comma, and \"quotes\"",
+                    "location": "Remote"
+                }
+                for i in range(1, count + 1)
+            ]
+        }, f)
+
+
+async def byte_chunks(data: bytes, size: int):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+class TestExport:
+    """Unit tests for the streaming NDJSON and CSV exporters"""
+    
+    def setup_method(self):
+        self.test_db_file = "test_export_job_applications.json"
+        if os.path.exists(self.test_db_file):
+            os.remove(self.test_db_file)
+        self.db = FileDatabase(self.test_db_file)
+    
+    def teardown_method(self):
+        if os.path.exists(self.test_db_file):
+            os.remove(self.test_db_file)
+    
+    def test_ndjson_export_round_trips(self):
+        """Test that every record is exported as one JSON line"""
+        data = b"".join(ndjson_export(self.db.iter_job_applications(), chunk_size=2))
+        lines = data.decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [app._asdict() for app in self.db.get_all_job_applications()]
+    
+    def test_csv_export_round_trips(self):
+        """Test that CSV output has a header and quotes values that need it"""
+        seed_records(self.test_db_file, 3)
+        self.db._load_data()
+        data = b"".join(csv_export(self.db.iter_job_applications(), chunk_size=2)).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(data)))
+        assert list(rows[0]) == CSV_COLUMNS
+        assert [row["id"] for row in rows] == ["1", "2", "3"]
+        assert rows[0]["description"] == "Seeded for the export tests, with a comma, and \"quotes\""
+        assert rows[0]["salary"] == ""
+    
+    def test_export_is_a_consistent_snapshot(self):
+        """Test that writes during an export do not show up in it"""
+        chunks = ndjson_export(self.db.iter_job_applications(), chunk_size=1)
+        first = next(chunks)
+        self.db.delete_job_application(3)
+        rest = b"".join(chunks)
+        assert len((first + rest).splitlines()) == 3
+    
+    @pytest.mark.slow
+    @pytest.mark.parametrize("export", [ndjson_export, csv_export])
+    def test_export_memory_does_not_grow_with_records(self, export):
+        """Test that peak memory while streaming is the same for 2,000 and 20,000 records"""
+        peaks = []
+        for count in (2000, 20000):
+            seed_records(self.test_db_file, count)
+            self.db._load_data()
+            self.db.snapshot()
+            exported = 0
+            tracemalloc.start()
+            try:
+                for chunk in export(self.db.iter_job_applications()):
+                    exported += len(chunk)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        # The larger export produces ten times the output in the same memory
+        assert peaks[1] < peaks[0] * 1.5
+        assert peaks[1] < exported / 2
+
+
+class TestImport:
+    """Unit tests for incremental parsing and chunked import"""
+    
+    def test_lines_survive_any_chunk_boundary(self):
+        """Test that lines and multi-byte characters split across chunks are rejoined"""
+        data = "first,é\r\nsecond\n\nthird".encode("utf-8")
+        for size in (1, 2, 3, len(data)):
+            assert asyncio.run(collect(iter_lines(byte_chunks(data, size)))) == ["first,é", "second", "", "third"]
+    
+    def test_overlong_line_is_reported_not_buffered(self, monkeypatch):
+        """Test that a line above MAX_LINE_BYTES becomes None and parsing continues"""
+        monkeypatch.setattr(streaming, "MAX_LINE_BYTES", 10)
+        data = b'{"a": 1}\n' + b"x" * 50 + b'\n{"b": 2}\n'
+        lines = asyncio.run(collect(iter_lines(byte_chunks(data, 4))))
+        assert lines == ['{"a": 1}', None, '{"b": 2}']
+        rows = asyncio.run(collect(parse_ndjson(iter_lines(byte_chunks(data, 4)))))
+        assert rows[0] == (1, {"a": 1})
+        assert rows[1][0] == 2 and "longer than" in rows[1][1]
+        assert rows[2] == (3, {"b": 2})
+    
+    def test_line_limit_counts_bytes_not_characters(self, monkeypatch):
+        """Test that multi-byte characters count with their encoded size against MAX_LINE_BYTES"""
+        monkeypatch.setattr(streaming, "MAX_LINE_BYTES", 6)
+        data = ("é" * 4 + "\n" + "é" * 3 + "\n").encode("utf-8")
+        assert asyncio.run(collect(iter_lines(byte_chunks(data, 3)))) == [None, "é" * 3]
+    
+    def test_parse_ndjson_reports_bad_lines(self):
+        """Test NDJSON parsing with blank lines, invalid JSON and non-objects"""
+        data = b'{"jobTitle": "A"}\n\nnot json\n[1, 2]\n{"jobTitle": "B"}'
+        rows = asyncio.run(collect(parse_ndjson(iter_lines(byte_chunks(data, 5)))))
+        assert [line for line, _ in rows] == [1, 3, 4, 5]
+        assert rows[0][1] == {"jobTitle": "A"}
+        assert rows[1][1].startswith("Invalid JSON")
+        assert rows[2][1] == "Expected a JSON object"
+        assert rows[3][1] == {"jobTitle": "B"}
+    
+    def test_parse_csv_handles_quoted_newlines(self):
+        """Test CSV records that span lines and keep their starting line number"""
+        data = b'jobTitle,company,description\r\nA,Acme,"one\r\ntwo, ""quoted"""\r\nB,Globex,\r\nC,Initech\r\n'
+        rows = asyncio.run(collect(parse_csv(iter_lines(byte_chunks(data, 7)))))
+        assert rows[0] == (2, {"jobTitle": "A", "company": "Acme", "description": 'one\ntwo, "quoted"'})
+        assert rows[1] == (4, {"jobTitle": "B", "company": "Globex", "description": None})
+        assert rows[2] == (5, "Expected 3 values, got 2")
+    
+    def test_import_rows_commits_in_chunks(self):
+        """Test that valid rows are committed chunk by chunk and invalid ones reported"""
+        batches = []
+        
+        async def create(commands):
+            batches.append(len(commands))
+            return list(range(len(commands)))
+        
+        rows = [(i, {"jobTitle": f"Job {i}", "company": "Acme", "dateApplied": "2025-08-20", "status": "Applied"})
+                for i in range(1, 8)]
+        rows.insert(3, (99, {"jobTitle": "Missing fields"}))
+        rows.insert(5, (100, "Invalid JSON: Expecting value"))
+        
+        async def parsed():
+            for row in rows:
+                yield row
+        
+        result = asyncio.run(import_rows(parsed(), create, chunk_size=3))
+        assert batches == [3, 3, 1]
+        assert result.imported == 7
+        assert result.failed == 2
+        assert result.errors[0].line == 99
+        assert "company" in result.errors[0].error
+        assert result.errors[1].line == 100
+    
+    def test_csv_export_imports_unchanged(self):
+        """Test that a CSV export parses back into the records it came from"""
+        test_db_file = "test_import_job_applications.json"
+        try:
+            db = FileDatabase(test_db_file)
+            data = b"".join(csv_export(db.iter_job_applications()))
+            rows = asyncio.run(collect(parse_csv(iter_lines(byte_chunks(data, 64)))))
+            assert [row for _, row in rows] == [
+                {column: str(value) if value is not None else None for column, value in app._asdict().items()}
+                for app in db.get_all_job_applications()
+            ]
+        finally:
+            if os.path.exists(test_db_file):
+                os.remove(test_db_file)
@@ -0,0 +1,149 @@
+"""Per-request breakdown of where the time went, sent as a Server-Timing header.
+
+ServerTimingMiddleware gives each request a dict of phase durations in a
+context variable. Storage engines add to it with timed() and record(); the
+variable is carried to the database threads by AsyncDatabase, so the work
+they do for a request is charged to it. Outside a timed request the hooks
+find no dict and return at once, so with timing switched off they cost one
+context variable lookup.
+"""
+from contextvars import ContextVar
+from typing import Dict, Optional
+import json
+import logging
+import os
+import time
+
+# Phases in header order, with the description shown by browser dev tools
+PHASES = {
+    "lock": "Database lock wait",
+    "storage": "Storage I/O",
+    "encode": "Response encoding",
+}
+
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timing_phases", default=None)
+
+access_log = logging.getLogger("job_tracker.access")
+
+
+class TimingSettings:
+    """Switches read on every request, so timing can be turned on and off while serving."""
+
+    def __init__(self, header: bool = False, access_log: bool = False):
+        # Send a Server-Timing header with every response
+        self.header = header
+        # Log one JSON line per request to the job_tracker.access logger
+        self.access_log = access_log
+
+    @property
+    def enabled(self) -> bool:
+        return self.header or self.access_log
+
+
+SETTINGS = TimingSettings(
+    header=os.environ.get("JOB_TRACKER_SERVER_TIMING") == "1",
+    access_log=os.environ.get("JOB_TRACKER_ACCESS_LOG") == "1",
+)
+
+
+def record(phase: str, seconds: float):
+    """Add ``seconds`` to ``phase`` of the current request, if it is being timed."""
+    phases = _phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+class _NotTimed:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NOT_TIMED = _NotTimed()
+
+
+class _PhaseTimer:
+    __slots__ = ("_phases", "_phase", "_start")
+
+    def __init__(self, phases: Dict[str, float], phase: str):
+        self._phases = phases
+        self._phase = phase
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        self._phases[self._phase] = self._phases.get(self._phase, 0.0) + elapsed
+
+
+def timed(phase: str):
+    """Context manager adding the time spent in its body to ``phase`` of the current request."""
+    phases = _phases.get()
+    if phases is None:
+        return _NOT_TIMED
+    return _PhaseTimer(phases, phase)
+
+
+def server_timing_header(phases: Dict[str, float], total: float) -> str:
+    """Format phase durations in seconds as a Server-Timing value in milliseconds."""
+    metrics = [f'{name};desc="{description}";dur={phases.get(name, 0.0) * 1000:.3f}' for name, description in PHASES.items()]
+    metrics.append(f'total;desc="Total";dur={total * 1000:.3f}')
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware timing the phases of each request.
+
+    With ``settings.header`` on, the response carries a Server-Timing
+    header with the lock wait, storage I/O and encoding time spent before
+    the response started, and the total so far. Work done while a body
+    streams, such as export encoding, happens after the header is sent and
+    only appears in the access log line, which is written once the response
+    is complete.
+    """
+
+    def __init__(self, app, settings: TimingSettings = SETTINGS):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        settings = self.settings
+        if scope["type"] != "http" or not settings.enabled:
+            await self.app(scope, receive, send)
+            return
+        phases: Dict[str, float] = {}
+        token = _phases.set(phases)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.header:
+                    value = server_timing_header(phases, time.perf_counter() - start)
+                    message = dict(message, headers=list(message.get("headers", [])) + [(b"server-timing", value.encode("latin-1"))])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _phases.reset(token)
+            if settings.access_log:
+                route = scope.get("route")
+                entry = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route.path if route is not None else None,
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                }
+                for name in PHASES:
+                    entry[f"{name}_ms"] = round(phases.get(name, 0.0) * 1000, 3)
+                access_log.info(json.dumps(entry))
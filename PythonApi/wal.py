@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+from typing import Iterator, List
+
+
+class WriteAheadLog:
+    """Append-only journal of mutations that sits on top of a JSON snapshot.
+
+    Every mutation is written as one JSON line.  When the log is compacted the
+    active file is rotated to ``<path>.compacting`` so new writes can continue
+    while the snapshot is rewritten, and the rotated file is discarded once the
+    snapshot containing its entries has been replaced on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = path + ".compacting"
+        self.entries = 0
+        self.size = 0
+        self._file = None
+
+    def open(self, entries: int = 0):
+        """Open the active log for appending, keeping track of its current size."""
+        self.close()
+        self._truncate_torn_tail()
+        self._file = open(self.path, "ab")
+        self.entries = entries
+        self.size = self._file.tell()
+
+    def _truncate_torn_tail(self):
+        # A crash during append can leave a partial last line; new entries must
+        # not be glued onto it or replay would stop before reaching them.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, entries: List[dict]):
+        """Append one or more entries with a single write call."""
+        data = b"".join(
+            json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n" for entry in entries
+        )
+        self._file.write(data)
+        self._file.flush()
+        self.entries += len(entries)
+        self.size += len(data)
+
+    def rotate(self):
+        """Move the active log aside for compaction and start a fresh one.
+
+        If a previous compaction never finished, the active entries are added
+        to the end of the rotated file so nothing is lost and replay order is
+        preserved.
+        """
+        self.close()
+        if os.path.exists(self.rotated_path):
+            with open(self.path, "rb") as src, open(self.rotated_path, "ab") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        elif os.path.exists(self.path):
+            os.replace(self.path, self.rotated_path)
+        self.open()
+
+    def discard_rotated(self):
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def has_rotated(self) -> bool:
+        return os.path.exists(self.rotated_path)
+
+    def reset(self):
+        """Remove every log file, used when the snapshot is recreated from scratch."""
+        self.close()
+        for path in (self.rotated_path, self.path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def replay(self) -> Iterator[dict]:
+        """Yield entries from the rotated log and then the active log, in write order.
+
+        A line that cannot be decoded means the process stopped in the middle of
+        an append; replay stops there because nothing after it was acknowledged.
+        """
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        break